@@ -3,9 +3,165 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import tkinter as tk
-from tkinter import ttk, scrolledtext
+from tkinter import ttk, scrolledtext, filedialog
+import os
 import threading
 import queue
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import diseno
+import exportar
+import graficas
+import montecarlo
+import simulador
+from propiedades import calcular_temperatura_saturacion
+
+# Intervalo de vaciado del registro (ms) y líneas máximas que conserva el área de resultados
+INTERVALO_LOG_MS = 50
+MAX_LINEAS_LOG = 20000
+
+# Simulaciones que se ejecutan a la vez y corridas terminadas que se conservan para comparar
+TRABAJADORES = max(1, min(4, os.cpu_count() or 1))
+MAX_HISTORIAL = 12
+COLORES_CORRIDAS = ('tab:blue', 'tab:orange', 'tab:green', 'tab:red', 'tab:purple',
+                    'tab:brown', 'tab:pink', 'tab:gray', 'tab:olive', 'tab:cyan')
+
+class TablaVirtual:
+    """Tabla segundo a segundo que solo crea las filas visibles y las rellena desde los arreglos"""
+    
+    VISTAS = {
+        'Temperatura': [('tiempo', 'Tiempo (s)', '.0f'), ('minutos', 'Tiempo (min)', '.2f'),
+                        ('temperatura', 'Temperatura (°C)', '.2f')],
+        'Fase sólida': [('tiempo', 'Tiempo (s)', '.0f'), ('minutos', 'Tiempo (min)', '.2f'),
+                        ('masa_solida', 'Masa Sólida (kg)', '.6f')],
+        'Fase líquida': [('tiempo', 'Tiempo (s)', '.0f'), ('minutos', 'Tiempo (min)', '.2f'),
+                         ('masa_liquida', 'Masa Líquida (kg)', '.6f')],
+        'Fase vapor': [('tiempo', 'Tiempo (s)', '.0f'), ('minutos', 'Tiempo (min)', '.2f'),
+                       ('masa_vapor', 'Masa Vapor (kg)', '.6f')],
+        'Combinada': [('tiempo', 'Tiempo (s)', '.0f'), ('temperatura', 'Temp (°C)', '.2f'),
+                      ('masa_solida', 'M.Sólida (kg)', '.6f'), ('masa_liquida', 'M.Líquida (kg)', '.6f'),
+                      ('masa_vapor', 'M.Vapor (kg)', '.6f'), ('total', 'Total (kg)', '.6f')],
+    }
+    
+    def __init__(self, parent, filas_visibles=30):
+        self.filas_visibles = filas_visibles
+        self.series = None
+        self.indices = np.empty(0, dtype=int)
+        self.inicio = 0
+        
+        controles = ttk.Frame(parent)
+        controles.pack(fill=tk.X, pady=(5, 5))
+        
+        ttk.Label(controles, text="Vista:").pack(side=tk.LEFT)
+        self.vista_var = tk.StringVar(value='Combinada')
+        vista = ttk.Combobox(controles, textvariable=self.vista_var, values=list(self.VISTAS),
+                             state='readonly', width=14)
+        vista.pack(side=tk.LEFT, padx=(5, 15))
+        vista.bind('<<ComboboxSelected>>', self.cambiar_vista)
+        
+        # Regla de muestreo: cada segundo hasta `detalle`, luego cada `intervalo` segundos
+        ttk.Label(controles, text="Detalle hasta (s):").pack(side=tk.LEFT)
+        self.detalle_var = tk.StringVar(value="60")
+        ttk.Entry(controles, textvariable=self.detalle_var, width=8).pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Label(controles, text="Luego cada (s):").pack(side=tk.LEFT)
+        self.intervalo_var = tk.StringVar(value="30")
+        ttk.Entry(controles, textvariable=self.intervalo_var, width=8).pack(side=tk.LEFT, padx=(5, 15))
+        
+        ttk.Button(controles, text="Aplicar", command=self.aplicar_muestreo).pack(side=tk.LEFT)
+        
+        self.info_label = ttk.Label(controles, text="")
+        self.info_label.pack(side=tk.RIGHT)
+        
+        tabla_frame = ttk.Frame(parent)
+        tabla_frame.pack(fill=tk.BOTH, expand=True)
+        
+        self.tree = ttk.Treeview(tabla_frame, show='headings', height=filas_visibles)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.scroll = ttk.Scrollbar(tabla_frame, orient=tk.VERTICAL, command=self.desplazar)
+        self.scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree.bind('<MouseWheel>', self.rueda)
+        self.tree.bind('<Button-4>', lambda e: self.desplazar('scroll', -3, 'units'))
+        self.tree.bind('<Button-5>', lambda e: self.desplazar('scroll', 3, 'units'))
+        
+        self.filas = [self.tree.insert('', tk.END, values=()) for _ in range(filas_visibles)]
+        self.cambiar_vista()
+    
+    def cargar(self, series):
+        """Asocia la tabla a un nuevo resultado sin formatear ninguna fila todavía"""
+        self.series = series
+        self.aplicar_muestreo()
+    
+    def aplicar_muestreo(self):
+        try:
+            detalle = float(self.detalle_var.get())
+            intervalo = float(self.intervalo_var.get())
+        except ValueError:
+            self.info_label.config(text="Muestreo inválido")
+            return
+        
+        if self.series is not None:
+            self.indices = simulador.indices_muestreo(self.series['tiempo'], detalle, intervalo)
+        self.inicio = 0
+        self.info_label.config(text=f"{len(self.indices)} filas")
+        self.refrescar()
+    
+    def cambiar_vista(self, event=None):
+        columnas = self.VISTAS[self.vista_var.get()]
+        self.tree.configure(columns=[clave for clave, _, _ in columnas])
+        for clave, titulo, _ in columnas:
+            self.tree.heading(clave, text=titulo)
+            self.tree.column(clave, anchor=tk.E, width=110)
+        self.refrescar()
+    
+    def desplazar(self, accion, cantidad, unidad=None):
+        """Comando del scrollbar: mueve la ventana de filas visibles"""
+        total = len(self.indices)
+        if accion == 'moveto':
+            self.inicio = int(float(cantidad) * total)
+        elif accion == 'scroll':
+            paso = self.filas_visibles if unidad == 'pages' else 1
+            self.inicio += int(cantidad) * paso
+        
+        self.inicio = min(max(self.inicio, 0), max(total - self.filas_visibles, 0))
+        self.refrescar()
+    
+    def rueda(self, event):
+        self.desplazar('scroll', -1 if event.delta > 0 else 1, 'units')
+    
+    def refrescar(self):
+        """Formatea únicamente las filas que caben en pantalla"""
+        columnas = self.VISTAS[self.vista_var.get()]
+        total = len(self.indices)
+        
+        for k, fila in enumerate(self.filas):
+            posicion = self.inicio + k
+            if self.series is None or posicion >= total:
+                self.tree.item(fila, values=())
+                continue
+            
+            i = self.indices[posicion]
+            valores = []
+            for clave, _, formato in columnas:
+                if clave == 'minutos':
+                    valor = self.series['tiempo'][i] / 60
+                elif clave == 'total':
+                    valor = (self.series['masa_solida'][i] + self.series['masa_liquida'][i]
+                             + self.series['masa_vapor'][i])
+                else:
+                    valor = self.series[clave][i]
+                valores.append(format(valor, formato))
+            self.tree.item(fila, values=valores)
+        
+        if total:
+            self.scroll.set(self.inicio / total, min(self.inicio + self.filas_visibles, total) / total)
+        else:
+            self.scroll.set(0, 1)
+
 
 class SimuladorCalentamientoGUI:
     def __init__(self, root):
@@ -14,11 +170,26 @@ class SimuladorCalentamientoGUI:
         self.root.geometry("1400x900")
         
         self.result_queue = queue.Queue()
+        self.montecarlo_queue = queue.Queue()
+        self.montecarlo_cancelar = threading.Event()
+        self.montecarlo_activo = False
+        self.log_queue = queue.Queue()
         
         self.resultados = None
-        self.simulacion_activa = False
+        self.parametros = {}
+        self.bloques_vivos = []
+        self.lineas = []
+        
+        # Cola de simulaciones: cada corrida guarda parámetros, estado y, al terminar, sus resultados
+        self.pool = ThreadPoolExecutor(max_workers=TRABAJADORES)
+        self.corridas = OrderedDict()
+        self.siguiente_corrida = 1
+        self.corrida_viva = None
+        self.seleccion_automatica = ()
         
         self.setup_ui()
+        self.root.after(INTERVALO_LOG_MS, self.drenar_log)
+        self.root.after(100, self.check_simulation_complete)
     
     def setup_ui(self):
         main_frame = ttk.Frame(self.root)
@@ -28,12 +199,27 @@ class SimuladorCalentamientoGUI:
         left_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
         left_frame.pack_propagate(False)
         
-        right_frame = ttk.Frame(main_frame)
+        right_frame = ttk.Notebook(main_frame)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
         
+        graphs_frame = ttk.Frame(right_frame)
+        tables_frame = ttk.Frame(right_frame)
+        right_frame.add(graphs_frame, text="Gráficas")
+        right_frame.add(tables_frame, text="Tablas")
+        
+        montecarlo_frame = ttk.Frame(right_frame)
+        right_frame.add(montecarlo_frame, text="Monte Carlo")
+        
+        diseno_frame = ttk.Frame(right_frame)
+        right_frame.add(diseno_frame, text="Diseño inverso")
+        
         self.setup_input_section(left_frame)
+        self.setup_corridas_section(left_frame)
         self.setup_results_section(left_frame)
-        self.setup_graphs_section(right_frame)
+        self.setup_graphs_section(graphs_frame)
+        self.tabla = TablaVirtual(tables_frame)
+        self.setup_montecarlo_section(montecarlo_frame)
+        self.setup_diseno_section(diseno_frame)
     
     def setup_input_section(self, parent):
         # Titulo
@@ -74,8 +260,38 @@ class SimuladorCalentamientoGUI:
                                      command=self.iniciar_simulacion)
         self.simular_btn.pack(fill=tk.X, pady=(10, 0))
         
-        self.progress = ttk.Progressbar(input_frame, mode='indeterminate')
+        self.cancelar_btn = ttk.Button(input_frame, text="Cancelar", 
+                                      command=self.cancelar_simulacion, state='disabled')
+        self.cancelar_btn.pack(fill=tk.X, pady=(5, 0))
+        
+        self.progress = ttk.Progressbar(input_frame, mode='determinate', maximum=100)
         self.progress.pack(fill=tk.X, pady=(10, 0))
+        
+        archivo_frame = ttk.Frame(input_frame)
+        archivo_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        self.exportar_btn = ttk.Button(archivo_frame, text="Exportar...", 
+                                      command=self.exportar_resultados, state='disabled')
+        self.exportar_btn.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+        
+        ttk.Button(archivo_frame, text="Abrir...", 
+                  command=self.abrir_resultados).pack(side=tk.LEFT, fill=tk.X, expand=True)
+    
+    def setup_corridas_section(self, parent):
+        corridas_frame = ttk.LabelFrame(parent, text="Corridas (seleccione varias para compararlas)", padding=5)
+        corridas_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        self.corridas_tree = ttk.Treeview(corridas_frame, columns=('corrida', 'estado'), show='headings',
+                                          height=6, selectmode='extended')
+        self.corridas_tree.heading('corrida', text='Corrida')
+        self.corridas_tree.heading('estado', text='Estado')
+        self.corridas_tree.column('corrida', width=230)
+        self.corridas_tree.column('estado', width=90)
+        self.corridas_tree.pack(fill=tk.X)
+        self.corridas_tree.bind('<<TreeviewSelect>>', self.seleccionar_corridas)
+        
+        ttk.Button(corridas_frame, text="Quitar seleccionadas", 
+                  command=self.quitar_corridas).pack(fill=tk.X, pady=(5, 0))
     
     def setup_results_section(self, parent):
         results_frame = ttk.LabelFrame(parent, text="Resultados y Estado", padding=10)
@@ -110,120 +326,205 @@ class SimuladorCalentamientoGUI:
         self.init_empty_graphs()
     
     def init_empty_graphs(self):
+        """Crea una sola vez las líneas que luego se rellenan con set_data"""
+        linea_temp, = self.ax1.plot([], [], 'r-', linewidth=2)
+        self.ax1.axhline(y=0, color='b', linestyle='--', alpha=0.7, label='Punto de fusión')
+        self.linea_saturacion = self.ax1.axhline(y=100, color='g', linestyle='--', alpha=0.7, 
+                                                 label='Punto de ebullición (100.0°C)')
         self.ax1.set_title('Temperatura vs Tiempo')
         self.ax1.set_xlabel('Tiempo (minutos)')
         self.ax1.set_ylabel('Temperatura (°C)')
         self.ax1.grid(True, alpha=0.3)
+        self.ax1.legend()
         
+        linea_solida, = self.ax2.plot([], [], 'b-', linewidth=2, label='Masa sólida')
         self.ax2.set_title('Masa Sólida vs Tiempo')
         self.ax2.set_xlabel('Tiempo (minutos)')
         self.ax2.set_ylabel('Masa (kg)')
         self.ax2.grid(True, alpha=0.3)
+        self.ax2.legend()
         
+        linea_liquida, = self.ax3.plot([], [], 'g-', linewidth=2, label='Masa líquida')
         self.ax3.set_title('Masa Líquida vs Tiempo')
         self.ax3.set_xlabel('Tiempo (minutos)')
         self.ax3.set_ylabel('Masa (kg)')
         self.ax3.grid(True, alpha=0.3)
+        self.ax3.legend()
         
+        linea_sol_4, = self.ax4.plot([], [], 'b-', linewidth=2, label='Sólida')
+        linea_liq_4, = self.ax4.plot([], [], 'g-', linewidth=2, label='Líquida')
+        linea_vap_4, = self.ax4.plot([], [], 'r-', linewidth=2, label='Vapor')
         self.ax4.set_title('Todas las Fases vs Tiempo')
         self.ax4.set_xlabel('Tiempo (minutos)')
         self.ax4.set_ylabel('Masa (kg)')
         self.ax4.grid(True, alpha=0.3)
+        self.ax4.legend()
+        
+        self.lineas = [(linea_temp, 'temperatura'), (linea_solida, 'masa_solida'),
+                       (linea_liquida, 'masa_liquida'), (linea_sol_4, 'masa_solida'),
+                       (linea_liq_4, 'masa_liquida'), (linea_vap_4, 'masa_vapor')]
+        
+        # Corridas superpuestas para comparar y las líneas que se crearon para ellas
+        self.comparadas = []
+        self.lineas_comparadas = []
         
         self.fig.tight_layout()
         self.canvas.draw()
     
+    def setup_montecarlo_section(self, parent):
+        controles = ttk.LabelFrame(parent, text="Incertidumbre (alrededor de los parámetros de simulación)", 
+                                   padding=10)
+        controles.pack(fill=tk.X, pady=(5, 5))
+        
+        self.mc_muestras_var = tk.StringVar(value="100000")
+        self.mc_potencia_var = tk.StringVar(value="5")
+        self.mc_masa_var = tk.StringVar(value="2")
+        self.mc_presion_var = tk.StringVar(value="3")
+        self.mc_distribucion_var = tk.StringVar(value="normal")
+        
+        campos = [("Muestras:", self.mc_muestras_var), ("± Potencia (%):", self.mc_potencia_var),
+                  ("± Masa (%):", self.mc_masa_var), ("± Presión (%):", self.mc_presion_var)]
+        for columna, (texto, variable) in enumerate(campos):
+            ttk.Label(controles, text=texto).grid(row=0, column=2 * columna, sticky=tk.W)
+            ttk.Entry(controles, textvariable=variable, width=10).grid(row=0, column=2 * columna + 1, 
+                                                                      padx=(5, 15))
+        
+        ttk.Label(controles, text="Distribución:").grid(row=1, column=0, sticky=tk.W, pady=(10, 0))
+        ttk.Combobox(controles, textvariable=self.mc_distribucion_var, values=['normal', 'uniforme'],
+                     state='readonly', width=10).grid(row=1, column=1, padx=(5, 15), pady=(10, 0))
+        
+        self.mc_btn = ttk.Button(controles, text="Ejecutar Monte Carlo", command=self.iniciar_montecarlo)
+        self.mc_btn.grid(row=1, column=2, columnspan=2, sticky=tk.EW, pady=(10, 0))
+        self.mc_cancelar_btn = ttk.Button(controles, text="Cancelar", state='disabled',
+                                          command=self.montecarlo_cancelar.set)
+        self.mc_cancelar_btn.grid(row=1, column=4, columnspan=2, sticky=tk.EW, padx=(5, 0), pady=(10, 0))
+        
+        self.mc_progress = ttk.Progressbar(parent, mode='determinate', maximum=100)
+        self.mc_progress.pack(fill=tk.X, pady=(5, 5))
+        
+        self.mc_texto = scrolledtext.ScrolledText(parent, height=12)
+        self.mc_texto.pack(fill=tk.X)
+        
+        self.mc_fig = Figure(figsize=(10, 3.5), dpi=100)
+        self.mc_ax = self.mc_fig.add_subplot(1, 1, 1)
+        self.mc_canvas = FigureCanvasTkAgg(self.mc_fig, parent)
+        self.mc_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def setup_diseno_section(self, parent):
+        controles = ttk.LabelFrame(parent, text="Diseño inverso (el resto de valores se toma de los parámetros de simulación)",
+                                   padding=10)
+        controles.pack(fill=tk.X, pady=(5, 5))
+        
+        self.diseno_incognitas = {
+            'Potencia (W)': ('potencia', self.potencia_var),
+            'Masa total (kg)': ('masa_total', self.masa_var),
+            'Presión (kPa)': ('presion_kpa', self.presion_var),
+            'Temperatura inicial (°C)': ('temp_inicial', self.temp_inicial_var),
+        }
+        self.diseno_objetivos = {
+            'Evaporización total': 'tiempo_total',
+            'Inicio de la ebullición': 'tiempo_ebullicion',
+            'Fin de la fusión': 'tiempo_fusion',
+        }
+        self.diseno_incognita_var = tk.StringVar(value='Potencia (W)')
+        self.diseno_objetivo_var = tk.StringVar(value='Evaporización total')
+        self.diseno_tiempo_var = tk.StringVar(value="20")
+        self.diseno_resultado = None
+        
+        ttk.Label(controles, text="Calcular:").grid(row=0, column=0, sticky=tk.W)
+        ttk.Combobox(controles, textvariable=self.diseno_incognita_var, values=list(self.diseno_incognitas),
+                     state='readonly', width=24).grid(row=0, column=1, padx=(5, 15))
+        ttk.Label(controles, text="para que:").grid(row=0, column=2, sticky=tk.W)
+        ttk.Combobox(controles, textvariable=self.diseno_objetivo_var, values=list(self.diseno_objetivos),
+                     state='readonly', width=22).grid(row=0, column=3, padx=(5, 15))
+        ttk.Label(controles, text="ocurra en (min):").grid(row=0, column=4, sticky=tk.W)
+        ttk.Entry(controles, textvariable=self.diseno_tiempo_var, width=10).grid(row=0, column=5, padx=(5, 0))
+        
+        ttk.Button(controles, text="Calcular", command=self.calcular_diseno).grid(
+            row=1, column=0, columnspan=2, sticky=tk.EW, pady=(10, 0))
+        self.diseno_usar_btn = ttk.Button(controles, text="Usar en la simulación", state='disabled',
+                                          command=self.usar_diseno)
+        self.diseno_usar_btn.grid(row=1, column=2, columnspan=2, sticky=tk.EW, padx=(5, 0), pady=(10, 0))
+        
+        self.diseno_label = ttk.Label(parent, text="", font=("Arial", 11))
+        self.diseno_label.pack(anchor=tk.W, pady=(10, 0))
+    
+    def calcular_diseno(self):
+        """Resuelve el diseño inverso con los parámetros actuales (tarda milisegundos, sin thread)"""
+        etiqueta = self.diseno_incognita_var.get()
+        incognita, _ = self.diseno_incognitas[etiqueta]
+        variables = {'temp_inicial': self.temp_inicial_var, 'masa_total': self.masa_var,
+                     'potencia': self.potencia_var, 'presion_kpa': self.presion_var}
+        
+        try:
+            tiempo_objetivo = float(self.diseno_tiempo_var.get()) * 60
+            parametros = {nombre: float(variable.get()) for nombre, variable in variables.items()
+                          if nombre != incognita}
+            inicio = time.perf_counter()
+            resultado = diseno.disenar(incognita, tiempo_objetivo,
+                                       self.diseno_objetivos[self.diseno_objetivo_var.get()], **parametros)
+            milisegundos = (time.perf_counter() - inicio) * 1000
+        except ValueError as e:
+            self.diseno_resultado = None
+            self.diseno_usar_btn.config(state='disabled')
+            self.diseno_label.config(text=f"Error: {e}", foreground="red")
+            return
+        
+        self.diseno_resultado = resultado
+        self.diseno_usar_btn.config(state='normal')
+        self.diseno_label.config(
+            text=f"{etiqueta}: {resultado['valor']:.6g}  —  {resultado['tiempo_obtenido'] / 60:.2f} min "
+                 f"({resultado['metodo']}, {resultado['evaluaciones']} evaluaciones, {milisegundos:.1f} ms)",
+            foreground="black")
+        self.log_message(f"Diseño inverso: {etiqueta} = {resultado['valor']:.6g} "
+                         f"para {self.diseno_objetivo_var.get().lower()} en {tiempo_objetivo / 60:.2f} min")
+    
+    def usar_diseno(self):
+        """Copia el valor calculado a los parámetros de simulación"""
+        if self.diseno_resultado is None:
+            return
+        for incognita, variable in self.diseno_incognitas.values():
+            if incognita == self.diseno_resultado['incognita']:
+                variable.set(f"{self.diseno_resultado['valor']:.6g}")
+    
+    def cerrar(self):
+        """Cancela las corridas pendientes para que el pool no retenga el cierre del programa"""
+        for corrida in self.corridas.values():
+            if corrida['cancelar'] is not None:
+                corrida['cancelar'].set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+    
     def log_message(self, message):
-        """Añade un mensaje al área de resultados"""
-        self.results_text.insert(tk.END, message + "\n")
-        self.results_text.see(tk.END)
-        self.root.update_idletasks()
+        """Encola un mensaje para el área de resultados (seguro desde cualquier thread)"""
+        self.log_queue.put(message)
+    
+    def drenar_log(self):
+        """Vuelca en un solo insert los mensajes encolados y recorta el área de resultados"""
+        mensajes = []
+        try:
+            while True:
+                mensajes.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if mensajes:
+            self.results_text.insert(tk.END, "\n".join(mensajes) + "\n")
+            
+            lineas = int(self.results_text.index('end-1c').split('.')[0])
+            if lineas > MAX_LINEAS_LOG:
+                self.results_text.delete('1.0', f'{lineas - MAX_LINEAS_LOG}.0')
+            
+            self.results_text.see(tk.END)
+        
+        self.root.after(INTERVALO_LOG_MS, self.drenar_log)
     
     def update_status(self, message, color="black"):
         """Actualiza el mensaje de estado"""
         self.status_label.config(text=message, foreground=color)
         self.root.update_idletasks()
     
-    def imprimir_tablas_detalladas(self, tiempos, temperaturas, masas_solidas, masas_liquidas, masas_vapor):
-        """Imprime las tablas segundo a segundo"""
-        self.log_message("\n" + "="*80)
-        self.log_message("TABLAS DETALLADAS SEGUNDO A SEGUNDO")
-        self.log_message("="*80)
-        
-        # Tabla 1: Temperatura del sistema en función del tiempo
-        self.log_message("\n📊 TABLA 1: TEMPERATURA DEL SISTEMA EN FUNCIÓN DEL TIEMPO")
-        self.log_message("-" * 60)
-        self.log_message(f"{'Tiempo (s)':<12} {'Tiempo (min)':<15} {'Temperatura (°C)':<18}")
-        self.log_message("-" * 60)
-        
-        # Mostrar cada segundo hasta los primeros 60 segundos, luego cada 30 segundos
-        for i, tiempo in enumerate(tiempos):
-            if tiempo <= 60 or tiempo % 30 == 0 or i == len(tiempos) - 1:
-                minutos = tiempo / 60
-                temp = temperaturas[i]
-                self.log_message(f"{tiempo:<12.0f} {minutos:<15.2f} {temp:<18.2f}")
-        
-        # Tabla 2: Masa de agua en fase sólida en función del tiempo
-        self.log_message("\n📊 TABLA 2: MASA DE AGUA EN FASE SÓLIDA EN FUNCIÓN DEL TIEMPO")
-        self.log_message("-" * 60)
-        self.log_message(f"{'Tiempo (s)':<12} {'Tiempo (min)':<15} {'Masa Sólida (kg)':<18}")
-        self.log_message("-" * 60)
-        
-        for i, tiempo in enumerate(tiempos):
-            if tiempo <= 60 or tiempo % 30 == 0 or i == len(tiempos) - 1:
-                minutos = tiempo / 60
-                masa_sol = masas_solidas[i]
-                self.log_message(f"{tiempo:<12.0f} {minutos:<15.2f} {masa_sol:<18.6f}")
-        
-        # Tabla 3: Masa de agua en fase líquida en función del tiempo
-        self.log_message("\n📊 TABLA 3: MASA DE AGUA EN FASE LÍQUIDA EN FUNCIÓN DEL TIEMPO")
-        self.log_message("-" * 60)
-        self.log_message(f"{'Tiempo (s)':<12} {'Tiempo (min)':<15} {'Masa Líquida (kg)':<18}")
-        self.log_message("-" * 60)
-        
-        for i, tiempo in enumerate(tiempos):
-            if tiempo <= 60 or tiempo % 30 == 0 or i == len(tiempos) - 1:
-                minutos = tiempo / 60
-                masa_liq = masas_liquidas[i]
-                self.log_message(f"{tiempo:<12.0f} {minutos:<15.2f} {masa_liq:<18.6f}")
-        
-        # Tabla 4: Masa de agua en fase vapor en función del tiempo
-        self.log_message("\n📊 TABLA 4: MASA DE AGUA EN FASE VAPOR EN FUNCIÓN DEL TIEMPO")
-        self.log_message("-" * 60)
-        self.log_message(f"{'Tiempo (s)':<12} {'Tiempo (min)':<15} {'Masa Vapor (kg)':<18}")
-        self.log_message("-" * 60)
-        
-        for i, tiempo in enumerate(tiempos):
-            if tiempo <= 60 or tiempo % 30 == 0 or i == len(tiempos) - 1:
-                minutos = tiempo / 60
-                masa_vap = masas_vapor[i]
-                self.log_message(f"{tiempo:<12.0f} {minutos:<15.2f} {masa_vap:<18.6f}")
-        
-        # Tabla combinada: Todas las fases
-        self.log_message("\n📊 TABLA COMBINADA: TODAS LAS FASES EN FUNCIÓN DEL TIEMPO")
-        self.log_message("-" * 90)
-        self.log_message(f"{'Tiempo':<8} {'Temp':<8} {'M.Sólida':<10} {'M.Líquida':<11} {'M.Vapor':<10} {'Total':<8}")
-        self.log_message(f"{'(s)':<8} {'(°C)':<8} {'(kg)':<10} {'(kg)':<11} {'(kg)':<10} {'(kg)':<8}")
-        self.log_message("-" * 90)
-        
-        for i, tiempo in enumerate(tiempos):
-            if tiempo <= 60 or tiempo % 30 == 0 or i == len(tiempos) - 1:
-                temp = temperaturas[i]
-                masa_sol = masas_solidas[i]
-                masa_liq = masas_liquidas[i]
-                masa_vap = masas_vapor[i]
-                total = masa_sol + masa_liq + masa_vap
-                
-                self.log_message(f"{tiempo:<8.0f} {temp:<8.2f} {masa_sol:<10.6f} {masa_liq:<11.6f} {masa_vap:<10.6f} {total:<8.6f}")
-        
-        self.log_message("\n" + "="*80)
-        self.log_message("FIN DE TABLAS DETALLADAS")
-        self.log_message("="*80)
-    
     def iniciar_simulacion(self):
-        if self.simulacion_activa:
-            return
-        
+        """Añade una corrida con los parámetros actuales a la cola de simulaciones"""
         try:
             temp_inicial = float(self.temp_inicial_var.get())
             masa_total = float(self.masa_var.get())
@@ -238,269 +539,503 @@ class SimuladorCalentamientoGUI:
                 self.log_message("Error: La temperatura no puede ser menor al cero absoluto (-273.15°C).")
                 return
             
-            self.results_text.delete(1.0, tk.END)
-            
-            self.simular_btn.config(state='disabled')
-            self.progress.start()
-            self.simulacion_activa = True
-            self.update_status("Simulando...", "orange")
-            
-            thread = threading.Thread(target=self.ejecutar_simulacion,
-                                    args=(temp_inicial, masa_total, potencia, presion_kpa))
-            thread.daemon = True
-            thread.start()
-            
-            self.root.after(100, self.check_simulation_complete)
-            
         except ValueError:
             self.log_message("Error: Por favor ingrese valores numéricos válidos.")
             self.update_status("Error en parámetros", "red")
+            return
+        
+        parametros = {'temp_inicial': temp_inicial, 'masa_total': masa_total,
+                      'potencia': potencia, 'presion_kpa': presion_kpa}
+        # Corridas terminadas (la más reciente primero) desde cuyos puntos de control se puede reanudar
+        anteriores = [c['resultados'] for c in reversed(self.corridas.values()) if c['resultados'] is not None]
+        corrida = self.agregar_corrida(parametros, "En cola")
+        corrida['cancelar'] = threading.Event()
+        self.pool.submit(self.ejecutar_simulacion, corrida['id'], corrida['cancelar'], parametros, anteriores)
+        
+        self.cancelar_btn.config(state='normal')
+        self.update_status(f"{self.corridas_activas()} simulación(es) en curso", "orange")
+    
+    def agregar_corrida(self, parametros, estado):
+        """Registra una corrida en el historial y en la lista de corridas"""
+        numero = self.siguiente_corrida
+        self.siguiente_corrida += 1
+        etiqueta = (f"#{numero}: {parametros.get('temp_inicial', '?')} °C, {parametros.get('masa_total', '?')} kg, "
+                    f"{parametros.get('potencia', '?')} W, {parametros.get('presion_kpa', '?')} kPa")
+        corrida = {'id': numero, 'etiqueta': etiqueta, 'parametros': parametros, 'estado': estado,
+                   'resultados': None, 'cancelar': None,
+                   'color': COLORES_CORRIDAS[(numero - 1) % len(COLORES_CORRIDAS)]}
+        self.corridas[numero] = corrida
+        self.corridas_tree.insert('', tk.END, iid=str(numero), values=(etiqueta, estado))
+        return corrida
+    
+    def cambiar_estado(self, numero, estado):
+        corrida = self.corridas.get(numero)
+        if corrida is None:
+            return
+        corrida['estado'] = estado
+        self.corridas_tree.item(str(numero), values=(corrida['etiqueta'], estado))
+    
+    def en_curso(self, corrida):
+        return corrida['estado'] in ("En cola", "Ejecutando") or corrida['estado'].endswith('%')
+    
+    def corridas_activas(self):
+        return sum(1 for corrida in self.corridas.values() if self.en_curso(corrida))
     
-    def ejecutar_simulacion(self, temp_inicial, masa_total, potencia, presion_kpa):
-        """Ejecuta la simulación en un thread separado"""
+    def recortar_historial(self, conservar=None):
+        """Descarta las corridas que terminaron antes por encima de MAX_HISTORIAL, salvo `conservar`
+
+        Cuentan todas las que ya no se ejecutan: terminadas, canceladas, con error o abiertas de archivo.
+        """
+        # self.corridas guarda las finalizadas en orden de finalización (ver procesar_mensajes)
+        terminadas = [numero for numero, corrida in self.corridas.items()
+                      if not self.en_curso(corrida) and numero != conservar]
+        for numero in terminadas[:max(len(terminadas) + (conservar is not None) - MAX_HISTORIAL, 0)]:
+            del self.corridas[numero]
+            self.corridas_tree.delete(str(numero))
+    
+    def quitar_corridas(self):
+        """Quita de la lista las corridas seleccionadas que ya no se están ejecutando"""
+        for iid in self.corridas_tree.selection():
+            corrida = self.corridas.get(int(iid))
+            if corrida is not None and corrida['cancelar'] is not None and not corrida['cancelar'].is_set() \
+                    and corrida['resultados'] is None and corrida['estado'] not in ("Error", "Cancelada"):
+                continue
+            self.corridas.pop(int(iid), None)
+            self.corridas_tree.delete(iid)
+        self.seleccionar_corridas()
+    
+    def cancelar_simulacion(self):
+        """Cancela las corridas seleccionadas que siguen pendientes, o todas si no hay selección"""
+        seleccion = {int(iid) for iid in self.corridas_tree.selection()}
+        for numero, corrida in self.corridas.items():
+            if corrida['cancelar'] is None or corrida['resultados'] is not None:
+                continue
+            if not seleccion or numero in seleccion:
+                corrida['cancelar'].set()
+        self.update_status("Cancelando...", "orange")
+    
+    def ejecutar_simulacion(self, numero, cancelar, parametros, anteriores=()):
+        """Ejecuta una corrida en un thread del pool"""
+        if cancelar.is_set():
+            self.result_queue.put(('cancelado', numero, None))
+            return
+        self.result_queue.put(('inicio', numero, None))
         try:
-            resultados = self.simular_calentamiento(temp_inicial, masa_total, potencia, presion_kpa)
-            self.result_queue.put(('success', resultados))
+            resultados = self.simular_calentamiento(
+                parametros['temp_inicial'], parametros['masa_total'], parametros['potencia'],
+                parametros['presion_kpa'],
+                al_recibir_bloque=lambda bloque: self.result_queue.put(('bloque', numero, bloque)),
+                cancelar=cancelar, prefijo=f"[#{numero}] ", anteriores=anteriores)
+            if resultados is None:
+                self.result_queue.put(('cancelado', numero, None))
+            else:
+                self.result_queue.put(('success', numero, resultados))
         except Exception as e:
-            self.result_queue.put(('error', str(e)))
+            self.result_queue.put(('error', numero, str(e)))
     
     def check_simulation_complete(self):
-        """Verifica si la simulación ha terminado"""
+        """Procesa los mensajes de las corridas en curso; se reprograma mientras viva la ventana"""
         try:
-            result_type, result_data = self.result_queue.get_nowait()
-            
-            self.progress.stop()
-            self.simular_btn.config(state='normal')
-            self.simulacion_activa = False
-            
-            if result_type == 'success':
-                self.resultados = result_data
-                self.update_graphs()
-                self.update_status("Simulación completada", "green")
-            else:
-                self.log_message(f"Error durante la simulación: {result_data}")
-                self.update_status("Error en simulación", "red")
+            self.procesar_mensajes()
+        finally:
+            # Se reprograma aunque falle un mensaje para no dejar de atender las corridas
+            self.root.after(100, self.check_simulation_complete)
+    
+    def procesar_mensajes(self):
+        """Vacía la cola de mensajes de las corridas y actualiza la lista y las gráficas"""
+        nuevos_bloques = False
+        try:
+            while True:
+                result_type, numero, result_data = self.result_queue.get_nowait()
+                
+                if numero not in self.corridas:
+                    # Corrida cancelada y quitada de la lista antes de terminar
+                    if numero == self.corrida_viva:
+                        self.corrida_viva = None
+                        self.bloques_vivos = []
+                    continue
+                
+                if result_type == 'inicio':
+                    self.cambiar_estado(numero, "Ejecutando")
+                    # Se dibuja en vivo la última corrida que ha empezado
+                    self.corrida_viva = numero
+                    self.bloques_vivos = []
+                    parametros = self.corridas[numero]['parametros']
+                    self.preparar_graficas(calcular_temperatura_saturacion(parametros['presion_kpa']))
+                    self.progress['value'] = 0
+                    continue
+                
+                if result_type == 'bloque':
+                    masa_total = self.corridas[numero]['parametros']['masa_total']
+                    self.cambiar_estado(numero, f"{100 * result_data['masa_vapor'][-1] / masa_total:.0f}%")
+                    if numero == self.corrida_viva:
+                        self.bloques_vivos.append(result_data)
+                        nuevos_bloques = True
+                    continue
+                
+                if numero == self.corrida_viva:
+                    self.corrida_viva = None
+                    self.bloques_vivos = []
+                    nuevos_bloques = False
+                
+                self.corridas.move_to_end(numero)
+                if result_type == 'success':
+                    corrida = self.corridas[numero]
+                    corrida['resultados'] = result_data
+                    self.cambiar_estado(numero, "Terminada")
+                    self.recortar_historial(conservar=numero)
+                    self.progress['value'] = 100
+                    # La corrida recién terminada pasa a ser la seleccionada, salvo que el usuario
+                    # haya elegido otras: esa selección no se toca
+                    seleccion = tuple(self.corridas_tree.selection())
+                    if not seleccion or seleccion == self.seleccion_automatica:
+                        self.corridas_tree.selection_set(str(numero))
+                        self.seleccion_automatica = (str(numero),)
+                    self.seleccionar_corridas()
+                    if self.mostrar_tablas_var.get():
+                        self.tabla.cargar(self.resultados)
+                elif result_type == 'cancelado':
+                    self.cambiar_estado(numero, "Cancelada")
+                    self.recortar_historial(conservar=numero)
+                else:
+                    self.cambiar_estado(numero, "Error")
+                    self.recortar_historial(conservar=numero)
+                    self.log_message(f"Error durante la simulación #{numero}: {result_data}")
+                
+                activas = self.corridas_activas()
+                if activas:
+                    self.update_status(f"{activas} simulación(es) en curso", "orange")
+                else:
+                    self.cancelar_btn.config(state='disabled')
+                    self.update_status("Simulaciones completadas" if result_type == 'success' 
+                                       else "Simulación cancelada" if result_type == 'cancelado'
+                                       else "Error en simulación",
+                                       "green" if result_type == 'success' else "red")
                 
         except queue.Empty:
-            self.root.after(100, self.check_simulation_complete)
+            pass
+        
+        if nuevos_bloques:
+            self.dibujar_bloques_vivos()
     
-    def update_graphs(self):
-        """Actualiza las gráficas con los resultados"""
-        if not self.resultados:
+    def seleccionar_corridas(self, event=None):
+        """Dibuja la primera corrida terminada seleccionada y superpone las demás"""
+        seleccionadas = [self.corridas[int(iid)] for iid in self.corridas_tree.selection()
+                         if int(iid) in self.corridas and self.corridas[int(iid)]['resultados'] is not None]
+        if not seleccionadas:
             return
         
-        self.ax1.clear()
-        self.ax2.clear()
-        self.ax3.clear()
-        self.ax4.clear()
-        
-        tiempos_min = [t/60 for t in self.resultados['tiempo']]
-        temp_saturacion = self.resultados.get('temp_saturacion', 100)
-        
-        self.ax1.plot(tiempos_min, self.resultados['temperatura'], 'r-', linewidth=2)
-        self.ax1.axhline(y=0, color='b', linestyle='--', alpha=0.7, label='Punto de fusión')
-        self.ax1.axhline(y=temp_saturacion, color='g', linestyle='--', alpha=0.7, 
-                        label=f'Punto de ebullición ({temp_saturacion:.1f}°C)')
-        self.ax1.set_xlabel('Tiempo (minutos)')
-        self.ax1.set_ylabel('Temperatura (°C)')
-        self.ax1.set_title('Temperatura vs Tiempo')
-        self.ax1.grid(True, alpha=0.3)
-        self.ax1.legend()
+        principal = seleccionadas[0]
+        self.resultados = principal['resultados']
+        self.parametros = principal['parametros']
+        self.comparadas = seleccionadas[1:]
+        self.exportar_btn.config(state='normal')
+        if self.corrida_viva is None:
+            self.update_graphs()
+        else:
+            self.dibujar_comparadas()
+            self.canvas.draw_idle()
+    
+    def exportar_resultados(self):
+        """Guarda la trayectoria actual en CSV, NPZ o Parquet"""
+        if not self.resultados:
+            return
         
-        self.ax2.plot(tiempos_min, self.resultados['masa_solida'], 'b-', linewidth=2, label='Masa sólida')
-        self.ax2.set_xlabel('Tiempo (minutos)')
-        self.ax2.set_ylabel('Masa (kg)')
-        self.ax2.set_title('Masa Sólida vs Tiempo')
-        self.ax2.grid(True, alpha=0.3)
-        self.ax2.legend()
+        ruta = filedialog.asksaveasfilename(
+            defaultextension=".npz",
+            filetypes=[("NumPy (NPZ)", "*.npz"), ("CSV", "*.csv"), ("Parquet", "*.parquet")])
+        if not ruta:
+            return
         
-        self.ax3.plot(tiempos_min, self.resultados['masa_liquida'], 'g-', linewidth=2, label='Masa líquida')
-        self.ax3.set_xlabel('Tiempo (minutos)')
-        self.ax3.set_ylabel('Masa (kg)')
-        self.ax3.set_title('Masa Líquida vs Tiempo')
-        self.ax3.grid(True, alpha=0.3)
-        self.ax3.legend()
+        try:
+            exportar.exportar_resultados(ruta, self.resultados, self.parametros)
+            self.update_status(f"Exportado a {ruta}", "green")
+        except (ValueError, ImportError, OSError) as e:
+            self.log_message(f"Error al exportar: {e}")
+            self.update_status("Error al exportar", "red")
+    
+    def abrir_resultados(self):
+        """Carga una trayectoria exportada (mapeada en memoria) como una corrida más"""
+        ruta = filedialog.askopenfilename(
+            filetypes=[("Trayectorias", "*.npz *.csv *.parquet"), ("Todos", "*.*")])
+        if not ruta:
+            return
         
-        self.ax4.plot(tiempos_min, self.resultados['masa_solida'], 'b-', linewidth=2, label='Sólida')
-        self.ax4.plot(tiempos_min, self.resultados['masa_liquida'], 'g-', linewidth=2, label='Líquida')
-        self.ax4.plot(tiempos_min, self.resultados['masa_vapor'], 'r-', linewidth=2, label='Vapor')
-        self.ax4.set_xlabel('Tiempo (minutos)')
-        self.ax4.set_ylabel('Masa (kg)')
-        self.ax4.set_title('Todas las Fases vs Tiempo')
-        self.ax4.grid(True, alpha=0.3)
-        self.ax4.legend()
+        try:
+            self.resultados = exportar.cargar_trayectoria(ruta)
+        except (ValueError, ImportError, OSError, KeyError) as e:
+            self.log_message(f"Error al abrir: {e}")
+            self.update_status("Error al abrir", "red")
+            return
         
-        self.fig.tight_layout()
-        self.canvas.draw()
+        corrida = self.agregar_corrida(self.resultados['metadatos'], "Archivo")
+        corrida['resultados'] = self.resultados
+        self.recortar_historial(conservar=corrida['id'])
+        self.corridas_tree.selection_set(str(corrida['id']))
+        self.seleccionar_corridas()
+        if self.mostrar_tablas_var.get():
+            self.tabla.cargar(self.resultados)
+        self.update_status(f"Cargado {ruta}", "green")
     
-    def calcular_temperatura_saturacion(self, presion_kpa):
-        """Calcula la temperatura de saturación del agua según la presión usando la ecuación de Antoine."""
-        presion_mmhg = presion_kpa * 7.50062
-        
-        A = 8.07131
-        B = 1730.63
-        C = 233.426
+    def iniciar_montecarlo(self):
+        if self.montecarlo_activo:
+            return
         
-        if presion_mmhg <= 0:
-            return 100.0 
+        try:
+            nominales = (float(self.temp_inicial_var.get()), float(self.masa_var.get()),
+                         float(self.potencia_var.get()), float(self.presion_var.get()))
+            n_muestras = int(self.mc_muestras_var.get())
+            dispersion = {'potencia': float(self.mc_potencia_var.get()) / 100,
+                          'masa_total': float(self.mc_masa_var.get()) / 100,
+                          'presion_kpa': float(self.mc_presion_var.get()) / 100}
+        except ValueError:
+            self.update_status("Error en parámetros de Monte Carlo", "red")
+            return
         
-        temp_sat = B / (A - np.log10(presion_mmhg)) - C
-        return temp_sat
-
-    def calcular_entalpia_vaporizacion(self, temperatura):
-        """Calcula la entalpía de vaporización según la fórmula dada."""
-        T_kelvin = temperatura + 273.15
-        T_critica = 647.0969
+        if n_muestras <= 0 or min(nominales[1:]) <= 0:
+            self.update_status("Error en parámetros de Monte Carlo", "red")
+            return
         
-        if T_kelvin >= T_critica:
-            return 0.0
+        self.montecarlo_cancelar.clear()
+        self.montecarlo_activo = True
+        self.mc_btn.config(state='disabled')
+        self.mc_cancelar_btn.config(state='normal')
+        self.mc_progress['value'] = 0
+        self.mc_texto.delete(1.0, tk.END)
+        self.update_status("Ejecutando Monte Carlo...", "orange")
         
-        h_vap_kj_kg = 2256.4 * (1 - T_kelvin / T_critica) ** 0.38
-        return h_vap_kj_kg * 1000
-
-    def simular_calentamiento(self, temp_inicial, masa_total, potencia, presion_kpa):
-        """Función principal de simulación"""
+        thread = threading.Thread(target=self.ejecutar_montecarlo,
+                                  args=(nominales, n_muestras, dispersion, self.mc_distribucion_var.get()))
+        thread.daemon = True
+        thread.start()
         
-        self.log_message("=== SIMULADOR DE CURVA DE CALENTAMIENTO DEL AGUA ===\n")
+        self.root.after(100, self.check_montecarlo)
+    
+    def ejecutar_montecarlo(self, nominales, n_muestras, dispersion, distribucion):
+        """Ejecuta el Monte Carlo en un thread separado; con muchas muestras el trabajo va a un pool de procesos"""
+        try:
+            resultados = montecarlo.montecarlo(
+                *nominales, n_muestras, dispersion, distribucion=distribucion,
+                cancelar=self.montecarlo_cancelar,
+                al_progresar=lambda hechas, total, medias: self.montecarlo_queue.put(
+                    ('progreso', (hechas, total, medias))))
+            self.montecarlo_queue.put(('success', resultados))
+        except Exception as e:
+            self.montecarlo_queue.put(('error', str(e)))
+    
+    def check_montecarlo(self):
+        """Muestra el progreso parcial y, al terminar, los percentiles e histograma"""
+        try:
+            while True:
+                tipo, datos = self.montecarlo_queue.get_nowait()
+                
+                if tipo == 'progreso':
+                    hechas, total, medias = datos
+                    self.mc_progress['value'] = 100 * hechas / total
+                    self.update_status(f"Monte Carlo: {hechas}/{total} muestras, tiempo medio "
+                                       f"{medias['tiempo_total'] / 60:.1f} min", "orange")
+                    continue
+                
+                self.montecarlo_activo = False
+                self.mc_btn.config(state='normal')
+                self.mc_cancelar_btn.config(state='disabled')
+                
+                if tipo == 'success':
+                    self.mostrar_montecarlo(datos)
+                else:
+                    self.update_status(f"Error en Monte Carlo: {datos}", "red")
+                return
+        except queue.Empty:
+            self.root.after(100, self.check_montecarlo)
+    
+    def mostrar_montecarlo(self, resultados):
+        if resultados['muestras'] == 0:
+            self.update_status("Monte Carlo cancelado", "red")
+            return
         
-        cp_agua = 4186
-        cp_hielo = 2090
-        lf = 333000
+        nombres = {'tiempo_fusion': 'Fin de fusión (min)', 'tiempo_ebullicion': 'Inicio ebullición (min)',
+                   'tiempo_total': 'Evaporización total (min)', 'energia_total': 'Energía total (kJ)'}
+        escalas = {'tiempo_fusion': 60, 'tiempo_ebullicion': 60, 'tiempo_total': 60, 'energia_total': 1000}
+        
+        lineas = [f"Muestras: {resultados['muestras']}", "",
+                  f"{'Salida':<28}" + "".join(f"{'P' + str(p):>10}" for p in montecarlo.PERCENTILES)]
+        for salida, nombre in nombres.items():
+            valores = resultados['percentiles'][salida].values()
+            lineas.append(f"{nombre:<28}" + "".join(f"{v / escalas[salida]:>10.2f}" for v in valores))
+        self.mc_texto.insert(tk.END, "\n".join(lineas) + "\n")
+        
+        conteos, bordes = resultados['histogramas']['tiempo_total']
+        self.mc_ax.clear()
+        self.mc_ax.stairs(conteos, bordes / 60, fill=True, alpha=0.7)
+        self.mc_ax.set_title('Distribución del tiempo de evaporización total')
+        self.mc_ax.set_xlabel('Tiempo (minutos)')
+        self.mc_ax.set_ylabel('Muestras')
+        self.mc_ax.grid(True, alpha=0.3)
+        self.mc_fig.tight_layout()
+        self.mc_canvas.draw_idle()
+        
+        self.mc_progress['value'] = 100
+        self.update_status("Monte Carlo completado", "green")
+    
+    def dibujar_bloques_vivos(self):
+        """Extiende las líneas con los bloques recibidos hasta ahora"""
+        parcial = simulador.unir_bloques(self.bloques_vivos)
+        self.bloques_vivos = [parcial]
         
-        temp_saturacion = self.calcular_temperatura_saturacion(presion_kpa)
+        masa_total = parcial['masa_solida'][-1] + parcial['masa_liquida'][-1] + parcial['masa_vapor'][-1]
+        self.progress['value'] = 100 * parcial['masa_vapor'][-1] / masa_total
         
-        self.log_message(f"Parámetros de simulación:")
-        self.log_message(f"• Temperatura inicial: {temp_inicial} °C")
-        self.log_message(f"• Masa: {masa_total} kg")
-        self.log_message(f"• Potencia: {potencia} W")
-        self.log_message(f"• Presión: {presion_kpa} kPa")
-        self.log_message(f"• Temperatura de saturación: {temp_saturacion:.2f} °C\n")
+        self.actualizar_lineas(parcial)
+        self.canvas.draw_idle()
+    
+    def preparar_graficas(self, temp_saturacion):
+        """Vacía las líneas existentes y ajusta la referencia de ebullición"""
+        for linea, _ in self.lineas:
+            linea.set_data([], [])
         
-        tiempo = 0
-        dt = 1
-        temperatura = temp_inicial
+        self.linea_saturacion.set_ydata([temp_saturacion, temp_saturacion])
+        self.linea_saturacion.set_label(f'Punto de ebullición ({temp_saturacion:.1f}°C)')
+        self.ax1.legend()
+    
+    def actualizar_lineas(self, series):
+        """Asigna a las líneas existentes una versión decimada de `series` y reajusta los ejes"""
+        tiempos, decimadas = graficas.decimar(series, simulador.COLUMNAS[1:])
+        tiempos_min = tiempos / 60
+        for linea, clave in self.lineas:
+            linea.set_data(tiempos_min, decimadas[clave])
+        
+        for ax in (self.ax1, self.ax2, self.ax3, self.ax4):
+            ax.relim()
+            ax.autoscale_view()
+    
+    def dibujar_comparadas(self):
+        """Sustituye las líneas superpuestas por las de las corridas en `self.comparadas`"""
+        for linea in self.lineas_comparadas:
+            linea.remove()
+        self.lineas_comparadas = []
+        
+        for corrida in self.comparadas:
+            tiempos, decimadas = graficas.decimar(corrida['resultados'], simulador.COLUMNAS[1:])
+            tiempos_min = tiempos / 60
+            estilo = {'color': corrida['color'], 'linewidth': 1.5, 'alpha': 0.8}
+            etiqueta = corrida['etiqueta'].split(':')[0]
+            self.lineas_comparadas += self.ax1.plot(tiempos_min, decimadas['temperatura'], label=etiqueta, **estilo)
+            self.lineas_comparadas += self.ax2.plot(tiempos_min, decimadas['masa_solida'], label=etiqueta, **estilo)
+            self.lineas_comparadas += self.ax3.plot(tiempos_min, decimadas['masa_liquida'], label=etiqueta, **estilo)
+            for clave, trazo in (('masa_solida', ':'), ('masa_liquida', '--'), ('masa_vapor', '-')):
+                self.lineas_comparadas += self.ax4.plot(tiempos_min, decimadas[clave], linestyle=trazo, **estilo)
+        
+        for ax in (self.ax1, self.ax2, self.ax3, self.ax4):
+            ax.relim()
+            ax.autoscale_view()
+            ax.legend()
+    
+    def update_graphs(self):
+        """Actualiza las gráficas con los resultados y las corridas superpuestas"""
+        if not self.resultados:
+            return
         
-        if temperatura < 0:
-            masa_solida = masa_total
-            masa_liquida = 0
-            masa_vapor = 0
+        self.preparar_graficas(self.resultados.get('temp_saturacion', 100))
+        self.actualizar_lineas(self.resultados)
+        if self.comparadas or self.lineas_comparadas:
+            self.dibujar_comparadas()
+        self.canvas.draw_idle()
+    
+    def simular_calentamiento(self, temp_inicial, masa_total, potencia, presion_kpa,
+                              al_recibir_bloque=None, cancelar=None, prefijo="", anteriores=()):
+        """Función principal de simulación
+        
+        Cada bloque de la trayectoria se entrega a `al_recibir_bloque` en cuanto
+        se calcula. Devuelve None si se activa el evento `cancelar`. Cada línea
+        del registro empieza por `prefijo` para distinguir corridas simultáneas.
+        Si alguna de las corridas `anteriores` comparte fases con esta, se
+        reanuda desde su punto de control y la trayectoria llega en un solo bloque.
+        """
+        def log_message(mensaje):
+            self.log_message("\n".join(prefijo + linea if linea else linea for linea in mensaje.split("\n")))
+        
+        log_message("=== SIMULADOR DE CURVA DE CALENTAMIENTO DEL AGUA ===\n")
+        
+        temp_saturacion = calcular_temperatura_saturacion(presion_kpa)
+        
+        log_message(f"Parámetros de simulación:")
+        log_message(f"• Temperatura inicial: {temp_inicial} °C")
+        log_message(f"• Masa: {masa_total} kg")
+        log_message(f"• Potencia: {potencia} W")
+        log_message(f"• Presión: {presion_kpa} kPa")
+        log_message(f"• Temperatura de saturación: {temp_saturacion:.2f} °C\n")
+        
+        # El paso crece en corridas largas para que la trayectoria no pase de MAX_MUESTRAS muestras
+        opciones = {'max_muestras': simulador.MAX_MUESTRAS}
+        plan = (simulador.planificar_reanudacion(anteriores, temp_inicial, masa_total, potencia, presion_kpa,
+                                                 **opciones)
+                if anteriores else None)
+        if plan is not None:
+            reanudada = simulador.reanudar_calentamiento(anteriores, temp_inicial, masa_total, potencia, presion_kpa,
+                                                         **opciones)
+            log_message(f"Reanudando desde un punto de control: se reutilizan "
+                        f"{reanudada['reanudacion']['muestras']} muestras "
+                        f"({', '.join(reanudada['reanudacion']['fases'])}).")
+            generador = [reanudada]
         else:
-            masa_solida = 0
-            masa_liquida = masa_total
-            masa_vapor = 0
-        
-        tiempos = []
-        temperaturas = []
-        masas_solidas = []
-        masas_liquidas = []
-        masas_vapor = []
-        
-        self.log_message("Iniciando simulación...")
-        
-        energia_total_usada = 0
-        max_iteraciones = 100000
-        iteraciones = 0
-        
-        while masa_vapor < (masa_total - 1e-6) and iteraciones < max_iteraciones:
-            energia = potencia * dt
-            energia_restante = energia
-            energia_total_usada += energia
-            
-            if masa_solida > 1e-6 and temperatura < 0:
-                
-                energia_necesaria = masa_solida * cp_hielo * (0 - temperatura)
-                
-                if energia_restante >= energia_necesaria:
-                    energia_restante -= energia_necesaria
-                    temperatura = 0.0
-                else:
-                    delta_t = energia_restante / (masa_solida * cp_hielo)
-                    temperatura += delta_t
-                    energia_restante = 0
-            
-            elif masa_solida > 1e-6 and temperatura == 0:
-               
-                energia_fusion_total = masa_solida * lf
-                if energia_restante >= energia_fusion_total:
-                    energia_restante -= energia_fusion_total
-                    masa_liquida += masa_solida
-                    masa_solida = 0.0
-                else:
-                    masa_fundida = energia_restante / lf
-                    masa_fundida = min(masa_fundida, masa_solida)
-                    masa_solida -= masa_fundida
-                    masa_liquida += masa_fundida
-                    energia_restante = 0
+            log_message("Iniciando simulación...")
+            # Los bloques comparten un búfer: unir_bloques no duplica la trayectoria
+            generador = simulador.simular_por_bloques(temp_inicial, masa_total, potencia, presion_kpa,
+                                                      bufer_unico=True, **opciones)
+        
+        bloques = []
+        for bloque in generador:
+            if cancelar is not None and cancelar.is_set():
+                log_message("\nSimulación cancelada por el usuario.")
+                return None
             
-            elif masa_liquida > 1e-6 and temperatura < temp_saturacion:
-                
-                energia_necesaria = masa_liquida * cp_agua * (temp_saturacion - temperatura)
-                if energia_restante >= energia_necesaria:
-                    energia_restante -= energia_necesaria
-                    temperatura = temp_saturacion
-                else:
-                    delta_t = energia_restante / (masa_liquida * cp_agua)
-                    temperatura += delta_t
-                    energia_restante = 0
-            
-            elif masa_liquida > 1e-6 and temperatura >= temp_saturacion:
-               
-                lv = self.calcular_entalpia_vaporizacion(temperatura)
-                
-                if lv > 0:
-                    masa_vaporizada = energia_restante / lv
-                    masa_vaporizada = min(masa_vaporizada, masa_liquida)
-                    masa_liquida -= masa_vaporizada
-                    masa_vapor += masa_vaporizada
-                    energia_restante = 0
-                else:
-                    masa_vapor += masa_liquida
-                    masa_liquida = 0.0
-                    energia_restante = 0
-            
-            tiempos.append(tiempo)
-            temperaturas.append(temperatura)
-            masas_solidas.append(masa_solida)
-            masas_liquidas.append(masa_liquida)
-            masas_vapor.append(masa_vapor)
-        
-            if tiempo % 300 == 0:  
-                porcentaje_evaporizado = (masa_vapor / masa_total) * 100
-                self.log_message(f"Tiempo: {tiempo:6.0f} s | Temp: {temperatura:7.2f} °C | "
+            for i in np.flatnonzero(bloque['tiempo'] % 300 == 0):
+                porcentaje_evaporizado = (bloque['masa_vapor'][i] / masa_total) * 100
+                log_message(f"Tiempo: {bloque['tiempo'][i]:6.0f} s | Temp: {bloque['temperatura'][i]:7.2f} °C | "
                                f"Evaporizado: {porcentaje_evaporizado:5.1f}%")
             
-            tiempo += dt
-            iteraciones += 1
-        
-        if iteraciones >= max_iteraciones:
-            self.log_message(f"\nAdvertencia: Se alcanzó el límite de {max_iteraciones} iteraciones.")
-        else:
-            self.log_message(f"\n🎉 ¡EVAPORIZACIÓN COMPLETA! 🎉")
-        
-        self.log_message(f"\n=== SIMULACIÓN COMPLETADA ===")
-        self.log_message(f"Tiempo total: {tiempo:.0f} segundos ({tiempo/60:.1f} minutos)")
-        self.log_message(f"Temperatura final: {temperatura:.2f} °C")
-        self.log_message(f"Masa evaporizada: {masa_vapor:.6f} kg")
-        self.log_message(f"Porcentaje evaporizado: {(masa_vapor/masa_total)*100:.3f}%")
-        self.log_message(f"Energía total usada: {energia_total_usada:,.0f} J ({energia_total_usada/1000:.1f} kJ)")
-        
-        # Imprimir tablas detalladas (se puede desactivar)
-        if self.mostrar_tablas_var.get():
-            self.imprimir_tablas_detalladas(tiempos, temperaturas, masas_solidas, masas_liquidas, masas_vapor)
-        
-        return {
-            'tiempo': tiempos,
-            'temperatura': temperaturas,
-            'masa_solida': masas_solidas,
-            'masa_liquida': masas_liquidas,
-            'masa_vapor': masas_vapor,
-            'temp_saturacion': temp_saturacion
-        }
+            bloques.append(bloque)
+            if al_recibir_bloque is not None:
+                al_recibir_bloque(bloque)
+        
+        resultados = simulador.unir_bloques(bloques) if len(bloques) > 1 else bloques[0]
+        
+        tiempos = resultados['tiempo']
+        temperaturas = resultados['temperatura']
+        masas_vapor = resultados['masa_vapor']
+        
+        for nombre, t_fase in zip(simulador.NOMBRES_FASES, resultados['tiempos_fase']):
+            log_message(f"Fin de fase '{nombre}': {t_fase:.1f} s")
+        
+        log_message(f"\n🎉 ¡EVAPORIZACIÓN COMPLETA! 🎉")
+        
+        tiempo = resultados['tiempo_total']
+        energia_total_usada = resultados['energia_total']
+        log_message(f"\n=== SIMULACIÓN COMPLETADA ===")
+        log_message(f"Tiempo total: {tiempo:.0f} segundos ({tiempo/60:.1f} minutos)")
+        log_message(f"Temperatura final: {temperaturas[-1]:.2f} °C")
+        log_message(f"Masa evaporizada: {masas_vapor[-1]:.6f} kg")
+        log_message(f"Porcentaje evaporizado: {(masas_vapor[-1]/masa_total)*100:.3f}%")
+        log_message(f"Energía total usada: {energia_total_usada:,.0f} J ({energia_total_usada/1000:.1f} kJ)")
+        
+        diagnostico = resultados['diagnostico']
+        log_message(f"\n=== DIAGNÓSTICO POR FASE ===")
+        log_message(f"{'Fase':<26} {'Fin (s)':>10} {'Energía (kJ)':>13} {'Muestras':>9} {'Cálculo (ms)':>13}")
+        for fase in diagnostico['fases']:
+            log_message(f"{fase['nombre']:<26} {fase['tiempo_fin']:>10.1f} {fase['energia']/1000:>13.1f} "
+                           f"{fase['muestras']:>9} {fase['segundos']*1000:>13.3f}")
+        log_message(f"Calor sensible: {diagnostico['energia_sensible']/1000:.1f} kJ | "
+                       f"Calor latente: {diagnostico['energia_latente']/1000:.1f} kJ")
+        log_message(f"Residuo del balance de energía: {diagnostico['residuo_energia']:.3g} J "
+                       f"({diagnostico['residuo_relativo']:.2e} relativo)")
+        
+        return resultados
 
 def main():
     root = tk.Tk()
     app = SimuladorCalentamientoGUI(root)
     root.mainloop()
+    app.cerrar()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
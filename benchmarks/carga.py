@@ -0,0 +1,175 @@
+"""Prueba de carga del servicio HTTP de simulación.
+
+Uso:
+    python benchmarks/carga.py [--clientes 50] [--peticiones 2000] [--repetidas 0.8] [--url http://127.0.0.1:8765]
+
+Sin `--url` arranca `servicio.py` en un puerto libre de esta máquina y lo
+detiene al terminar. Cada cliente abre una conexión keep-alive y envía
+peticiones a /simular (y a /trayectoria con `--trayectorias`) hasta repartir
+`--peticiones` entre todos. Una fracción `--repetidas` usa un conjunto pequeño
+de escenarios, de modo que se ejercitan la caché y la coalescencia; el resto
+son escenarios nuevos. Se informa de las peticiones por segundo y de los
+percentiles de latencia.
+"""
+import argparse
+import asyncio
+import json
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+ESCENARIOS_REPETIDOS = [
+    {'temp_inicial': -10, 'masa_total': 1.0, 'potencia': 2000, 'presion_kpa': 101.325},
+    {'temp_inicial': 20, 'masa_total': 5.0, 'potencia': 1000, 'presion_kpa': 101.325},
+    {'temp_inicial': 20, 'masa_total': 10.0, 'potencia': 3000, 'presion_kpa': 70.0},
+    {'temp_inicial': -20, 'masa_total': 2.0, 'potencia': 1500, 'presion_kpa': 50.0},
+]
+
+
+async def peticion(lector, escritor, host, metodo, ruta, datos=None):
+    """Envía una petición por una conexión keep-alive y devuelve (estado, cuerpo)."""
+    cuerpo = json.dumps(datos).encode() if datos is not None else b''
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                   f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo)
+    await escritor.drain()
+
+    estado = int((await lector.readline()).split()[1])
+    cabeceras = {}
+    while (linea := await lector.readline()) not in (b'\r\n', b''):
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        cabeceras[nombre.strip().lower()] = valor.strip()
+
+    if cabeceras.get('transfer-encoding') == 'chunked':
+        partes = []
+        while (tamano := int((await lector.readline()).strip(), 16)) > 0:
+            partes.append(await lector.readexactly(tamano))
+            await lector.readline()
+        await lector.readline()
+        return estado, b''.join(partes)
+    return estado, await lector.readexactly(int(cabeceras.get('content-length', 0)))
+
+
+def escenario_aleatorio(generador, repetidas):
+    if generador.random() < repetidas:
+        return generador.choice(ESCENARIOS_REPETIDOS)
+    return {'temp_inicial': round(generador.uniform(-30, 80), 3), 'masa_total': round(generador.uniform(0.5, 20), 3),
+            'potencia': round(generador.uniform(500, 5000), 1), 'presion_kpa': round(generador.uniform(30, 300), 2)}
+
+
+async def cliente(host, puerto, cola, generador, repetidas, trayectorias, latencias, errores):
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    try:
+        while True:
+            try:
+                cola.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            datos = escenario_aleatorio(generador, repetidas)
+            ruta = '/trayectoria' if generador.random() < trayectorias else '/simular'
+            if ruta == '/trayectoria':
+                datos = {**datos, 'paso': 10}
+            inicio = time.perf_counter()
+            estado, _ = await peticion(lector, escritor, host, 'POST', ruta, datos)
+            latencias.append(time.perf_counter() - inicio)
+            if estado != 200:
+                errores.append(estado)
+    finally:
+        escritor.close()
+
+
+async def cargar(host, puerto, clientes, peticiones, repetidas, trayectorias, semilla):
+    cola = asyncio.Queue()
+    for i in range(peticiones):
+        cola.put_nowait(i)
+    latencias, errores = [], []
+    generador = random.Random(semilla)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(host, puerto, cola, generador, repetidas, trayectorias, latencias, errores)
+                           for _ in range(clientes)))
+    duracion = time.perf_counter() - inicio
+
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    _, cuerpo = await peticion(lector, escritor, host, 'GET', '/estado')
+    escritor.close()
+    return latencias, errores, duracion, json.loads(cuerpo)
+
+
+def arrancar_servicio(procesos):
+    """Arranca servicio.py en un puerto libre y devuelve (proceso, puerto)."""
+    argumentos = [sys.executable, str(RAIZ / 'servicio.py'), '--puerto', '0']
+    if procesos:
+        argumentos += ['--procesos', str(procesos)]
+    proceso = subprocess.Popen(argumentos, cwd=RAIZ, stdout=subprocess.PIPE, text=True)
+    linea = proceso.stdout.readline()
+    if not linea:
+        proceso.wait()
+        raise RuntimeError("El servicio no pudo arrancar.")
+    return proceso, urlsplit(linea.split()[-1]).port
+
+
+def detener_servicio(proceso, espera=30):
+    """Pide al servicio que se cierre con SIGINT y devuelve True si sale limpio a tiempo."""
+    proceso.send_signal(signal.SIGINT)
+    try:
+        codigo = proceso.wait(timeout=espera)
+    except subprocess.TimeoutExpired:
+        proceso.kill()
+        proceso.wait()
+        print(f"El servicio no se cerró en {espera} s; se ha forzado su salida.", file=sys.stderr)
+        return False
+    finally:
+        proceso.stdout.close()
+    if codigo != 0:
+        print(f"El servicio terminó con código {codigo}.", file=sys.stderr)
+    return codigo == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de simulación")
+    parser.add_argument('--url', help="servicio ya en marcha; si se omite se arranca uno local")
+    parser.add_argument('--procesos', type=int, help="tamaño del pool del servicio local")
+    parser.add_argument('--clientes', type=int, default=50)
+    parser.add_argument('--peticiones', type=int, default=2000)
+    parser.add_argument('--repetidas', type=float, default=0.8,
+                        help="fracción de peticiones con escenarios repetidos")
+    parser.add_argument('--trayectorias', type=float, default=0.0,
+                        help="fracción de peticiones que descargan la trayectoria")
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    proceso, cierre_limpio = None, True
+    if args.url:
+        partes = urlsplit(args.url)
+        host, puerto = partes.hostname, partes.port or 80
+    else:
+        proceso, puerto = arrancar_servicio(args.procesos)
+        host = '127.0.0.1'
+
+    try:
+        latencias, errores, duracion, estado = asyncio.run(cargar(
+            host, puerto, args.clientes, args.peticiones, args.repetidas, args.trayectorias, args.semilla))
+    finally:
+        if proceso is not None:
+            cierre_limpio = detener_servicio(proceso)
+
+    cuantiles = statistics.quantiles(latencias, n=100) if len(latencias) > 1 else latencias * 99
+    print(f"{len(latencias)} peticiones con {args.clientes} clientes en {duracion:.2f} s")
+    print(f"Peticiones por segundo: {len(latencias) / duracion:,.0f}")
+    print(f"Latencia p50: {cuantiles[49] * 1000:.2f} ms | p90: {cuantiles[89] * 1000:.2f} ms | "
+          f"p99: {cuantiles[98] * 1000:.2f} ms | máx: {max(latencias) * 1000:.2f} ms")
+    print(f"Errores: {len(errores)}")
+    print(f"Servicio: {estado['aciertos']} aciertos de caché, {estado['coalescidas']} coalescidas, "
+          f"{estado['fallos']} simulaciones")
+    return 1 if errores or not cierre_limpio else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Benchmarks reproducibles del simulador y de las rutas de dibujo.
+
+Uso:
+    python benchmarks/ejecutar.py [--repeticiones 5] [--umbral 0.25] [--historial ruta.json] [--aceptar]
+
+Cada caso se ejecuta varias veces y se guarda la mediana del tiempo de pared,
+la memoria pico (tracemalloc) y las muestras simuladas por segundo. La
+referencia de cada caso es la mediana de sus últimas `VENTANA_REFERENCIA`
+ejecuciones del historial JSON: si el tiempo o la memoria pico la superan por
+encima de `--umbral`, el proceso termina con código 1 y la ejecución no se
+añade al historial (salvo con `--aceptar`), de modo que una regresión no pasa
+a ser la nueva referencia.
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import conduccion
+import simulador
+
+HISTORIAL = Path(__file__).resolve().parent / 'historial.json'
+VENTANA_REFERENCIA = 5
+
+# (temperatura inicial, masa, potencia, presión); los de 100 y 500 kg superaban el antiguo límite de 100000 iteraciones
+ESCENARIOS = {
+    'simular_1kg_2000W_atm': (20, 1.0, 2000, 101.325),
+    'simular_hielo_5kg_1000W_atm': (-10, 5.0, 1000, 101.325),
+    'simular_10kg_3000W_70kPa': (20, 10.0, 3000, 70.0),
+    'simular_100kg_2000W_atm': (20, 100.0, 2000, 101.325),
+    'simular_hielo_500kg_2000W_50kPa': (-20, 500.0, 2000, 50.0),
+}
+
+
+def medir(funcion, repeticiones):
+    """Ejecuta `funcion` y devuelve (mediana de segundos, memoria pico en bytes, muestras producidas)."""
+    tiempos = []
+    muestras = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        muestras = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(tiempos), pico, muestras
+
+
+def caso_simulacion(parametros):
+    def ejecutar():
+        return len(simulador.simular_calentamiento(*parametros)['tiempo'])
+    return ejecutar
+
+
+def caso_lote():
+    import numpy as np
+    presiones, potencias = np.meshgrid(np.linspace(50, 200, 300), np.linspace(500, 5000, 300))
+
+    def ejecutar():
+        return simulador.simular_lote(20, 1.0, potencias, presiones)['tiempo_total'].size
+    return ejecutar
+
+
+def caso_reanudacion(anteriores, parametros):
+    """Reanuda `parametros` desde los puntos de control de una simulación con `anteriores`."""
+    previa = simulador.simular_calentamiento(*anteriores)
+
+    def ejecutar():
+        return len(simulador.reanudar_calentamiento([previa], *parametros)['tiempo'])
+    return ejecutar
+
+
+def caso_conduccion(parametros, **opciones):
+    def ejecutar():
+        resultados = conduccion.simular_conduccion(*parametros, **opciones)
+        return resultados['diagnostico']['pasos'] * resultados['campo_temperatura'].shape[1]
+    return ejecutar
+
+
+def caso_tablas(parametros):
+    """Genera como texto todas las filas muestreadas de la tabla combinada."""
+    resultados = simulador.simular_calentamiento(*parametros)
+
+    def ejecutar():
+        indices = simulador.indices_muestreo(resultados['tiempo'])
+        filas = [f"{resultados['tiempo'][i]:<8.0f} {resultados['temperatura'][i]:<8.2f} "
+                 f"{resultados['masa_solida'][i]:<10.6f} {resultados['masa_liquida'][i]:<11.6f} "
+                 f"{resultados['masa_vapor'][i]:<10.6f}" for i in indices]
+        return len(filas)
+    return ejecutar
+
+
+def cargar_gui():
+    """Importa el módulo de la interfaz Tk sin abrir ninguna ventana."""
+    spec = importlib.util.spec_from_file_location('termo_proyecto', RAIZ / 'Termo proyecto.py')
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def caso_update_graphs(parametros):
+    """Redibuja las cuatro gráficas con `update_graphs` de la interfaz sobre un lienzo Agg."""
+    termo = cargar_gui()
+    app = termo.SimuladorCalentamientoGUI.__new__(termo.SimuladorCalentamientoGUI)
+    app.fig = Figure(figsize=(10, 8), dpi=100)
+    app.ax1 = app.fig.add_subplot(2, 2, 1)
+    app.ax2 = app.fig.add_subplot(2, 2, 2)
+    app.ax3 = app.fig.add_subplot(2, 2, 3)
+    app.ax4 = app.fig.add_subplot(2, 2, 4)
+    app.canvas = FigureCanvasAgg(app.fig)
+    app.init_empty_graphs()
+    app.resultados = simulador.simular_calentamiento(*parametros)
+
+    def ejecutar():
+        app.update_graphs()
+        app.canvas.draw()
+        return len(app.resultados['tiempo'])
+    return ejecutar
+
+
+def construir_casos():
+    casos = {nombre: caso_simulacion(parametros) for nombre, parametros in ESCENARIOS.items()}
+    casos['simular_lote_90000_escenarios'] = caso_lote()
+    # Solo cambia la temperatura inicial del hielo; a 2090 W el desplazamiento es de 5000 muestras exactas
+    casos['reanudar_500kg_temp_inicial'] = caso_reanudacion((-20, 500.0, 2090, 50.0), (-10, 500.0, 2090, 50.0))
+    casos['reanudar_500kg_presion'] = caso_reanudacion(ESCENARIOS['simular_hielo_500kg_2000W_50kPa'],
+                                                       (-20, 500.0, 2000, 80.0))
+    casos['conduccion_100kg_2000_celdas'] = caso_conduccion(ESCENARIOS['simular_100kg_2000W_atm'],
+                                                            n_celdas=2000, area=0.2, intervalo=600)
+    casos['tablas_5kg'] = caso_tablas(ESCENARIOS['simular_hielo_5kg_1000W_atm'])
+    casos['tablas_100kg'] = caso_tablas(ESCENARIOS['simular_100kg_2000W_atm'])
+    try:
+        casos['update_graphs_5kg'] = caso_update_graphs(ESCENARIOS['simular_hielo_5kg_1000W_atm'])
+        casos['update_graphs_500kg'] = caso_update_graphs(ESCENARIOS['simular_hielo_500kg_2000W_50kPa'])
+    except ImportError as e:
+        print(f"Se omiten los casos de update_graphs: {e}", file=sys.stderr)
+    return casos
+
+
+def commit_actual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def referencia(historial, nombre, metrica, ventana=VENTANA_REFERENCIA):
+    """Mediana de `metrica` en las últimas `ventana` ejecuciones del caso `nombre`, o None si no hay."""
+    valores = [ejecucion['casos'][nombre][metrica] for ejecucion in historial
+               if ejecucion['casos'].get(nombre, {}).get(metrica) is not None]
+    return statistics.median(valores[-ventana:]) if valores else None
+
+
+def buscar_regresiones(resultados, historial, umbral):
+    regresiones = []
+    for nombre, medida in resultados.items():
+        tiempo = referencia(historial, nombre, 'tiempo_s')
+        if tiempo is not None and medida['tiempo_s'] > tiempo * (1 + umbral):
+            regresiones.append(f"{nombre}: tiempo {tiempo * 1000:.3f} ms -> {medida['tiempo_s'] * 1000:.3f} ms")
+        memoria = referencia(historial, nombre, 'memoria_pico_bytes')
+        if memoria is not None and medida['memoria_pico_bytes'] > memoria * (1 + umbral):
+            regresiones.append(f"{nombre}: memoria pico {memoria / 2**20:.2f} MiB -> "
+                               f"{medida['memoria_pico_bytes'] / 2**20:.2f} MiB")
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador de calentamiento del agua")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--umbral', type=float, default=0.25,
+                        help="regresión máxima tolerada de tiempo y memoria respecto a la referencia (0.25 = 25 %%)")
+    parser.add_argument('--historial', type=Path, default=HISTORIAL)
+    parser.add_argument('--no-guardar', action='store_true', help="no añadir esta ejecución al historial")
+    parser.add_argument('--aceptar', action='store_true',
+                        help="añadir la ejecución al historial aunque tenga regresiones (cambio intencionado)")
+    parser.add_argument('--casos', nargs='*', help="ejecutar solo los casos indicados")
+    args = parser.parse_args(argv)
+
+    casos = construir_casos()
+    if args.casos:
+        casos = {nombre: casos[nombre] for nombre in args.casos}
+
+    resultados = {}
+    for nombre, funcion in casos.items():
+        segundos, pico, muestras = medir(funcion, args.repeticiones)
+        resultados[nombre] = {
+            'tiempo_s': segundos,
+            'memoria_pico_bytes': pico,
+            'muestras_por_s': muestras / segundos if segundos > 0 else None,
+        }
+        print(f"{nombre:<36} {segundos * 1000:>10.3f} ms {pico / 2**20:>9.2f} MiB "
+              f"{muestras / segundos:>14,.0f} muestras/s")
+
+    historial = json.loads(args.historial.read_text()) if args.historial.exists() else []
+    regresiones = buscar_regresiones(resultados, historial, args.umbral)
+
+    if not args.no_guardar and (not regresiones or args.aceptar):
+        historial.append({
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'commit': commit_actual(),
+            'python': platform.python_version(),
+            'repeticiones': args.repeticiones,
+            'casos': resultados,
+        })
+        args.historial.write_text(json.dumps(historial, indent=2))
+
+    if regresiones:
+        print("\nRegresiones por encima del umbral:", file=sys.stderr)
+        for linea in regresiones:
+            print(f"  {linea}", file=sys.stderr)
+        if not args.no_guardar and not args.aceptar:
+            print("La ejecución no se ha añadido al historial (use --aceptar si el cambio es intencionado).",
+                  file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import exportar
+import simulador
+
+
+def tamano_resultado(resultados):
+    """Bytes de las series de un resultado (el búfer columnar, o la suma de las columnas sueltas)."""
+    if 'trayectoria' in resultados:
+        return resultados['trayectoria'].nbytes
+    return sum(resultados[clave].nbytes for clave in simulador.COLUMNAS if clave in resultados)
+
+
+def normalizar_parametros(temp_inicial, masa_total, potencia, presion_kpa, digitos=9):
+    """Clave de caché: parámetros redondeados a `digitos` cifras significativas."""
+    return tuple(float(f"{float(valor):.{digitos}g}")
+                 for valor in (temp_inicial, masa_total, potencia, presion_kpa))
+
+
+class CacheSimulaciones:
+    """Caché LRU de resultados de `simulador.simular_calentamiento`.
+
+    Guarda hasta `capacidad` resultados en memoria y, como mucho,
+    `capacidad_bytes` bytes de series. Las trayectorias se simulan con un paso
+    que las limita a `simulador.MAX_MUESTRAS` muestras, pero su tamaño sigue
+    variando con la duración, así que el número de entradas por sí solo no
+    acota la memoria. Un resultado mayor que `capacidad_bytes` se devuelve
+    pero no se conserva.
+    Si se indica `directorio`,
+    cada resultado también se escribe como NPZ, de modo que sobrevive a un
+    reinicio; al leerlo del disco las series quedan mapeadas en memoria. El
+    directorio conserva como mucho `capacidad_disco` archivos, descartando los
+    usados hace más tiempo. Los fallos se reanudan desde los puntos de control
+    de los resultados en memoria (ver `simulador.reanudar_calentamiento`), de
+    modo que al cambiar un solo parámetro solo se recalculan las fases
+    afectadas. Es seguro compartirla entre threads.
+    """
+
+    def __init__(self, capacidad=64, directorio=None, capacidad_disco=1024, capacidad_bytes=512 * 2**20):
+        self.capacidad = capacidad
+        self.capacidad_bytes = capacidad_bytes
+        self.capacidad_disco = capacidad_disco
+        self.directorio = Path(directorio) if directorio else None
+        if self.directorio is not None:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+
+        self._resultados = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+        self.reanudadas = 0
+        self.muestras_reutilizadas = 0
+
+    def _ruta(self, clave):
+        nombre = hashlib.sha1(repr(clave).encode()).hexdigest()
+        return self.directorio / f"{nombre}.npz"
+
+    def _guardar(self, clave, resultados):
+        if tamano_resultado(resultados) > self.capacidad_bytes:
+            return
+        with self._lock:
+            if clave in self._resultados:
+                self._bytes -= tamano_resultado(self._resultados.pop(clave))
+            self._resultados[clave] = resultados
+            self._bytes += tamano_resultado(resultados)
+            while self._resultados and (len(self._resultados) > self.capacidad
+                                        or self._bytes > self.capacidad_bytes):
+                _, descartado = self._resultados.popitem(last=False)
+                self._bytes -= tamano_resultado(descartado)
+
+    def _recortar_disco(self):
+        archivos = sorted(self.directorio.glob('*.npz'), key=lambda ruta: ruta.stat().st_mtime)
+        for ruta in archivos[:max(len(archivos) - self.capacidad_disco, 0)]:
+            ruta.unlink(missing_ok=True)
+
+    def obtener(self, temp_inicial, masa_total, potencia, presion_kpa):
+        """Devuelve el resultado de la simulación, calculándolo solo si no está en caché."""
+        clave = normalizar_parametros(temp_inicial, masa_total, potencia, presion_kpa)
+        resultados = self.buscar(clave)
+        if resultados is not None:
+            return resultados
+
+        resultados = simulador.reanudar_calentamiento(self.anteriores(), *clave, max_muestras=simulador.MAX_MUESTRAS)
+        reutilizadas = resultados['reanudacion']['muestras']
+        with self._lock:
+            self.fallos += 1
+            self.reanudadas += reutilizadas > 0
+            self.muestras_reutilizadas += reutilizadas
+        return self.guardar(clave, resultados)
+
+    def buscar(self, clave):
+        """Resultado guardado (en memoria o en disco) para una clave de `normalizar_parametros`, o None."""
+        with self._lock:
+            if clave in self._resultados:
+                self._resultados.move_to_end(clave)
+                self.aciertos += 1
+                return self._resultados[clave]
+
+        if self.directorio is not None:
+            ruta = self._ruta(clave)
+            if ruta.exists():
+                resultados = exportar.cargar_trayectoria(ruta)
+                os.utime(ruta)
+                with self._lock:
+                    self.aciertos_disco += 1
+                self._guardar(clave, resultados)
+                return resultados
+        return None
+
+    def anteriores(self):
+        """Resultados en memoria, el más reciente primero, para `simulador.reanudar_calentamiento`."""
+        with self._lock:
+            return list(reversed(self._resultados.values()))
+
+    def guardar(self, clave, resultados):
+        """Guarda un resultado calculado fuera de la caché (p. ej. en otro proceso) y lo devuelve."""
+        self._guardar(clave, resultados)
+
+        if self.directorio is not None:
+            # Se escribe a un temporal y se renombra para que otro proceso nunca lea un NPZ a medias
+            ruta = self._ruta(clave)
+            temporal = ruta.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            metadatos = dict(zip(('temp_inicial', 'masa_total', 'potencia', 'presion_kpa'), clave))
+            metadatos['diagnostico'] = resultados['diagnostico']
+            exportar.exportar_resultados(temporal, resultados, metadatos, formato='npz')
+            os.replace(temporal, ruta)
+            self._recortar_disco()
+
+        return resultados
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'aciertos_disco': self.aciertos_disco,
+                'fallos': self.fallos,
+                'reanudadas': self.reanudadas,
+                'muestras_reutilizadas': self.muestras_reutilizadas,
+                'en_memoria': len(self._resultados),
+                'bytes_en_memoria': self._bytes,
+            }
+
+    def limpiar(self):
+        """Vacía la caché en memoria (el almacén en disco se conserva)."""
+        with self._lock:
+            self._resultados.clear()
+            self._bytes = 0
@@ -0,0 +1,313 @@
+import time
+
+import numpy as np
+
+import simulador
+from propiedades import CONDUCTIVIDAD_AGUA, CONDUCTIVIDAD_HIELO, DENSIDAD_AGUA, PROPIEDADES_ESTANDAR
+
+
+def resolver_tridiagonal(inferior, diagonal, superior, derecha):
+    """Resuelve un sistema tridiagonal por reducción cíclica paralela.
+
+    `inferior[i]` multiplica a x[i-1] y `superior[i]` a x[i+1] en la fila i
+    (`inferior[0]` y `superior[-1]` se ignoran). Cada nivel elimina los
+    vecinos a distancia 1, 2, 4, ... de todas las filas a la vez, así que el
+    coste en Python es O(log n) operaciones vectorizadas en lugar del bucle
+    fila a fila del algoritmo de Thomas. Requiere una matriz diagonalmente
+    dominante (por filas o columnas), como la del paso implícito.
+    """
+    a = np.array(inferior, dtype=float)
+    b = np.array(diagonal, dtype=float)
+    c = np.array(superior, dtype=float)
+    d = np.array(derecha, dtype=float)
+    a[0] = 0.0
+    c[-1] = 0.0
+
+    n = b.size
+    paso = 1
+    while paso < n:
+        # Fuera del sistema se usa la ecuación trivial x = 0 (a = c = d = 0, b = 1)
+        alfa = np.zeros(n)
+        gamma = np.zeros(n)
+        alfa[paso:] = -a[paso:] / b[:-paso]
+        gamma[:-paso] = -c[:-paso] / b[paso:]
+
+        nueva_b = b.copy()
+        nueva_b[paso:] += alfa[paso:] * c[:-paso]
+        nueva_b[:-paso] += gamma[:-paso] * a[paso:]
+        nueva_d = d.copy()
+        nueva_d[paso:] += alfa[paso:] * d[:-paso]
+        nueva_d[:-paso] += gamma[:-paso] * d[paso:]
+        nueva_a = np.zeros(n)
+        nueva_a[paso:] = alfa[paso:] * a[:-paso]
+        nueva_c = np.zeros(n)
+        nueva_c[:-paso] = gamma[:-paso] * c[paso:]
+
+        a, b, c, d = nueva_a, nueva_b, nueva_c, nueva_d
+        paso *= 2
+
+    return d / b
+
+
+class _Entalpia:
+    """Relación entre la entalpía por kg (respecto a hielo a 0 °C) y el estado de una celda."""
+
+    def __init__(self, propiedades, temp_ebullicion, lv):
+        self.propiedades = propiedades
+        self.temp_ebullicion = temp_ebullicion
+        self.lv = lv
+        self.h_hielo0 = propiedades.hielo.entalpia(0.0)
+        self.h_liquido0 = propiedades.liquido.entalpia(0.0)
+        # Fin de la fusión, inicio y fin de la ebullición
+        self.h_fusion = propiedades.lf
+        self.h_liquido = propiedades.lf + propiedades.liquido.entalpia(temp_ebullicion) - self.h_liquido0
+        self.h_vapor = self.h_liquido + lv
+        self.limites = np.array([0.0, self.h_fusion, self.h_liquido])
+        # Intervalo de entalpía de cada zona
+        self.inferiores = np.array([-np.inf, 0.0, self.h_fusion, self.h_liquido])
+        self.superiores = np.array([0.0, self.h_fusion, self.h_liquido, np.inf])
+
+    def de_temperatura(self, temperatura):
+        if temperatura < 0:
+            return float(self.propiedades.hielo.entalpia(temperatura) - self.h_hielo0)
+        return float(self.h_fusion + self.propiedades.liquido.entalpia(temperatura) - self.h_liquido0)
+
+    def temperatura(self, h):
+        """Temperatura de cada celda a partir de su entalpía por kg."""
+        hielo, liquido = self.propiedades.hielo, self.propiedades.liquido
+        temp_hielo = hielo.temperatura(np.minimum(h, 0.0) + self.h_hielo0)
+        temp_liquido = liquido.temperatura(np.clip(h, self.h_fusion, self.h_liquido)
+                                           - self.h_fusion + self.h_liquido0)
+        return np.where(h < 0, temp_hielo,
+                        np.where(h <= self.h_fusion, 0.0,
+                                 np.where(h < self.h_liquido, temp_liquido, self.temp_ebullicion)))
+
+    def zona(self, h):
+        """Zona de cada celda: 0 hielo, 1 fusión, 2 líquido, 3 ebullición."""
+        return np.searchsorted(self.limites, h, side='right')
+
+    def linealizar(self, h, zona):
+        """Aproxima T ≈ resto + pendiente * h dentro de la zona de cada celda.
+
+        En las zonas de cambio de fase la temperatura es fija (pendiente nula).
+        """
+        temperatura = self.temperatura(h)
+        hielo, liquido = self.propiedades.hielo, self.propiedades.liquido
+        cp_hielo = hielo.cp if hielo.constante else hielo.cp(temperatura)
+        cp_liquido = liquido.cp if liquido.constante else liquido.cp(temperatura)
+        pendiente = np.where(zona == 0, 1.0 / cp_hielo, np.where(zona == 2, 1.0 / cp_liquido, 0.0))
+        return temperatura - pendiente * h, pendiente
+
+    def fracciones(self, h):
+        """Fracciones de masa (sólida, líquida, vapor) de cada celda."""
+        solida = np.clip(1.0 - h / self.h_fusion, 0.0, 1.0) if self.h_fusion > 0 else (h < 0).astype(float)
+        if self.lv > 0:
+            vapor = np.clip((h - self.h_liquido) / self.lv, 0.0, 1.0)
+        else:
+            vapor = (h >= self.h_liquido).astype(float)
+        return solida, 1.0 - solida - vapor, vapor
+
+
+def simular_conduccion(temp_inicial, masa_total, potencia, presion_kpa, n_celdas=100, area=0.1,
+                       dt=30.0, intervalo=60.0, tiempos=None,
+                       conductividad_agua=CONDUCTIVIDAD_AGUA, conductividad_hielo=CONDUCTIVIDAD_HIELO,
+                       densidad=DENSIDAD_AGUA, tolerancia=1e-9, max_iteraciones=50,
+                       dtype=np.float64, propiedades=None, al_perfilar=None):
+    """Simula una columna de agua de sección `area` (m²) calentada por el fondo.
+
+    La columna se divide en `n_celdas` celdas iguales y se resuelve la
+    conducción vertical con el método de la entalpía: cada celda funde y
+    hierve por su cuenta cuando su entalpía cruza los cambios de fase. Cada
+    paso es un Euler implícito linealizado alrededor de la iteración anterior,
+    cuyo sistema tridiagonal se resuelve con `resolver_tridiagonal`, de modo
+    que `dt` no está limitado por la estabilidad. El vapor abandona la
+    columna: cuando la celda del fondo se evapora por completo, la parrilla
+    pasa a calentar la siguiente. Sin pérdidas, toda la potencia se absorbe y
+    la evaporización total coincide con la de `simular_calentamiento`.
+
+    Devuelve las mismas claves que `simular_calentamiento` (con la temperatura
+    media de la masa condensada) y además `campo_temperatura`, de forma
+    (muestras, n_celdas), y `alturas`, la altura del centro de cada celda.
+    Las muestras se toman cada `intervalo` segundos o en `tiempos`.
+    """
+    if masa_total <= 0 or potencia <= 0 or presion_kpa <= 0:
+        raise ValueError("Los valores de masa, potencia y presión deben ser positivos.")
+    if n_celdas < 1 or area <= 0 or dt <= 0:
+        raise ValueError("El número de celdas, el área y el paso deben ser positivos.")
+
+    propiedades = propiedades or PROPIEDADES_ESTANDAR
+    fases = simulador.calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades)
+    resumen = simulador.resumen_fases(fases, potencia)
+    tiempo_total = resumen['tiempo_total']
+
+    # calcular_fases ya resuelve la temperatura de ebullición (incluido el líquido sobrecalentado)
+    entalpia = _Entalpia(propiedades, float(fases['nodos_temperatura'][-1]), fases['lv'])
+    limites_h = (0.0, entalpia.h_fusion, entalpia.h_liquido, entalpia.h_vapor)
+
+    masa_celda = masa_total / n_celdas
+    dx = masa_total / (densidad * area) / n_celdas
+    alturas = (np.arange(n_celdas) + 0.5) * dx
+
+    if tiempos is None:
+        tiempos = np.append(np.arange(0.0, tiempo_total, intervalo), tiempo_total)
+    else:
+        tiempos = np.sort(np.asarray(tiempos, dtype=float))
+
+    trayectoria, series = simulador.crear_trayectoria(tiempos.size, dtype)
+    series['tiempo'][:] = tiempos
+    campo = np.empty((tiempos.size, n_celdas), dtype=dtype)
+    absorbida = np.empty(tiempos.size)
+
+    h = np.full(n_celdas, entalpia.de_temperatura(temp_inicial))
+    h_inicial = h[0]
+    base = 0
+
+    tiempos_fase = [0.0 if h_inicial >= limite else np.nan for limite in limites_h]
+    iteraciones_fase = [0] * 4
+    segundos_fase = [0.0] * 4
+    iteraciones_totales = 0
+    pasos = 0
+
+    def registrar(k):
+        absorbida[k] = masa_celda * (h - h_inicial).sum()
+        temperatura = entalpia.temperatura(h)
+        solida, liquida, vapor = entalpia.fracciones(h)
+        campo[k] = temperatura
+        condensada = masa_celda * (solida + liquida)
+        series['masa_solida'][k] = masa_celda * solida.sum()
+        series['masa_liquida'][k] = masa_celda * liquida.sum()
+        series['masa_vapor'][k] = masa_celda * vapor.sum()
+        masa_condensada = condensada.sum()
+        series['temperatura'][k] = ((condensada * temperatura).sum() / masa_condensada
+                                    if masa_condensada > 0 else entalpia.temp_ebullicion)
+
+    t = 0.0
+    siguiente = 0
+    while siguiente < tiempos.size and tiempos[siguiente] <= t:
+        registrar(siguiente)
+        siguiente += 1
+
+    while siguiente < tiempos.size and base < n_celdas:
+        # Los pasos terminan exactamente en cada muestra y en la evaporización total
+        paso = min(dt, tiempos[siguiente] - t, tiempo_total - t)
+
+        inicio = time.perf_counter()
+        minimo_anterior = h[base:].min()
+        fase_actual = min(int(np.searchsorted(limites_h, minimo_anterior, side='right')), 3)
+
+        h_anterior = h.copy()
+        activas = np.arange(n_celdas) >= base
+        capacidad = masa_celda / paso
+        fuente = np.zeros(n_celdas)
+        fuente[base] = potencia
+
+        iteracion = h.copy()
+        zona = entalpia.zona(iteracion)
+        # Las celdas que rozan un borde de zona no cambian de zona por errores de redondeo
+        margen = tolerancia * max(entalpia.h_vapor, 1.0)
+        for numero in range(1, max_iteraciones + 1):
+            resto, pendiente = entalpia.linealizar(iteracion, zona)
+
+            solida = entalpia.fracciones(iteracion)[0]
+            k = conductividad_hielo * solida + conductividad_agua * (1.0 - solida)
+            # Conductancia de cada cara interior (media armónica); nula si toca una celda evaporada
+            conductancia = 2.0 * area * k[:-1] * k[1:] / (dx * (k[:-1] + k[1:]))
+            conductancia[~activas[:-1]] = 0.0
+            g_abajo = np.concatenate(([0.0], conductancia))
+            g_arriba = np.concatenate((conductancia, [0.0]))
+
+            diagonal = capacidad + (g_abajo + g_arriba) * pendiente
+            inferior = -g_abajo * np.concatenate(([0.0], pendiente[:-1]))
+            superior = -g_arriba * np.concatenate((pendiente[1:], [0.0]))
+            derecha = (capacidad * h_anterior + fuente
+                       + g_abajo * (np.concatenate(([0.0], resto[:-1])) - resto)
+                       + g_arriba * (np.concatenate((resto[1:], [0.0])) - resto))
+
+            diagonal[~activas] = 1.0
+            inferior[~activas] = superior[~activas] = 0.0
+            derecha[~activas] = h_anterior[~activas]
+
+            nueva = resolver_tridiagonal(inferior, diagonal, superior, derecha)
+
+            # Las celdas que salen de su zona se detienen en el borde y pasan a la zona vecina
+            minimo_zona = entalpia.inferiores[zona]
+            maximo_zona = entalpia.superiores[zona]
+            baja = activas & (nueva < minimo_zona - margen)
+            sube = activas & (nueva > maximo_zona + margen)
+            if not (baja.any() or sube.any()):
+                # Con cp constante el sistema es exacto dentro de cada zona
+                convergido = (entalpia.propiedades.cp_constante or
+                              np.max(np.abs(nueva - iteracion)) <= margen)
+                iteracion = nueva
+                if convergido:
+                    break
+            elif numero == max_iteraciones:
+                # Sin recortar, el paso conserva la energía aunque no haya convergido
+                iteracion = nueva
+            else:
+                iteracion = np.clip(nueva, minimo_zona, maximo_zona)
+                zona = zona + sube - baja
+
+        h = iteracion
+        # La energía por encima de la evaporización completa pasa a la celda siguiente
+        while base < n_celdas and h[base] >= entalpia.h_vapor * (1 - 1e-12):
+            exceso = h[base] - entalpia.h_vapor
+            h[base] = entalpia.h_vapor
+            base += 1
+            if base < n_celdas:
+                h[base] += exceso
+
+        t_nuevo = t + paso
+        minimo = h[base:].min() if base < n_celdas else entalpia.h_vapor
+        for j, limite in enumerate(limites_h):
+            if np.isnan(tiempos_fase[j]) and minimo >= limite * (1 - 1e-12):
+                fraccion = (limite - minimo_anterior) / (minimo - minimo_anterior) if minimo > minimo_anterior else 1.0
+                tiempos_fase[j] = t + paso * min(max(fraccion, 0.0), 1.0)
+
+        iteraciones_fase[fase_actual] += numero
+        segundos_fase[fase_actual] += time.perf_counter() - inicio
+        iteraciones_totales += numero
+        pasos += 1
+
+        t = t_nuevo
+        if t >= tiempo_total * (1 - 1e-12):
+            # Toda la energía aportada ya está en la columna; solo quedan restos de redondeo
+            t = tiempo_total
+            base = n_celdas
+            h[:] = entalpia.h_vapor
+            tiempos_fase = [tiempo_total if np.isnan(valor) else valor for valor in tiempos_fase]
+        while siguiente < tiempos.size and tiempos[siguiente] <= t:
+            registrar(siguiente)
+            siguiente += 1
+
+    while siguiente < tiempos.size:
+        registrar(siguiente)
+        siguiente += 1
+
+    # Balance de energía: la aportada frente a la absorbida por la columna en cada muestra
+    aportada = np.minimum(potencia * tiempos, resumen['energia_total'])
+    residuo = float(np.max(np.abs(aportada - absorbida))) if tiempos.size else 0.0
+    energia_total = resumen['energia_total']
+
+    indice_fase = np.searchsorted(tiempos_fase, tiempos, side='left')
+    metricas = []
+    for k, nombre in enumerate(simulador.NOMBRES_FASES):
+        muestras = int(np.count_nonzero(np.minimum(indice_fase, 3) == k))
+        metricas.append({'nombre': nombre, 'muestras': muestras, 'segundos': segundos_fase[k],
+                         'iteraciones': iteraciones_fase[k], 'tiempo_fin': float(tiempos_fase[k]),
+                         'energia': float(fases['energias'][k])})
+        if al_perfilar is not None:
+            al_perfilar(nombre, muestras, segundos_fase[k])
+
+    diagnostico = {
+        'fases': metricas,
+        'energia_sensible': float(fases['energias'][0] + fases['energias'][2]),
+        'energia_latente': float(fases['energias'][1] + fases['energias'][3]),
+        'residuo_energia': residuo,
+        'residuo_relativo': residuo / energia_total if energia_total > 0 else 0.0,
+        'pasos': pasos,
+        'iteraciones': iteraciones_totales,
+    }
+
+    return {**series, 'trayectoria': trayectoria, **resumen, 'tiempos_fase': np.array(tiempos_fase),
+            'campo_temperatura': campo, 'alturas': alturas, 'diagnostico': diagnostico}
@@ -0,0 +1,126 @@
+import numpy as np
+
+import simulador
+
+PARAMETROS = ('temp_inicial', 'masa_total', 'potencia', 'presion_kpa')
+INCOGNITAS = ('potencia', 'masa_total', 'presion_kpa', 'temp_inicial')
+
+# Salida de simular_lote para cada objetivo y nodo de `limites_energia` en que termina
+OBJETIVOS = {'tiempo_fusion': 2, 'tiempo_ebullicion': 3, 'tiempo_total': 4}
+
+# Intervalos de búsqueda por defecto (la presión se explora en escala logarítmica)
+INTERVALOS = {'presion_kpa': (0.1, 22000.0), 'temp_inicial': (-100.0, 370.0)}
+
+
+def _multiseccion(evaluar, a, b, objetivo, puntos=32, tolerancia=1e-10, logaritmica=False, max_rondas=100):
+    """Encuentra x en [a, b] con evaluar(x) = objetivo evaluando `puntos` candidatos por ronda.
+
+    Cada ronda evalúa vectorizados los candidatos del intervalo actual y se
+    queda con el primer tramo en que cambia el signo, así que el intervalo se
+    reduce en un factor `puntos - 1` por ronda. Si hay varias raíces se
+    devuelve la de menor x. Devuelve (x, evaluaciones). Si tras `max_rondas`
+    rondas no se alcanza la tolerancia se lanza ValueError.
+    """
+    a, b = float(a), float(b)
+    if not (np.isfinite(a) and np.isfinite(b)) or a >= b:
+        raise ValueError("El intervalo de búsqueda debe tener dos extremos finitos con a < b.")
+    if logaritmica and a <= 0:
+        raise ValueError("En escala logarítmica el intervalo de búsqueda debe ser positivo.")
+    if puntos < 2:
+        raise ValueError("Se necesitan al menos dos puntos por ronda.")
+
+    transformar, deshacer = (np.log, np.exp) if logaritmica else (lambda x: x, lambda x: x)
+    a, b = transformar(a), transformar(b)
+    evaluaciones = 0
+
+    for _ in range(max_rondas):
+        candidatos = np.linspace(a, b, puntos)
+        diferencias = evaluar(deshacer(candidatos)) - objetivo
+        evaluaciones += puntos
+        if not np.all(np.isfinite(diferencias)):
+            raise ValueError("La simulación no da un resultado finito en el intervalo de búsqueda.")
+
+        exactos = np.flatnonzero(diferencias == 0)
+        if exactos.size:
+            return float(deshacer(candidatos[exactos[0]])), evaluaciones
+
+        cambios = np.flatnonzero(np.signbit(diferencias[:-1]) != np.signbit(diferencias[1:]))
+        if cambios.size == 0:
+            raise ValueError("El objetivo no se alcanza en el intervalo de búsqueda.")
+
+        i = cambios[0]
+        a, b = candidatos[i], candidatos[i + 1]
+        if b - a <= tolerancia * max(abs(a), abs(b), 1.0):
+            # Interpolación lineal dentro del último tramo
+            fraccion = diferencias[i] / (diferencias[i] - diferencias[i + 1])
+            return float(deshacer(a + fraccion * (b - a))), evaluaciones
+
+    raise ValueError(f"La búsqueda no converge en {max_rondas} rondas; pruebe con una tolerancia mayor.")
+
+
+def disenar(incognita, tiempo_objetivo, objetivo='tiempo_total', intervalo=None, tolerancia=1e-10,
+            puntos=32, propiedades=None, **parametros):
+    """Calcula el valor de `incognita` con el que `objetivo` dura `tiempo_objetivo` segundos.
+
+    `parametros` da los otros tres valores de la simulación. `objetivo` es el
+    fin de la fusión, el inicio de la ebullición o la evaporización total. La
+    potencia y la masa se despejan de forma analítica, porque la energía de
+    cada fase es proporcional a la masa y los tiempos son energía / potencia.
+    La presión y la temperatura inicial se buscan por multisección sobre
+    `simulador.simular_lote` dentro de `intervalo`.
+    """
+    if incognita not in INCOGNITAS:
+        raise ValueError(f"Incógnita no soportada: '{incognita}'. Use una de {', '.join(INCOGNITAS)}.")
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo no soportado: '{objetivo}'. Use uno de {', '.join(OBJETIVOS)}.")
+    if tiempo_objetivo <= 0:
+        raise ValueError("El tiempo objetivo debe ser positivo.")
+    faltan = [nombre for nombre in PARAMETROS if nombre != incognita and nombre not in parametros]
+    if faltan:
+        raise ValueError(f"Faltan los parámetros: {', '.join(faltan)}.")
+
+    fijos = {nombre: float(parametros[nombre]) for nombre in PARAMETROS if nombre != incognita}
+    if any(fijos.get(nombre, 1.0) <= 0 for nombre in ('masa_total', 'potencia', 'presion_kpa')):
+        raise ValueError("Los valores de masa, potencia y presión deben ser positivos.")
+
+    if incognita in ('potencia', 'masa_total'):
+        masa = fijos.get('masa_total', 1.0)
+        fases = simulador.calcular_fases(fijos['temp_inicial'], masa, fijos['presion_kpa'], propiedades)
+        energia = float(fases['limites_energia'][OBJETIVOS[objetivo]])
+        if energia <= 0:
+            raise ValueError("Con estos parámetros el objetivo se alcanza al instante.")
+        # energia es la de `masa` kg; con la masa como incógnita, la de 1 kg
+        valor = energia / tiempo_objetivo if incognita == 'potencia' else tiempo_objetivo * fijos['potencia'] / energia
+        metodo, evaluaciones = 'analitico', 1
+    else:
+        a, b = intervalo or INTERVALOS[incognita]
+
+        def evaluar(candidatos):
+            argumentos = {**fijos, incognita: candidatos}
+            return simulador.simular_lote(*(argumentos[nombre] for nombre in PARAMETROS),
+                                          propiedades=propiedades)[objetivo]
+
+        valor, evaluaciones = _multiseccion(evaluar, a, b, tiempo_objetivo, puntos, tolerancia,
+                                            logaritmica=incognita == 'presion_kpa')
+        metodo = 'multiseccion'
+
+    solucion = {**fijos, incognita: valor}
+    fases = simulador.calcular_fases(solucion['temp_inicial'], solucion['masa_total'],
+                                     solucion['presion_kpa'], propiedades)
+    tiempo_obtenido = float(fases['limites_energia'][OBJETIVOS[objetivo]]) / solucion['potencia']
+
+    # La curva salta en 0 °C (aparece la fusión): ahí el cambio de signo no es una raíz
+    if abs(tiempo_obtenido - tiempo_objetivo) > 1e-6 * tiempo_objetivo:
+        raise ValueError(f"Ningún valor de {incognita} alcanza exactamente el objetivo; el más cercano "
+                         f"({valor:.6g}) da {tiempo_obtenido:.1f} s.")
+
+    return {
+        'incognita': incognita,
+        'valor': valor,
+        'objetivo': objetivo,
+        'tiempo_objetivo': tiempo_objetivo,
+        'tiempo_obtenido': tiempo_obtenido,
+        'parametros': solucion,
+        'metodo': metodo,
+        'evaluaciones': evaluaciones,
+    }
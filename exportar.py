@@ -0,0 +1,209 @@
+import json
+import shutil
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+import simulador
+
+FORMATOS = ('csv', 'npz', 'parquet')
+
+# Claves del resultado que se guardan como metadatos de la corrida
+CLAVES_RESUMEN = ('temp_saturacion', 'energia_total', 'tiempo_total', 'tiempos_fase')
+
+
+def _formato_de(ruta, formato):
+    formato = (formato or Path(ruta).suffix.lstrip('.')).lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: '{formato}'. Use uno de {', '.join(FORMATOS)}.")
+    return formato
+
+
+def _a_json(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+class EscritorTrayectoria:
+    """Escribe una trayectoria bloque a bloque en CSV, NPZ o Parquet.
+
+    Solo se mantiene en memoria el bloque actual. En NPZ cada columna se vuelca
+    a un archivo temporal y al cerrar se empaqueta sin compresión, de modo que
+    `cargar_trayectoria` puede mapearla en memoria.
+    """
+
+    def __init__(self, ruta, formato=None, metadatos=None):
+        self.ruta = Path(ruta)
+        self.formato = _formato_de(ruta, formato)
+        self.metadatos = {clave: _a_json(valor) for clave, valor in (metadatos or {}).items()}
+        self.filas = 0
+        self._archivo = None
+        self._temporales = {}
+        self._dtype = None
+        self._parquet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
+
+    def escribir(self, bloque):
+        """Añade las filas de `bloque` (un resultado o un bloque de `simular_por_bloques`)."""
+        if self.filas == 0:
+            for clave in CLAVES_RESUMEN:
+                if clave in bloque:
+                    self.metadatos.setdefault(clave, _a_json(bloque[clave]))
+
+        columnas = [np.asarray(bloque[clave]) for clave in simulador.COLUMNAS]
+        getattr(self, f'_escribir_{self.formato}')(columnas)
+        self.filas += len(columnas[0])
+
+    def _escribir_csv(self, columnas):
+        if self._archivo is None:
+            self._archivo = open(self.ruta, 'w', encoding='utf-8')
+            for clave, valor in self.metadatos.items():
+                self._archivo.write(f"# {clave}: {json.dumps(valor)}\n")
+            self._archivo.write(','.join(simulador.COLUMNAS) + "\n")
+        np.savetxt(self._archivo, np.column_stack(columnas), delimiter=',', fmt='%.10g')
+
+    def _escribir_npz(self, columnas):
+        if not self._temporales:
+            self._dtype = columnas[0].dtype
+            self._temporales = {clave: tempfile.TemporaryFile() for clave in simulador.COLUMNAS}
+        for clave, valores in zip(simulador.COLUMNAS, columnas):
+            self._temporales[clave].write(np.ascontiguousarray(valores, dtype=self._dtype).tobytes())
+
+    def _escribir_parquet(self, columnas):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("La exportación a Parquet requiere el paquete 'pyarrow'.") from None
+
+        tabla = pa.table(dict(zip(simulador.COLUMNAS, columnas)))
+        if self._parquet is None:
+            esquema = tabla.schema.with_metadata({'metadatos': json.dumps(self.metadatos)})
+            self._parquet = pq.ParquetWriter(self.ruta, esquema)
+        self._parquet.write_table(tabla.cast(self._parquet.schema))
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+        if self._temporales:
+            with zipfile.ZipFile(self.ruta, 'w', zipfile.ZIP_STORED) as zf:
+                for clave, temporal in self._temporales.items():
+                    temporal.seek(0)
+                    with zf.open(f'{clave}.npy', 'w', force_zip64=True) as destino:
+                        np.lib.format.write_array_header_1_0(destino, {
+                            'descr': np.lib.format.dtype_to_descr(self._dtype),
+                            'fortran_order': False,
+                            'shape': (self.filas,),
+                        })
+                        shutil.copyfileobj(temporal, destino)
+                    temporal.close()
+                with zf.open('metadatos.npy', 'w') as destino:
+                    np.lib.format.write_array(destino, np.array(json.dumps(self.metadatos)))
+            self._temporales = {}
+
+
+def exportar_simulacion(ruta, temp_inicial, masa_total, potencia, presion_kpa, formato=None,
+                        tamano_bloque=50000, dtype=np.float64):
+    """Simula y escribe la trayectoria directamente a disco, bloque a bloque."""
+    metadatos = {'temp_inicial': temp_inicial, 'masa_total': masa_total,
+                 'potencia': potencia, 'presion_kpa': presion_kpa}
+    with EscritorTrayectoria(ruta, formato, metadatos) as escritor:
+        for bloque in simulador.simular_por_bloques(temp_inicial, masa_total, potencia, presion_kpa,
+                                                    tamano_bloque=tamano_bloque, dtype=dtype):
+            escritor.escribir(bloque)
+    return escritor.ruta
+
+
+def exportar_resultados(ruta, resultados, metadatos=None, formato=None, tamano_bloque=50000):
+    """Escribe un resultado ya calculado en porciones de `tamano_bloque` filas."""
+    with EscritorTrayectoria(ruta, formato, metadatos) as escritor:
+        n = len(resultados['tiempo'])
+        for inicio in range(0, max(n, 1), tamano_bloque):
+            porcion = {clave: resultados[clave][inicio:inicio + tamano_bloque]
+                       for clave in simulador.COLUMNAS}
+            porcion.update({clave: resultados[clave] for clave in CLAVES_RESUMEN if clave in resultados})
+            escritor.escribir(porcion)
+    return escritor.ruta
+
+
+def _mapear_miembro_npz(ruta, info):
+    """Devuelve un np.memmap sobre un miembro .npy sin comprimir de un archivo NPZ."""
+    with open(ruta, 'rb') as f:
+        f.seek(info.header_offset)
+        cabecera_local = f.read(30)
+        largo_nombre = int.from_bytes(cabecera_local[26:28], 'little')
+        largo_extra = int.from_bytes(cabecera_local[28:30], 'little')
+        f.seek(info.header_offset + 30 + largo_nombre + largo_extra)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            forma, orden_fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            forma, orden_fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        desplazamiento = f.tell()
+
+    return np.memmap(ruta, dtype=dtype, mode='r', offset=desplazamiento, shape=forma,
+                     order='F' if orden_fortran else 'C')
+
+
+def cargar_trayectoria(ruta, formato=None):
+    """Carga una trayectoria exportada; NPZ y Parquet se mapean en memoria.
+
+    Devuelve un diccionario con las series y los metadatos de la corrida.
+    """
+    formato = _formato_de(ruta, formato)
+
+    if formato == 'npz':
+        resultados = {}
+        metadatos = {}
+        with zipfile.ZipFile(ruta) as zf:
+            for info in zf.infolist():
+                clave = info.filename[:-len('.npy')]
+                if clave == 'metadatos':
+                    with zf.open(info) as f:
+                        metadatos = json.loads(str(np.lib.format.read_array(f)))
+                elif info.compress_type == zipfile.ZIP_STORED:
+                    resultados[clave] = _mapear_miembro_npz(ruta, info)
+                else:
+                    with zf.open(info) as f:
+                        resultados[clave] = np.lib.format.read_array(f)
+
+    elif formato == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("La lectura de Parquet requiere el paquete 'pyarrow'.") from None
+        tabla = pq.read_table(ruta, memory_map=True)
+        metadatos = json.loads((tabla.schema.metadata or {}).get(b'metadatos', b'{}'))
+        resultados = {clave: tabla.column(clave).to_numpy() for clave in simulador.COLUMNAS}
+
+    else:
+        metadatos = {}
+        with open(ruta, encoding='utf-8') as f:
+            for linea in f:
+                if not linea.startswith('#'):
+                    break
+                clave, _, valor = linea[1:].partition(':')
+                metadatos[clave.strip()] = json.loads(valor)
+        datos = np.loadtxt(ruta, delimiter=',', skiprows=len(metadatos) + 1, ndmin=2)
+        resultados = dict(zip(simulador.COLUMNAS, datos.T))
+
+    resultados.update(metadatos)
+    resultados['metadatos'] = metadatos
+    return resultados
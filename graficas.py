@@ -0,0 +1,42 @@
+import numpy as np
+
+# Puntos por serie que se envían a matplotlib; bastan para unos pocos miles de píxeles
+MAX_PUNTOS = 4000
+
+
+def indices_decimados(tiempos, series, max_puntos=MAX_PUNTOS, tiempos_fase=()):
+    """Índices de las muestras a dibujar, conservando mínimos, máximos y esquinas de fase.
+
+    La trayectoria se divide en cubetas consecutivas y de cada una se toma la
+    muestra mínima y la máxima de cada serie. Se añaden siempre la primera y la
+    última muestra y las dos que rodean a cada instante de `tiempos_fase`, de
+    modo que los cambios de fase no se redondean.
+    """
+    tiempos = np.asarray(tiempos)
+    n = len(tiempos)
+    if n <= max_puntos:
+        return np.arange(n)
+
+    cubetas = max(max_puntos // (2 * len(series)), 1)
+    tamano = -(-n // cubetas)
+    desplazamientos = np.arange(cubetas) * tamano
+
+    seleccion = [np.array([0, n - 1])]
+    for serie in series:
+        serie = np.asarray(serie)
+        relleno = np.pad(serie, (0, cubetas * tamano - n), mode='edge').reshape(cubetas, tamano)
+        seleccion.append(desplazamientos + relleno.argmin(axis=1))
+        seleccion.append(desplazamientos + relleno.argmax(axis=1))
+
+    esquinas = np.searchsorted(tiempos, np.asarray(tiempos_fase, dtype=float))
+    seleccion.append(esquinas)
+    seleccion.append(esquinas - 1)
+
+    return np.unique(np.clip(np.concatenate(seleccion), 0, n - 1))
+
+
+def decimar(resultados, claves, max_puntos=MAX_PUNTOS):
+    """Devuelve (tiempos, {clave: serie}) reducidos para dibujar las series `claves`."""
+    indices = indices_decimados(resultados['tiempo'], [resultados[clave] for clave in claves],
+                                max_puntos, resultados.get('tiempos_fase', ()))
+    return resultados['tiempo'][indices], {clave: resultados[clave][indices] for clave in claves}
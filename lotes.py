@@ -0,0 +1,207 @@
+"""Ejecución de escenarios por lotes, sin interfaz gráfica.
+
+Uso:
+    python lotes.py escenarios.csv [--resumen resumen.csv] [--trayectorias carpeta] [--formato npz]
+    cat escenarios.json | python lotes.py - --graficas carpeta
+
+Los escenarios se leen de un CSV con cabecera o de JSON (una lista de
+objetos, un objeto o un objeto por línea) con las columnas `temp_inicial`,
+`masa_total`, `potencia` y `presion_kpa`, y opcionalmente `nombre`, que da
+nombre a los archivos de trayectoria y gráfica: debe ser un nombre de archivo
+simple (sin separadores de carpeta) y no repetirse. Con `-`
+se leen de la entrada estándar. El resumen se escribe como CSV (o JSON si la
+ruta termina en .json) en la salida estándar o en `--resumen`.
+
+Este módulo solo importa el núcleo de simulación: matplotlib se carga
+únicamente si se piden gráficas, y nunca se importan tkinter ni streamlit.
+"""
+import argparse
+import csv
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+import exportar
+import simulador
+from propiedades import CERO_ABSOLUTO
+
+PARAMETROS = ('temp_inicial', 'masa_total', 'potencia', 'presion_kpa')
+COLUMNAS_RESUMEN = ('nombre', *PARAMETROS, 'temp_saturacion', 'tiempo_fusion', 'tiempo_ebullicion',
+                    'tiempo_total', 'energia_total')
+MODELOS = ('agrupado', 'conduccion')
+
+
+def _nombre_archivo_valido(nombre):
+    """Un nombre sirve de archivo si no sale de la carpeta de destino: sin separadores ni '.'/'..'."""
+    return (nombre.strip() == nombre and nombre not in ('', '.', '..')
+            and not any(separador in nombre for separador in ('/', '\\', '\0')))
+
+
+def leer_escenarios(texto):
+    """Convierte el contenido de un archivo de escenarios en una lista de diccionarios."""
+    texto = texto.strip()
+    if not texto:
+        return []
+
+    if texto[0] in '[{':
+        try:
+            datos = json.loads(texto)
+        except json.JSONDecodeError:
+            # Un objeto JSON por línea
+            datos = [json.loads(linea) for linea in texto.splitlines() if linea.strip()]
+        filas = [datos] if isinstance(datos, dict) else datos
+        if not isinstance(filas, list):
+            raise ValueError("El JSON debe ser un objeto o una lista de objetos.")
+    else:
+        filas = list(csv.DictReader(texto.splitlines()))
+
+    escenarios = []
+    nombres = set()
+    for i, fila in enumerate(filas, start=1):
+        if not isinstance(fila, dict):
+            raise ValueError(f"Escenario {i}: se esperaba un objeto con los parámetros.")
+        faltan = [nombre for nombre in PARAMETROS if fila.get(nombre) in (None, '')]
+        if faltan:
+            raise ValueError(f"Escenario {i}: faltan {', '.join(faltan)}.")
+        escenario = {'nombre': str(fila.get('nombre') or f"escenario_{i}")}
+        if not _nombre_archivo_valido(escenario['nombre']):
+            raise ValueError(f"Escenario {i}: el nombre '{escenario['nombre']}' no es un nombre de archivo válido.")
+        if escenario['nombre'] in nombres:
+            raise ValueError(f"Escenario {i}: el nombre '{escenario['nombre']}' está repetido.")
+        nombres.add(escenario['nombre'])
+        try:
+            escenario.update({nombre: float(fila[nombre]) for nombre in PARAMETROS})
+        except (TypeError, ValueError):
+            raise ValueError(f"Escenario {i}: los parámetros deben ser numéricos.") from None
+        if not all(np.isfinite(escenario[nombre]) for nombre in PARAMETROS):
+            raise ValueError(f"Escenario {i}: los parámetros deben ser finitos.")
+        if min(escenario['masa_total'], escenario['potencia'], escenario['presion_kpa']) <= 0:
+            raise ValueError(f"Escenario {i}: los valores de masa, potencia y presión deben ser positivos.")
+        if escenario['temp_inicial'] < CERO_ABSOLUTO:
+            raise ValueError(f"Escenario {i}: la temperatura no puede ser menor al cero absoluto "
+                             f"({CERO_ABSOLUTO}°C).")
+        escenarios.append(escenario)
+    return escenarios
+
+
+def resumir_lote(escenarios):
+    """Resumen de todos los escenarios del modelo agrupado en una sola llamada vectorizada."""
+    lote = simulador.simular_lote(*(np.array([e[nombre] for e in escenarios]) for nombre in PARAMETROS))
+    return [{**escenario, **{clave: float(valores[i]) for clave, valores in lote.items()}}
+            for i, escenario in enumerate(escenarios)]
+
+
+def resumir_resultado(escenario, resultados):
+    tiempos_fase = resultados['tiempos_fase']
+    return {**escenario,
+            'temp_saturacion': float(resultados['temp_saturacion']),
+            'tiempo_fusion': float(tiempos_fase[1]),
+            'tiempo_ebullicion': float(tiempos_fase[2]),
+            'tiempo_total': float(resultados['tiempo_total']),
+            'energia_total': float(resultados['energia_total'])}
+
+
+def guardar_grafica(ruta, resultados, titulo):
+    """Dibuja las cuatro curvas de un escenario en un PNG (importa matplotlib solo aquí)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+
+    import graficas
+
+    tiempos, series = graficas.decimar(resultados, simulador.COLUMNAS[1:])
+    figura = Figure(figsize=(12, 8))
+    ejes = figura.subplots(2, 2).flatten()
+    etiquetas = (('temperatura', 'Temperatura (°C)', 'r'), ('masa_solida', 'Masa sólida (kg)', 'b'),
+                 ('masa_liquida', 'Masa líquida (kg)', 'g'), ('masa_vapor', 'Masa vapor (kg)', 'm'))
+    for eje, (clave, etiqueta, color) in zip(ejes, etiquetas):
+        eje.plot(tiempos / 60, series[clave], color)
+        eje.set_xlabel("Tiempo (min)")
+        eje.set_ylabel(etiqueta)
+        eje.grid(True, alpha=0.3)
+    figura.suptitle(titulo)
+    figura.tight_layout()
+    figura.savefig(ruta)
+
+
+def ejecutar(escenarios, trayectorias=None, formato='npz', graficas_dir=None, modelo='agrupado',
+             celdas=100, area=0.1):
+    """Simula los escenarios, escribe las trayectorias y gráficas pedidas y devuelve los resúmenes."""
+    if modelo == 'agrupado' and graficas_dir is None:
+        resumenes = resumir_lote(escenarios) if escenarios else []
+        if trayectorias is not None:
+            for escenario in escenarios:
+                exportar.exportar_simulacion(Path(trayectorias) / f"{escenario['nombre']}.{formato}",
+                                             *(escenario[nombre] for nombre in PARAMETROS), formato=formato)
+        return resumenes
+
+    resumenes = []
+    for escenario in escenarios:
+        parametros = [escenario[nombre] for nombre in PARAMETROS]
+        if modelo == 'conduccion':
+            import conduccion
+            resultados = conduccion.simular_conduccion(*parametros, n_celdas=celdas, area=area)
+        else:
+            resultados = simulador.simular_calentamiento(*parametros)
+
+        if trayectorias is not None:
+            exportar.exportar_resultados(Path(trayectorias) / f"{escenario['nombre']}.{formato}",
+                                         resultados, dict(zip(PARAMETROS, parametros)), formato)
+        if graficas_dir is not None:
+            guardar_grafica(Path(graficas_dir) / f"{escenario['nombre']}.png", resultados, escenario['nombre'])
+        resumenes.append(resumir_resultado(escenario, resultados))
+    return resumenes
+
+
+def escribir_resumen(resumenes, destino, como_json=False):
+    if como_json:
+        json.dump(resumenes, destino, indent=2, ensure_ascii=False)
+        destino.write('\n')
+        return
+    escritor = csv.DictWriter(destino, fieldnames=COLUMNAS_RESUMEN, lineterminator='\n')
+    escritor.writeheader()
+    escritor.writerows(resumenes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación por lotes del calentamiento del agua")
+    parser.add_argument('escenarios', help="archivo CSV o JSON de escenarios, o '-' para la entrada estándar")
+    parser.add_argument('--resumen', default='-', help="archivo de resumen (.csv o .json); '-' para la salida estándar")
+    parser.add_argument('--trayectorias', type=Path, help="carpeta donde guardar la trayectoria de cada escenario")
+    parser.add_argument('--formato', choices=exportar.FORMATOS, default='npz')
+    parser.add_argument('--graficas', type=Path, help="carpeta donde guardar un PNG por escenario")
+    parser.add_argument('--modelo', choices=MODELOS, default='agrupado',
+                        help="'conduccion' resuelve la columna de agua por celdas")
+    parser.add_argument('--celdas', type=int, default=100)
+    parser.add_argument('--area', type=float, default=0.1, help="sección del recipiente (m²) para 'conduccion'")
+    args = parser.parse_args(argv)
+
+    texto = sys.stdin.read() if args.escenarios == '-' else Path(args.escenarios).read_text(encoding='utf-8')
+    try:
+        escenarios = leer_escenarios(texto)
+    except (ValueError, json.JSONDecodeError) as e:
+        parser.error(str(e))
+
+    for carpeta in (args.trayectorias, args.graficas):
+        if carpeta is not None:
+            carpeta.mkdir(parents=True, exist_ok=True)
+
+    try:
+        resumenes = ejecutar(escenarios, args.trayectorias, args.formato, args.graficas,
+                             args.modelo, args.celdas, args.area)
+    except ImportError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.resumen == '-':
+        escribir_resumen(resumenes, sys.stdout)
+    else:
+        with open(args.resumen, 'w', encoding='utf-8', newline='') as destino:
+            escribir_resumen(resumenes, destino, como_json=args.resumen.endswith('.json'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
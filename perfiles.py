@@ -0,0 +1,224 @@
+import numpy as np
+
+import simulador
+
+
+class PerfilPotencia:
+    """Potencia de la parrilla en función del tiempo y, opcionalmente, de la temperatura.
+
+    Las subclases implementan `potencia(t, temperatura, integral)`, donde
+    `integral` es la integral del error acumulada por el integrador para los
+    controladores con acción integral. `discontinuidades` enumera los instantes
+    en los que la potencia salta, para que el integrador no los cruce dentro de
+    un paso.
+    """
+
+    discontinuidades = ()
+
+    def potencia(self, t, temperatura, integral):
+        raise NotImplementedError
+
+    def derivada_integral(self, t, temperatura, integral):
+        """Variación de `integral` por segundo; cero para perfiles sin acción integral."""
+        return 0.0
+
+
+class PotenciaConstante(PerfilPotencia):
+    def __init__(self, potencia):
+        self.valor = potencia
+
+    def potencia(self, t, temperatura, integral):
+        return self.valor
+
+
+class PotenciaEscalonada(PerfilPotencia):
+    """Potencia constante a tramos: `potencias[i]` desde `tiempos[i]` hasta el siguiente tramo."""
+
+    def __init__(self, tiempos, potencias):
+        if len(tiempos) != len(potencias) or len(tiempos) == 0:
+            raise ValueError("Se necesita la misma cantidad (no nula) de tiempos y potencias.")
+        self.tiempos = [float(t) for t in tiempos]
+        self.potencias = [float(p) for p in potencias]
+        self.discontinuidades = self.tiempos[1:]
+
+    def potencia(self, t, temperatura, integral):
+        return self.potencias[max(np.searchsorted(self.tiempos, t, side='right') - 1, 0)]
+
+
+class PotenciaRampa(PerfilPotencia):
+    """Potencia que varía linealmente de `inicial` a `final` en `duracion` segundos y luego se mantiene."""
+
+    def __init__(self, inicial, final, duracion):
+        self.inicial = inicial
+        self.final = final
+        self.duracion = duracion
+        self.discontinuidades = (duracion,)
+
+    def potencia(self, t, temperatura, integral):
+        if t >= self.duracion:
+            return self.final
+        return self.inicial + (self.final - self.inicial) * t / self.duracion
+
+
+class Termostato(PerfilPotencia):
+    """Termostato proporcional: potencia máxima por debajo de la banda, nula al llegar a la consigna."""
+
+    def __init__(self, consigna, potencia_max, banda=2.0):
+        self.consigna = consigna
+        self.potencia_max = potencia_max
+        self.banda = banda
+
+    def potencia(self, t, temperatura, integral):
+        fraccion = (self.consigna - temperatura) / self.banda
+        return self.potencia_max * min(max(fraccion, 0.0), 1.0)
+
+
+class ControladorPI(PerfilPotencia):
+    """Controlador PI sobre la temperatura, saturado entre 0 y `potencia_max`.
+
+    La integral solo avanza mientras la salida no está saturada (anti-windup).
+    """
+
+    def __init__(self, consigna, kp, ki, potencia_max):
+        self.consigna = consigna
+        self.kp = kp
+        self.ki = ki
+        self.potencia_max = potencia_max
+
+    def _salida(self, temperatura, integral):
+        return self.kp * (self.consigna - temperatura) + self.ki * integral
+
+    def potencia(self, t, temperatura, integral):
+        return min(max(self._salida(temperatura, integral), 0.0), self.potencia_max)
+
+    def derivada_integral(self, t, temperatura, integral):
+        salida = self._salida(temperatura, integral)
+        error = self.consigna - temperatura
+        if (salida >= self.potencia_max and error > 0) or (salida <= 0 and error < 0):
+            return 0.0
+        return error
+
+
+def simular_con_perfil(temp_inicial, masa_total, perfil, presion_kpa, tiempos=None,
+                       tolerancia=1e-6, paso_inicial=1.0, paso_max=600.0, tiempo_max=7 * 24 * 3600,
+                       propiedades=None):
+    """Integra la energía absorbida con un perfil de potencia variable y paso adaptativo.
+
+    Se usa Runge-Kutta 2(3) de Bogacki-Shampine sobre la energía (y la integral
+    del error del controlador). Los pasos se recortan para terminar exactamente
+    en cada cambio de fase (0 °C y `temp_saturacion`) y en las discontinuidades
+    del perfil. La simulación acaba con la evaporización completa o en
+    `tiempo_max`. Si se indican `tiempos`, el estado se remuestrea en ellos.
+    """
+    if masa_total <= 0 or presion_kpa <= 0:
+        raise ValueError("Los valores de masa y presión deben ser positivos.")
+
+    fases = simulador.calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades)
+    nodos = [float(e) for e in fases['limites_energia']]
+    energia_total = nodos[-1]
+    escala_energia = tolerancia * max(energia_total, 1.0)
+
+    mantener = np.append(np.diff(fases['nodos_energia']) > 0, True)
+    energias_tabla = fases['nodos_energia'][mantener]
+    temperaturas_tabla = fases['nodos_temperatura'][mantener]
+
+    def temperatura_de(energia):
+        return float(np.interp(energia, energias_tabla, temperaturas_tabla))
+
+    def derivadas(t, energia, integral):
+        temperatura = temperatura_de(energia)
+        potencia = max(perfil.potencia(t, temperatura, integral), 0.0)
+        return potencia, perfil.derivada_integral(t, temperatura, integral)
+
+    def paso_rk23(t, energia, integral, h, k1):
+        k2 = derivadas(t + h / 2, energia + h / 2 * k1[0], integral + h / 2 * k1[1])
+        k3 = derivadas(t + 3 * h / 4, energia + 3 * h / 4 * k2[0], integral + 3 * h / 4 * k2[1])
+        energia_nueva = energia + h * (2 * k1[0] + 3 * k2[0] + 4 * k3[0]) / 9
+        integral_nueva = integral + h * (2 * k1[1] + 3 * k2[1] + 4 * k3[1]) / 9
+        # La última etapa se evalúa justo antes de t + h: si ahí salta la potencia, cuenta el tramo actual
+        k4 = derivadas(np.nextafter(t + h, t), energia_nueva, integral_nueva)
+        error_energia = h * (-5 * k1[0] / 72 + k2[0] / 12 + k3[0] / 9 - k4[0] / 8)
+        error_integral = h * (-5 * k1[1] / 72 + k2[1] / 12 + k3[1] / 9 - k4[1] / 8)
+        norma = max(abs(error_energia) / escala_energia,
+                    abs(error_integral) / (tolerancia * (abs(integral) + 1.0)))
+        return energia_nueva, integral_nueva, norma, k4
+
+    discontinuidades = sorted(float(t) for t in perfil.discontinuidades if t > 0)
+
+    t, energia, integral = 0.0, 0.0, 0.0
+    h = paso_inicial
+    tiempos_paso = [t]
+    energias_paso = [energia]
+    potencias_paso = [derivadas(t, energia, integral)[0]]
+    tiempos_fase = [t if nodos[k + 1] <= 0 else np.nan for k in range(4)]
+    rechazados = 0
+    k1 = derivadas(t, energia, integral)
+
+    while energia < energia_total and t < tiempo_max:
+        h = min(h, paso_max, tiempo_max - t)
+        proxima = next((d for d in discontinuidades if d > t), None)
+        en_discontinuidad = proxima is not None and h >= proxima - t
+        if en_discontinuidad:
+            h = proxima - t
+
+        energia_nueva, integral_nueva, norma, k4 = paso_rk23(t, energia, integral, h, k1)
+        if norma > 1:
+            h *= max(0.2, 0.9 * norma ** (-1 / 3))
+            rechazados += 1
+            continue
+
+        # Localización del cambio de fase: se recorta el paso hasta caer sobre el nodo
+        limite = next(e for e in nodos if e > energia)
+        llego_a_nodo = False
+        if energia_nueva >= limite - escala_energia:
+            en_discontinuidad = False
+            for _ in range(20):
+                if abs(energia_nueva - limite) <= escala_energia:
+                    break
+                h *= (limite - energia) / (energia_nueva - energia)
+                energia_nueva, integral_nueva, norma, k4 = paso_rk23(t, energia, integral, h, k1)
+            energia_nueva = limite
+            llego_a_nodo = True
+
+        t = proxima if en_discontinuidad else t + h
+        energia, integral = energia_nueva, integral_nueva
+        k1 = derivadas(t, energia, integral) if llego_a_nodo or en_discontinuidad else k4
+
+        if llego_a_nodo:
+            for k in range(4):
+                if np.isnan(tiempos_fase[k]) and nodos[k + 1] <= energia:
+                    tiempos_fase[k] = t
+
+        tiempos_paso.append(t)
+        energias_paso.append(energia)
+        potencias_paso.append(k1[0])
+
+        h *= min(5.0, 0.9 * max(norma, 1e-10) ** (-1 / 3))
+
+    tiempos_paso = np.array(tiempos_paso)
+    energias_paso = np.array(energias_paso)
+    potencias_paso = np.array(potencias_paso)
+
+    if tiempos is not None:
+        tiempos = np.asarray(tiempos, dtype=float)
+        energias = np.interp(tiempos, tiempos_paso, energias_paso)
+        potencias = np.interp(tiempos, tiempos_paso, potencias_paso)
+    else:
+        tiempos, energias, potencias = tiempos_paso, energias_paso, potencias_paso
+
+    temperaturas, masas_solidas, masas_liquidas, masas_vapor = simulador.estado_por_energia(fases, energias)
+
+    return {
+        'tiempo': tiempos,
+        'temperatura': temperaturas,
+        'masa_solida': masas_solidas,
+        'masa_liquida': masas_liquidas,
+        'masa_vapor': masas_vapor,
+        'potencia': potencias,
+        'temp_saturacion': fases['temp_saturacion'],
+        'energia_total': float(energias_paso[-1]),
+        'tiempo_total': float(tiempos_paso[-1]),
+        'tiempos_fase': np.array(tiempos_fase),
+        'pasos': len(tiempos_paso) - 1,
+        'pasos_rechazados': rechazados,
+    }
@@ -0,0 +1,135 @@
+import functools
+
+import numpy as np
+
+# Propiedades del agua
+CP_AGUA = 4186
+CP_HIELO = 2090
+LF = 333000
+
+# Conductividad térmica (W/(m·K)) y densidad (kg/m³) para el modelo de conducción
+CONDUCTIVIDAD_AGUA = 0.6
+CONDUCTIVIDAD_HIELO = 2.2
+DENSIDAD_AGUA = 1000.0
+
+T_CRITICA = 647.0969 - 273.15
+CERO_ABSOLUTO = -273.15
+
+
+def calcular_temperatura_saturacion(presion_kpa):
+    """Calcula la temperatura de saturación del agua según la presión usando la ecuación de Antoine.
+
+    Acepta escalares o arreglos de NumPy.
+    """
+    presion_mmhg = np.asarray(presion_kpa, dtype=float) * 7.50062
+
+    A = 8.07131
+    B = 1730.63
+    C = 233.426
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        temp_sat = B / (A - np.log10(presion_mmhg)) - C
+    temp_sat = np.where(presion_mmhg <= 0, 100.0, temp_sat)
+    return temp_sat[()]
+
+
+def calcular_entalpia_vaporizacion(temperatura):
+    """Calcula la entalpía de vaporización según la fórmula dada.
+
+    Acepta escalares o arreglos de NumPy.
+    """
+    T_kelvin = np.asarray(temperatura, dtype=float) + 273.15
+    T_critica = 647.0969
+
+    h_vap_kj_kg = 2256.4 * np.clip(1 - T_kelvin / T_critica, 0.0, None) ** 0.38
+    h_vap_kj_kg = np.where(T_kelvin >= T_critica, 0.0, h_vap_kj_kg)
+    return (h_vap_kj_kg * 1000)[()]
+
+
+class TablaPropiedad:
+    """Propiedad precalculada en una malla e interpolada al evaluarla con arreglos.
+
+    Los escalares van por un camino memoizado que usa la correlación exacta,
+    así que repetir una misma consulta cuesta una búsqueda en diccionario.
+    Fuera del rango de la tabla también se usa la correlación exacta.
+    """
+
+    def __init__(self, funcion, minimo, maximo, puntos=4096, logaritmica=False):
+        self.funcion = funcion
+        self.minimo = minimo
+        self.maximo = maximo
+        self.logaritmica = logaritmica
+
+        malla = np.geomspace(minimo, maximo, puntos) if logaritmica else np.linspace(minimo, maximo, puntos)
+        self._x = np.log(malla) if logaritmica else malla
+        self._y = np.asarray(funcion(malla), dtype=float)
+        self._escalar = functools.lru_cache(maxsize=4096)(lambda x: float(funcion(x)))
+
+    def __call__(self, x):
+        if np.ndim(x) == 0:
+            return self._escalar(float(x))
+
+        x = np.asarray(x, dtype=float)
+        dentro = (x >= self.minimo) & (x <= self.maximo)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            resultado = np.interp(np.log(x) if self.logaritmica else x, self._x, self._y)
+        if not dentro.all():
+            resultado[~dentro] = self.funcion(x[~dentro])
+        return resultado
+
+
+class CalorSensible:
+    """Entalpía sensible por kg de una fase, h(T) = ∫ cp dT, y su inversa.
+
+    Con `cp` constante ambas son lineales y no se construye tabla. Si `cp` es
+    una función de la temperatura (vectorizada, en J/(kg·K)), la integral se
+    tabula una vez en [`t_min`, `t_max`] y después solo se interpola.
+    """
+
+    def __init__(self, cp, t_min, t_max, puntos=4096):
+        self.cp = cp
+        self.constante = not callable(cp)
+        if not self.constante:
+            self.temperaturas = np.linspace(t_min, t_max, puntos)
+            valores_cp = np.asarray(cp(self.temperaturas), dtype=float)
+            tramos = 0.5 * (valores_cp[1:] + valores_cp[:-1]) * np.diff(self.temperaturas)
+            self.entalpias = np.concatenate(([0.0], np.cumsum(tramos)))
+
+    def entalpia(self, temperatura):
+        if self.constante:
+            return self.cp * np.asarray(temperatura, dtype=float)[()]
+        return np.interp(temperatura, self.temperaturas, self.entalpias)
+
+    def temperatura(self, entalpia):
+        if self.constante:
+            return (np.asarray(entalpia, dtype=float) / self.cp)[()]
+        return np.interp(entalpia, self.entalpias, self.temperaturas)
+
+    def nodos(self, t_inicial, t_final):
+        """Temperaturas entre `t_inicial` y `t_final` donde la curva h(T) cambia de pendiente."""
+        if self.constante or t_final <= t_inicial:
+            return np.array([t_inicial, t_final])
+        interiores = self.temperaturas[(self.temperaturas > t_inicial) & (self.temperaturas < t_final)]
+        return np.concatenate(([t_inicial], interiores, [t_final]))
+
+
+class PropiedadesAgua:
+    """Conjunto de propiedades usado por el simulador.
+
+    `cp_agua` y `cp_hielo` pueden ser constantes o funciones de la temperatura;
+    `lf` es el calor latente en el punto de fusión.
+    """
+
+    def __init__(self, cp_agua=CP_AGUA, cp_hielo=CP_HIELO, lf=LF, puntos=4096):
+        self.lf = lf
+        self.hielo = CalorSensible(cp_hielo, -273.15, 0.0, puntos)
+        self.liquido = CalorSensible(cp_agua, 0.0, T_CRITICA, puntos)
+        self.cp_constante = self.hielo.constante and self.liquido.constante
+
+        self.temperatura_saturacion = TablaPropiedad(calcular_temperatura_saturacion, 0.1, 22000.0,
+                                                     puntos, logaritmica=True)
+        # Cerca del punto crítico la pendiente diverge; ahí se usa la correlación exacta
+        self.entalpia_vaporizacion = TablaPropiedad(calcular_entalpia_vaporizacion, -50.0, 350.0, puntos)
+
+
+PROPIEDADES_ESTANDAR = PropiedadesAgua()
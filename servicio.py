@@ -0,0 +1,374 @@
+"""Servicio HTTP JSON local sobre el núcleo de simulación.
+
+Uso:
+    python servicio.py [--host 127.0.0.1] [--puerto 8765] [--procesos 4] [--capacidad 256] [--capacidad-mb 512]
+
+Rutas:
+    GET  /estado        estadísticas de la caché y de las simulaciones en curso
+    POST /simular       resumen y diagnóstico de una simulación
+    POST /trayectoria   trayectoria completa en bloques (JSON por línea, chunked)
+    POST /lote          resumen vectorizado de varios escenarios
+
+El cuerpo de /simular y /trayectoria es un objeto con `temp_inicial`,
+`masa_total`, `potencia` y `presion_kpa`; /trayectoria admite además `paso`
+(una de cada `paso` muestras) y `filas_por_bloque`. /lote recibe una lista
+de esos objetos o un objeto con listas.
+
+Las simulaciones se ejecutan en un pool de procesos. Las peticiones con los
+mismos parámetros (según `cache.normalizar_parametros`) que llegan mientras
+la primera sigue calculándose esperan a ese mismo cálculo, y los resultados
+terminados se guardan en una `cache.CacheSimulaciones` (acotada en entradas
+y en bytes) para las repeticiones. Solo usa la
+biblioteca estándar y el núcleo de simulación; no importa tkinter, matplotlib
+ni streamlit.
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import cache
+import simulador
+from propiedades import CERO_ABSOLUTO
+
+PARAMETROS = ('temp_inicial', 'masa_total', 'potencia', 'presion_kpa')
+MAX_CUERPO = 1 << 20
+FILAS_POR_BLOQUE = 5000
+MENSAJE_CERO_ABSOLUTO = f"La temperatura no puede ser menor al cero absoluto ({CERO_ABSOLUTO}°C)."
+
+ESTADOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _a_json(valor):
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"{type(valor).__name__} no es serializable")
+
+
+def _codificar(datos):
+    return json.dumps(datos, default=_a_json, ensure_ascii=False).encode()
+
+
+def _preparar_proceso():
+    return os.getpid()
+
+
+def _ignorar_interrupciones():
+    # Ctrl+C llega a todo el grupo de procesos; el cierre de los hijos lo gobierna el servicio
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _simular_en_proceso(clave):
+    """Trabajo de un proceso: devuelve solo el búfer y el resumen para no serializar cada serie aparte."""
+    resultados = simulador.simular_calentamiento(*clave, max_muestras=simulador.MAX_MUESTRAS)
+    return {nombre: valor for nombre, valor in resultados.items() if nombre not in simulador.COLUMNAS}
+
+
+def _lote_en_proceso(columnas):
+    return simulador.simular_lote(*(columnas[nombre] for nombre in PARAMETROS))
+
+
+def _leer_parametros(datos):
+    """Valida un escenario del cuerpo de la petición y devuelve su clave de caché."""
+    if not isinstance(datos, dict):
+        raise ValueError("Se esperaba un objeto JSON con los parámetros.")
+    faltan = [nombre for nombre in PARAMETROS if datos.get(nombre) is None]
+    if faltan:
+        raise ValueError(f"Faltan los parámetros: {', '.join(faltan)}.")
+    try:
+        clave = cache.normalizar_parametros(*(datos[nombre] for nombre in PARAMETROS))
+    except (TypeError, ValueError):
+        raise ValueError("Los parámetros deben ser numéricos.") from None
+    if not all(np.isfinite(clave)):
+        raise ValueError("Los parámetros deben ser finitos.")
+    if min(clave[1:]) <= 0:
+        raise ValueError("Los valores de masa, potencia y presión deben ser positivos.")
+    if clave[0] < CERO_ABSOLUTO:
+        raise ValueError(MENSAJE_CERO_ABSOLUTO)
+    return clave
+
+
+def _leer_columnas(datos):
+    """Valida el cuerpo de /lote (lista de escenarios u objeto con listas) y lo pasa a columnas."""
+    if isinstance(datos, list):
+        claves = [_leer_parametros(escenario) for escenario in datos]
+        return {nombre: np.array([clave[i] for clave in claves]) for i, nombre in enumerate(PARAMETROS)}
+    if not isinstance(datos, dict):
+        raise ValueError("Se esperaba una lista de escenarios o un objeto con listas de parámetros.")
+
+    faltan = [nombre for nombre in PARAMETROS if datos.get(nombre) is None]
+    if faltan:
+        raise ValueError(f"Faltan los parámetros: {', '.join(faltan)}.")
+    try:
+        columnas = {nombre: np.asarray(datos[nombre], dtype=float) for nombre in PARAMETROS}
+    except (TypeError, ValueError):
+        raise ValueError("Los parámetros deben ser numéricos.") from None
+    if any(columna.ndim > 1 for columna in columnas.values()):
+        raise ValueError("Cada parámetro debe ser un número o una lista de números.")
+    if len({columna.size for columna in columnas.values() if columna.ndim == 1}) > 1:
+        raise ValueError("Las listas de parámetros deben tener la misma longitud.")
+    if not all(np.all(np.isfinite(columna)) for columna in columnas.values()):
+        raise ValueError("Los parámetros deben ser finitos.")
+    if any(np.any(columnas[nombre] <= 0) for nombre in PARAMETROS[1:]):
+        raise ValueError("Los valores de masa, potencia y presión deben ser positivos.")
+    if np.any(columnas['temp_inicial'] < CERO_ABSOLUTO):
+        raise ValueError(MENSAJE_CERO_ABSOLUTO)
+    return columnas
+
+
+def _entero_positivo(datos, nombre, defecto):
+    valor = datos.get(nombre, defecto)
+    if (isinstance(valor, bool) or not isinstance(valor, (int, float)) or not math.isfinite(valor)
+            or valor != int(valor) or valor < 1):
+        raise ValueError(f"'{nombre}' debe ser un entero positivo.")
+    return int(valor)
+
+
+def resumir(resultados):
+    """Parte JSON de un resultado: todo salvo las series."""
+    return {clave: valor for clave, valor in resultados.items()
+            if clave not in simulador.COLUMNAS and clave not in ('trayectoria', 'puntos_control')}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class ServicioSimulacion:
+    """Servidor HTTP/1.1 con keep-alive sobre `asyncio.start_server`.
+
+    `procesos` es el tamaño del pool de procesos; `capacidad` y
+    `capacidad_bytes` acotan los resultados que conserva la caché en memoria.
+    """
+
+    def __init__(self, procesos=None, capacidad=256, capacidad_bytes=512 * 2**20):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.cache = cache.CacheSimulaciones(capacidad, capacidad_bytes=capacidad_bytes)
+        self._pool = None
+        self._en_curso = {}
+        self.peticiones = 0
+        self.coalescidas = 0
+        self.fallos = 0
+
+    async def iniciar(self, host='127.0.0.1', puerto=8765):
+        # 'spawn' para no heredar el bucle de eventos ni sus sockets en los procesos hijos
+        contexto = multiprocessing.get_context('spawn')
+        self._pool = ProcessPoolExecutor(max_workers=self.procesos, mp_context=contexto,
+                                         initializer=_ignorar_interrupciones)
+        # Arranca los procesos antes de aceptar conexiones para que la primera petición no pague la importación
+        bucle = asyncio.get_running_loop()
+        await asyncio.gather(*(bucle.run_in_executor(self._pool, _preparar_proceso)
+                               for _ in range(self.procesos)))
+        return await asyncio.start_server(self._atender, host, puerto)
+
+    def cerrar(self):
+        """Descarta el trabajo pendiente y espera a que terminen los procesos del pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def estadisticas(self):
+        cache_stats = self.cache.estadisticas()
+        return {
+            'peticiones': self.peticiones,
+            'aciertos': cache_stats['aciertos'],
+            'coalescidas': self.coalescidas,
+            'fallos': self.fallos,
+            'en_curso': len(self._en_curso),
+            'en_memoria': cache_stats['en_memoria'],
+            'bytes_en_memoria': cache_stats['bytes_en_memoria'],
+            'procesos': self.procesos,
+        }
+
+    async def obtener(self, clave):
+        """Resultado de la simulación `clave`: de la caché, de un cálculo en curso o de uno nuevo."""
+        resultados = self.cache.buscar(clave)
+        if resultados is not None:
+            return resultados
+
+        futuro = self._en_curso.get(clave)
+        if futuro is not None:
+            self.coalescidas += 1
+        else:
+            self.fallos += 1
+            futuro = asyncio.ensure_future(self._calcular(clave))
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        # shield: si un cliente se desconecta no se cancela el cálculo que esperan los demás
+        return await asyncio.shield(futuro)
+
+    async def _calcular(self, clave):
+        bucle = asyncio.get_running_loop()
+        parcial = await bucle.run_in_executor(self._pool, _simular_en_proceso, clave)
+        return self.cache.guardar(clave, {**dict(zip(simulador.COLUMNAS, parcial['trayectoria'])), **parcial})
+
+    async def _atender(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, objetivo, version = linea.decode('latin-1').split()
+                except ValueError:
+                    await self._responder(escritor, 400, {'error': "Línea de petición no válida."}, False)
+                    break
+
+                cabeceras = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b'\r\n', b'\n', b''):
+                        break
+                    nombre, _, valor = linea.decode('latin-1').partition(':')
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+
+                conexion = cabeceras.get('connection', '').lower()
+                mantener = conexion != 'close' and (version == 'HTTP/1.1' or conexion == 'keep-alive')
+
+                try:
+                    longitud = int(cabeceras.get('content-length') or 0)
+                except ValueError:
+                    longitud = -1
+                if longitud < 0:
+                    await self._responder(escritor, 400, {'error': "Content-Length no válido."}, False)
+                    break
+                if longitud > MAX_CUERPO:
+                    await self._responder(escritor, 413, {'error': "Cuerpo demasiado grande."}, False)
+                    break
+                cuerpo = await lector.readexactly(longitud) if longitud else b''
+
+                self.peticiones += 1
+                await self._despachar(escritor, metodo, urlsplit(objetivo).path, cuerpo, mantener)
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _despachar(self, escritor, metodo, ruta, cuerpo, mantener):
+        rutas = {('GET', '/estado'): self._estado, ('POST', '/simular'): self._simular,
+                 ('POST', '/trayectoria'): self._trayectoria, ('POST', '/lote'): self._lote}
+        manejador = rutas.get((metodo, ruta))
+        try:
+            if manejador is None:
+                if any(r == ruta for _, r in rutas):
+                    raise ErrorHTTP(405, f"Método {metodo} no permitido en {ruta}.")
+                raise ErrorHTTP(404, f"Ruta no encontrada: {ruta}.")
+            try:
+                datos = json.loads(cuerpo) if cuerpo else {}
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise ErrorHTTP(400, "El cuerpo no es JSON válido.") from None
+            await manejador(escritor, datos, mantener)
+        except ErrorHTTP as e:
+            await self._responder(escritor, e.estado, {'error': str(e)}, mantener)
+        except ValueError as e:
+            await self._responder(escritor, 400, {'error': str(e)}, mantener)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            await self._responder(escritor, 500, {'error': str(e)}, mantener)
+
+    async def _responder(self, escritor, estado, datos, mantener):
+        cuerpo = _codificar(datos)
+        escritor.write(f"HTTP/1.1 {estado} {ESTADOS_HTTP[estado]}\r\n"
+                       f"Content-Type: application/json; charset=utf-8\r\n"
+                       f"Content-Length: {len(cuerpo)}\r\n"
+                       f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode() + cuerpo)
+        await escritor.drain()
+
+    async def _estado(self, escritor, datos, mantener):
+        await self._responder(escritor, 200, self.estadisticas(), mantener)
+
+    async def _simular(self, escritor, datos, mantener):
+        clave = _leer_parametros(datos)
+        resultados = await self.obtener(clave)
+        await self._responder(escritor, 200, {'parametros': dict(zip(PARAMETROS, clave)),
+                                              **resumir(resultados)}, mantener)
+
+    async def _trayectoria(self, escritor, datos, mantener):
+        """Envía el resumen y después la trayectoria en bloques, un objeto JSON por línea."""
+        clave = _leer_parametros(datos)
+        paso = _entero_positivo(datos, 'paso', 1)
+        filas_por_bloque = _entero_positivo(datos, 'filas_por_bloque', FILAS_POR_BLOQUE)
+        resultados = await self.obtener(clave)
+        trayectoria = resultados['trayectoria'][:, ::paso]
+
+        escritor.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\n"
+                       b"Transfer-Encoding: chunked\r\n"
+                       + f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode())
+
+        async def enviar(objeto):
+            linea = _codificar(objeto) + b'\n'
+            escritor.write(f"{len(linea):x}\r\n".encode() + linea + b"\r\n")
+            # drain aplica contrapresión: un cliente lento no acumula la trayectoria entera en memoria
+            await escritor.drain()
+
+        await enviar({'parametros': dict(zip(PARAMETROS, clave)), 'filas': trayectoria.shape[1],
+                      **resumir(resultados)})
+        for inicio in range(0, trayectoria.shape[1], filas_por_bloque):
+            bloque = trayectoria[:, inicio:inicio + filas_por_bloque]
+            await enviar({'inicio': inicio, **dict(zip(simulador.COLUMNAS, bloque))})
+        escritor.write(b"0\r\n\r\n")
+        await escritor.drain()
+
+    async def _lote(self, escritor, datos, mantener):
+        columnas = _leer_columnas(datos)
+        bucle = asyncio.get_running_loop()
+        resumen = await bucle.run_in_executor(self._pool, _lote_en_proceso, columnas)
+        await self._responder(escritor, 200, resumen, mantener)
+
+
+async def servir(host, puerto, procesos=None, capacidad=256, capacidad_bytes=512 * 2**20):
+    servicio = ServicioSimulacion(procesos, capacidad, capacidad_bytes)
+    servidor = await servicio.iniciar(host, puerto)
+    direccion = servidor.sockets[0].getsockname()
+    print(f"Servicio de simulación en http://{direccion[0]}:{direccion[1]}", flush=True)
+
+    # SIGTERM y SIGINT paran el servidor de forma ordenada para que `cerrar` recoja los procesos hijos
+    detener = asyncio.Event()
+    bucle = asyncio.get_running_loop()
+    for senal in (signal.SIGTERM, signal.SIGINT):
+        try:
+            bucle.add_signal_handler(senal, detener.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    try:
+        async with servidor:
+            await detener.wait()
+    finally:
+        servicio.cerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP JSON del simulador de calentamiento del agua")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765, help="0 elige un puerto libre")
+    parser.add_argument('--procesos', type=int, default=None, help="tamaño del pool (por defecto, un proceso por CPU)")
+    parser.add_argument('--capacidad', type=int, default=256, help="resultados que se guardan en la caché")
+    parser.add_argument('--capacidad-mb', type=float, default=512, help="memoria máxima de la caché en MiB")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(servir(args.host, args.puerto, args.procesos, args.capacidad,
+                           int(args.capacidad_mb * 2**20)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
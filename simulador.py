@@ -0,0 +1,692 @@
+import time
+
+import numpy as np
+
+from propiedades import PROPIEDADES_ESTANDAR
+
+NOMBRES_FASES = ('Calentamiento del hielo', 'Fusión',
+                 'Calentamiento del líquido', 'Ebullición')
+
+COLUMNAS = ('tiempo', 'temperatura', 'masa_solida', 'masa_liquida', 'masa_vapor')
+
+CLAVES_NODOS = ('nodos_temperatura', 'nodos_solida', 'nodos_liquida', 'nodos_vapor')
+
+# Diferencia máxima, relativa al máximo de cada columna, entre las fases finales copiadas al
+# reanudar y las de una simulación nueva (los nodos se calculan con otro redondeo)
+TOLERANCIA_SUFIJO = 1e-12
+
+# Tope de muestras de las trayectorias que guardan las interfaces y la caché (8 MB en float64)
+MAX_MUESTRAS = 200000
+
+
+def calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades=None):
+    """Calcula la energía que absorbe cada fase y el estado en cada cambio de fase.
+
+    Con potencia constante el estado es lineal a tramos en la energía absorbida.
+    Con calores específicos constantes bastan cinco nodos: inicio, fin del
+    calentamiento del hielo, fin de la fusión, fin del calentamiento del líquido
+    y fin de la ebullición. Si `propiedades` define cp dependiente de la
+    temperatura, las fases de calentamiento llevan además los nodos de su tabla.
+    """
+    propiedades = propiedades or PROPIEDADES_ESTANDAR
+    temp_saturacion = propiedades.temperatura_saturacion(presion_kpa)
+    m = masa_total
+
+    if temp_inicial < 0:
+        temps_hielo = propiedades.hielo.nodos(temp_inicial, 0.0)
+        energias_hielo = m * (propiedades.hielo.entalpia(temps_hielo)
+                              - propiedades.hielo.entalpia(temp_inicial))
+        energia_fusion = m * propiedades.lf
+        temp_liquido = 0.0
+        solida_fusion, liquida_fusion = [m, 0.0], [0.0, m]
+    else:
+        temps_hielo = np.array([temp_inicial, temp_inicial])
+        energias_hielo = np.zeros(2)
+        energia_fusion = 0.0
+        temp_liquido = temp_inicial
+        solida_fusion, liquida_fusion = [0.0, 0.0], [m, m]
+
+    temps_liquido = propiedades.liquido.nodos(temp_liquido, max(temp_saturacion, temp_liquido))
+    energias_liquido = m * (propiedades.liquido.entalpia(temps_liquido)
+                            - propiedades.liquido.entalpia(temp_liquido))
+    temp_ebullicion = max(temp_liquido, temp_saturacion)
+
+    # Por encima del punto crítico el líquido pasa a vapor sin absorber calor latente
+    lv = propiedades.entalpia_vaporizacion(temp_ebullicion)
+    energia_ebullicion = m * lv if lv > 0 else 0.0
+
+    # (energías desde el inicio de la fase, temperatura, sólida, líquida, vapor) de cada fase
+    tramos = [
+        (energias_hielo, temps_hielo, np.full(len(temps_hielo), m - liquida_fusion[0]),
+         np.full(len(temps_hielo), liquida_fusion[0]), np.zeros(len(temps_hielo))),
+        ([0.0, energia_fusion], [temp_liquido] * 2, solida_fusion, liquida_fusion, [0.0, 0.0]),
+        (energias_liquido, temps_liquido, np.zeros(len(temps_liquido)),
+         np.full(len(temps_liquido), m), np.zeros(len(temps_liquido))),
+        ([0.0, energia_ebullicion], [temp_ebullicion] * 2, [0.0, 0.0], [m, 0.0], [0.0, m]),
+    ]
+
+    energias = [float(tramo[0][-1]) for tramo in tramos]
+    limites = np.concatenate(([0.0], np.cumsum(energias)))
+
+    nodos = [[0.0]] + [[tramos[0][k][0]] for k in range(1, 5)]
+    for limite, tramo in zip(limites, tramos):
+        nodos[0].extend(limite + np.asarray(tramo[0][1:], dtype=float))
+        for k in range(1, 5):
+            nodos[k].extend(tramo[k][1:])
+
+    return {
+        'temp_saturacion': temp_saturacion,
+        'lv': lv,
+        'energias': energias,
+        'limites_energia': limites,
+        'nodos_energia': np.array(nodos[0]),
+        'nodos_temperatura': np.array(nodos[1], dtype=float),
+        'nodos_solida': np.array(nodos[2], dtype=float),
+        'nodos_liquida': np.array(nodos[3], dtype=float),
+        'nodos_vapor': np.array(nodos[4], dtype=float),
+    }
+
+
+def estado_por_energia(fases, energia):
+    """Devuelve (temperatura, masa sólida, masa líquida, masa vapor) tras absorber `energia` J."""
+    nodos = fases['nodos_energia']
+
+    # Las fases de duración nula se descartan para que np.interp vea nodos crecientes
+    mantener = np.append(np.diff(nodos) > 0, True)
+    xp = nodos[mantener]
+
+    return tuple(np.interp(energia, xp, fases[clave][mantener]) for clave in CLAVES_NODOS)
+
+
+def crear_trayectoria(n, dtype=np.float64):
+    """Reserva un búfer columnar (una fila contigua por serie) para `n` muestras.
+
+    Devuelve el búfer y un diccionario de vistas sin copia, una por columna.
+    """
+    trayectoria = np.empty((len(COLUMNAS), n), dtype=dtype)
+    return trayectoria, dict(zip(COLUMNAS, trayectoria))
+
+
+def paso_muestreo(tiempo_total, dt=1.0, max_muestras=None):
+    """Paso con el que la rejilla hasta `tiempo_total` no pasa de `max_muestras` muestras.
+
+    Sin `max_muestras` devuelve `dt`; si no, `dt` por el menor factor de la
+    serie 1, 2, 5, 10, 20, 50... que basta. Al ser un múltiplo, las muestras
+    de la rejilla gruesa coinciden con muestras de la de `dt`, y al usar pocos
+    factores las corridas de duración parecida comparten paso y pueden
+    reanudarse unas de otras.
+    """
+    if max_muestras is None:
+        return dt
+    if max_muestras < 2:
+        raise ValueError("Se necesitan al menos dos muestras.")
+    escala = 1
+    while True:
+        for factor in (escala, 2 * escala, 5 * escala):
+            if np.ceil(tiempo_total / (dt * factor)) + 1 <= max_muestras:
+                return dt * factor
+        escala *= 10
+
+
+def _validar_parametros(masa_total, potencia, presion_kpa):
+    if masa_total <= 0 or potencia <= 0 or presion_kpa <= 0:
+        raise ValueError("Los valores de masa, potencia y presión deben ser positivos.")
+
+
+def resumen_fases(fases, potencia):
+    """Energía y tiempos totales y de fin de cada fase con potencia constante."""
+    energia_total = float(fases['limites_energia'][-1])
+    return {
+        'temp_saturacion': fases['temp_saturacion'],
+        'energia_total': energia_total,
+        'tiempo_total': energia_total / potencia,
+        'tiempos_fase': fases['limites_energia'][1:] / potencia,
+    }
+
+
+def _selecciones_fase(energia, limites):
+    """Muestras de cada fase: cortes contiguos si la energía crece, máscaras si no."""
+    if np.all(energia[1:] >= energia[:-1]):
+        cortes = [0, *np.searchsorted(energia, limites[1:4], side='left').tolist(), energia.size]
+        return [slice(inicio, fin) for inicio, fin in zip(cortes[:-1], cortes[1:])]
+    indice_fase = np.searchsorted(limites[1:4], energia, side='right')
+    return [indice_fase == k for k in range(4)]
+
+
+def _llenar_estado(series, fases, potencia, al_perfilar=None):
+    """Rellena las columnas de estado a partir de la columna de tiempo ya escrita.
+
+    Las muestras se evalúan fase a fase para medir cuántas caen en cada una y
+    cuánto tarda cada tramo. Devuelve una lista de (muestras, segundos) por
+    fase y, si se indica, llama a `al_perfilar(nombre_fase, muestras, segundos)`.
+    """
+    energia = potencia * series['tiempo'].astype(float)
+    selecciones = _selecciones_fase(energia, fases['limites_energia'])
+
+    metricas = []
+    for nombre, seleccion in zip(NOMBRES_FASES, selecciones):
+        inicio = time.perf_counter()
+        estado = estado_por_energia(fases, energia[seleccion])
+        for clave, valores in zip(COLUMNAS[1:], estado):
+            series[clave][seleccion] = valores
+        segundos = time.perf_counter() - inicio
+        muestras = int(np.count_nonzero(seleccion)) if isinstance(seleccion, np.ndarray) \
+            else seleccion.stop - seleccion.start
+
+        metricas.append((muestras, segundos))
+        if al_perfilar is not None:
+            al_perfilar(nombre, muestras, segundos)
+    return metricas
+
+
+def entalpia_estado(temperatura, masa_solida, masa_liquida, masa_vapor, lv, propiedades=None):
+    """Entalpía del agua (J) respecto a hielo a 0 °C, calculada solo a partir del estado.
+
+    Suma el calor sensible de cada fase y el latente de la masa fundida y
+    evaporada, sin pasar por las energías de `calcular_fases`, de modo que
+    sirve para comprobar el balance de energía de una trayectoria.
+    """
+    propiedades = propiedades or PROPIEDADES_ESTANDAR
+    temperatura = np.asarray(temperatura, dtype=float)
+    masa_solida = np.asarray(masa_solida, dtype=float)
+    masa_fundida = np.asarray(masa_liquida, dtype=float) + np.asarray(masa_vapor, dtype=float)
+
+    sensible_hielo = propiedades.hielo.entalpia(np.minimum(temperatura, 0.0)) - propiedades.hielo.entalpia(0.0)
+    sensible_liquido = propiedades.liquido.entalpia(np.maximum(temperatura, 0.0)) - propiedades.liquido.entalpia(0.0)
+    return (masa_solida * sensible_hielo + masa_fundida * (propiedades.lf + sensible_liquido)
+            + np.asarray(masa_vapor, dtype=float) * lv)
+
+
+def _diagnostico(fases, series, potencia, metricas, propiedades=None, evaluar=None, residuos_previos=None):
+    """Métricas por fase y residuo del balance de energía de una trayectoria.
+
+    El residuo compara, muestra a muestra, la energía aportada `potencia * t`
+    (hasta la evaporización completa) con la variación de entalpía del estado
+    simulado; mide la energía que se pierde o se inventa al muestrear. Se
+    calcula por fase; `evaluar` limita las muestras revisadas de cada fase (una
+    lista de selecciones por fase) y `residuos_previos` aporta el residuo ya
+    conocido de las muestras no revisadas.
+    """
+    energias = fases['energias']
+    energia_total = float(fases['limites_energia'][-1])
+    tiempos_fase = fases['limites_energia'][1:] / potencia
+
+    inicial = [fases[clave][0] for clave in CLAVES_NODOS]
+    h_inicial = entalpia_estado(*inicial, fases['lv'], propiedades)
+    if evaluar is None:
+        energia = potencia * series['tiempo'].astype(float)
+        evaluar = [[seleccion] for seleccion in _selecciones_fase(energia, fases['limites_energia'])]
+
+    residuos = []
+    for k, selecciones in enumerate(evaluar):
+        residuo = residuos_previos[k] if residuos_previos else 0.0
+        for seleccion in selecciones:
+            absorbida = entalpia_estado(*(series[clave][seleccion] for clave in COLUMNAS[1:]),
+                                        fases['lv'], propiedades) - h_inicial
+            if absorbida.size:
+                aportada = np.minimum(potencia * series['tiempo'][seleccion].astype(float), energia_total)
+                residuo = max(residuo, float(np.max(np.abs(aportada - absorbida))))
+        residuos.append(residuo)
+    residuo = max(residuos)
+
+    return {
+        'fases': [{'nombre': nombre, 'muestras': muestras, 'segundos': segundos,
+                   'tiempo_fin': float(t_fin), 'energia': float(energia), 'residuo': residuo_fase}
+                  for nombre, (muestras, segundos), t_fin, energia, residuo_fase
+                  in zip(NOMBRES_FASES, metricas, tiempos_fase, energias, residuos)],
+        'energia_sensible': float(energias[0] + energias[2]),
+        'energia_latente': float(energias[1] + energias[3]),
+        'residuo_energia': residuo,
+        'residuo_relativo': residuo / energia_total if energia_total > 0 else 0.0,
+    }
+
+
+def _combinar_diagnosticos(diagnosticos):
+    """Agrega los diagnósticos de varios bloques de una misma simulación."""
+    combinado = {**diagnosticos[-1], 'fases': [dict(fase) for fase in diagnosticos[-1]['fases']]}
+    for k, fase in enumerate(combinado['fases']):
+        fase['muestras'] = sum(d['fases'][k]['muestras'] for d in diagnosticos)
+        fase['segundos'] = sum(d['fases'][k]['segundos'] for d in diagnosticos)
+        fase['residuo'] = max(d['fases'][k]['residuo'] for d in diagnosticos)
+    for clave in ('residuo_energia', 'residuo_relativo'):
+        combinado[clave] = max(d[clave] for d in diagnosticos)
+    return combinado
+
+
+def simular_calentamiento(temp_inicial, masa_total, potencia, presion_kpa, tiempos=None, dt=1.0,
+                          dtype=np.float64, propiedades=None, al_perfilar=None, max_muestras=None):
+    """Simula la curva de calentamiento resolviendo cada fase de forma analítica.
+
+    Si no se indican `tiempos`, la trayectoria se muestrea cada `dt` segundos
+    hasta la evaporización completa, incluyendo el instante final; con
+    `max_muestras` el paso crece según `paso_muestreo` para no superarlas. Las series
+    del resultado son vistas de un único búfer `trayectoria` del tipo `dtype`.
+    `propiedades` permite sustituir las propiedades estándar del agua.
+
+    El resultado incluye `diagnostico`: muestras y tiempo de cálculo por fase,
+    energía de cada fase y residuo del balance de energía. `al_perfilar`
+    recibe esas métricas fase a fase (ver `_llenar_estado`). Con la rejilla
+    de `dt` incluye también `puntos_control` para `reanudar_calentamiento`.
+    """
+    _validar_parametros(masa_total, potencia, presion_kpa)
+
+    fases = calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades)
+    resumen = resumen_fases(fases, potencia)
+    tiempo_total = resumen['tiempo_total']
+
+    if tiempos is None:
+        dt = paso_muestreo(tiempo_total, dt, max_muestras)
+        n = int(np.ceil(tiempo_total / dt)) + 1
+        trayectoria, series = crear_trayectoria(n, dtype)
+        np.multiply(np.arange(n - 1), dt, out=series['tiempo'][:-1], casting='unsafe')
+        series['tiempo'][-1] = tiempo_total
+    else:
+        tiempos = np.asarray(tiempos, dtype=float)
+        trayectoria, series = crear_trayectoria(tiempos.size, dtype)
+        series['tiempo'][:] = tiempos
+
+    metricas = _llenar_estado(series, fases, potencia, al_perfilar)
+    diagnostico = _diagnostico(fases, series, potencia, metricas, propiedades)
+
+    resultados = {**series, 'trayectoria': trayectoria, **resumen, 'diagnostico': diagnostico}
+    if tiempos is None:
+        resultados['puntos_control'] = puntos_control(fases, potencia, dt)
+    return resultados
+
+
+def simular_por_bloques(temp_inicial, masa_total, potencia, presion_kpa, dt=1.0,
+                        tamano_bloque=5000, dtype=np.float64, propiedades=None, al_perfilar=None,
+                        max_muestras=None, bufer_unico=False):
+    """Genera la misma trayectoria que `simular_calentamiento` en bloques consecutivos.
+
+    Cada bloque es un diccionario con las series de hasta `tamano_bloque`
+    muestras y el resumen de la simulación, de modo que el consumidor puede
+    dibujar o cancelar sin esperar a la trayectoria completa. El `diagnostico`
+    de cada bloque cubre solo sus muestras; `unir_bloques` los agrega. Con
+    `bufer_unico` los bloques son vistas de una sola trayectoria reservada al
+    principio, y `unir_bloques` la devuelve sin copiarla; sin él, la memoria
+    se limita a un bloque cada vez.
+    """
+    _validar_parametros(masa_total, potencia, presion_kpa)
+
+    fases = calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades)
+    resumen = resumen_fases(fases, potencia)
+    tiempo_total = resumen['tiempo_total']
+    dt = paso_muestreo(tiempo_total, dt, max_muestras)
+    n = int(np.ceil(tiempo_total / dt)) + 1
+    control = puntos_control(fases, potencia, dt)
+    completa = crear_trayectoria(n, dtype)[0] if bufer_unico else None
+
+    for inicio in range(0, n, tamano_bloque):
+        fin = min(inicio + tamano_bloque, n)
+        if completa is None:
+            trayectoria, series = crear_trayectoria(fin - inicio, dtype)
+        else:
+            trayectoria = completa[:, inicio:fin]
+            series = dict(zip(COLUMNAS, trayectoria))
+        np.multiply(np.arange(inicio, fin), dt, out=series['tiempo'], casting='unsafe')
+        if fin == n:
+            series['tiempo'][-1] = tiempo_total
+
+        metricas = _llenar_estado(series, fases, potencia, al_perfilar)
+        diagnostico = _diagnostico(fases, series, potencia, metricas, propiedades)
+        yield {**series, 'trayectoria': trayectoria, **resumen, 'diagnostico': diagnostico,
+               'puntos_control': control}
+
+
+def _vista_contigua(trayectorias):
+    """Vista que cubre `trayectorias` si son tramos consecutivos de un mismo búfer, o None."""
+    base = trayectorias[0].base
+    if base is None or base.ndim != 2:
+        return None
+    inicio = fin = None
+    for trayectoria in trayectorias:
+        if trayectoria.base is not base or trayectoria.strides != base.strides:
+            return None
+        desplazamiento = (trayectoria.__array_interface__['data'][0]
+                          - base.__array_interface__['data'][0]) // base.itemsize
+        if fin is not None and desplazamiento != fin:
+            return None
+        inicio = desplazamiento if inicio is None else inicio
+        fin = desplazamiento + trayectoria.shape[1]
+    return base[:, inicio:fin]
+
+
+def unir_bloques(bloques):
+    """Une los bloques de `simular_por_bloques` en un resultado como el de `simular_calentamiento`.
+
+    Los bloques de `bufer_unico` se unen sin copia, como una vista de su búfer.
+    """
+    trayectorias = [bloque['trayectoria'] for bloque in bloques]
+    trayectoria = _vista_contigua(trayectorias)
+    if trayectoria is None:
+        trayectoria = np.concatenate(trayectorias, axis=1)
+    resumen = {clave: valor for clave, valor in bloques[-1].items()
+               if clave not in COLUMNAS and clave != 'trayectoria'}
+    if all('diagnostico' in bloque for bloque in bloques):
+        resumen['diagnostico'] = _combinar_diagnosticos([bloque['diagnostico'] for bloque in bloques])
+    return {**dict(zip(COLUMNAS, trayectoria)), 'trayectoria': trayectoria, **resumen}
+
+
+def puntos_control(fases, potencia, dt):
+    """Estado en cada frontera de fase, con lo necesario para reanudar desde ahí.
+
+    `puntos[k]` es el estado al empezar la fase k (el último, al terminar la
+    ebullición). Junto a ellos se guardan las fases, la potencia y el paso de
+    la rejilla, que deciden qué puntos siguen siendo válidos con otros
+    parámetros.
+    """
+    limites = fases['limites_energia']
+    estados = estado_por_energia(fases, limites)
+    return {
+        'potencia': float(potencia),
+        'dt': float(dt),
+        'fases': fases,
+        'puntos': [{'tiempo': float(energia / potencia), 'energia': float(energia),
+                    **{clave: float(valores[k]) for clave, valores in zip(COLUMNAS[1:], estados)}}
+                   for k, energia in enumerate(limites)],
+    }
+
+
+def _cortes_rejilla(limites, potencia, dt, n, tiempo_total, dtype):
+    """Primera muestra de cada fase en la rejilla de `dt`, sin construir la columna de tiempo.
+
+    Reproduce el `searchsorted` de `_selecciones_fase` con la misma aritmética
+    (y el mismo redondeo a `dtype`) que la columna de tiempo.
+    """
+    tipo = np.dtype(dtype).type
+
+    def energia(i):
+        return potencia * float(tipo(tiempo_total if i == n - 1 else i * dt))
+
+    cortes = [0]
+    for limite in limites[1:4]:
+        i = min(max(int(np.ceil(limite / (potencia * dt))), 0), n)
+        while i > 0 and energia(i - 1) >= limite:
+            i -= 1
+        while i < n and energia(i) < limite:
+            i += 1
+        cortes.append(i)
+    return cortes + [n]
+
+
+def _curva(fases, inicio, fin):
+    """Nodos de las fases `inicio`..`fin - 1`, con la energía relativa al inicio de `inicio`."""
+    limites = fases['limites_energia']
+    nodos = fases['nodos_energia']
+    margen = 1e-12 * max(float(limites[-1]), 1.0)
+    dentro = (nodos >= limites[inicio] - margen) & (nodos <= limites[fin] + margen)
+    return np.vstack([nodos[dentro] - limites[inicio], *(fases[clave][dentro] for clave in CLAVES_NODOS)])
+
+
+def _curvas_iguales(previas, fases, inicio, fin, exacta=True):
+    a, b = _curva(previas, inicio, fin), _curva(fases, inicio, fin)
+    if a.shape != b.shape:
+        return False
+    if exacta:
+        return bool(np.array_equal(a, b))
+    escala = np.maximum(np.abs(a), np.abs(b)).max(axis=1, keepdims=True)
+    return bool(np.all(np.abs(a - b) <= TOLERANCIA_SUFIJO * escala))
+
+
+def _planificar(anterior, fases, potencia, dt, dtype, cortes):
+    """Qué muestras de `anterior` se pueden copiar en la nueva trayectoria.
+
+    El prefijo llega hasta el último punto de control con las mismas fases
+    previas. El sufijo empieza en el primer punto desde el que las fases
+    restantes son iguales y la diferencia de tiempo es un número entero de
+    muestras; la última muestra (el instante final exacto) nunca se copia.
+    """
+    control = anterior.get('puntos_control')
+    if (control is None or control['potencia'] != potencia or control['dt'] != dt
+            or anterior['trayectoria'].dtype != np.dtype(dtype)):
+        return None
+    previas = control['fases']
+    muestras_previas = [fase['muestras'] for fase in anterior['diagnostico']['fases']]
+    cortes_previos = np.concatenate(([0], np.cumsum(muestras_previas))).tolist()
+
+    prefijo = 0
+    while (prefijo < 4 and _curvas_iguales(previas, fases, 0, prefijo + 1)
+           and cortes_previos[prefijo + 1] == cortes[prefijo + 1]):
+        prefijo += 1
+
+    sufijo, desplazamiento, inicio, fin = 4, 0, 0, 0
+    for k in range(prefijo + 1, 4):
+        muestras = (fases['limites_energia'][k] - previas['limites_energia'][k]) / (potencia * dt)
+        if abs(muestras - round(muestras)) > 1e-9 * max(abs(muestras), 1.0):
+            continue
+        if _curvas_iguales(previas, fases, k, 4, exacta=False):
+            sufijo, desplazamiento = k, int(round(muestras))
+            inicio = max(cortes[k], cortes_previos[k] + desplazamiento)
+            fin = min(cortes[4] - 1, cortes_previos[4] - 1 + desplazamiento)
+            break
+
+    reutilizadas = cortes[prefijo] + max(fin - inicio, 0)
+    if reutilizadas == 0:
+        return None
+    return {'anterior': anterior, 'prefijo': prefijo, 'sufijo': sufijo, 'desplazamiento': desplazamiento,
+            'inicio_sufijo': inicio, 'fin_sufijo': fin, 'muestras': reutilizadas}
+
+
+def planificar_reanudacion(anteriores, temp_inicial, masa_total, potencia, presion_kpa, dt=1.0,
+                           dtype=np.float64, propiedades=None, max_muestras=None):
+    """Plan de `reanudar_calentamiento`: el resultado previo que más muestras ahorra, o None.
+
+    Solo calcula las fases, así que sirve para decidir barato si merece la
+    pena reanudar. El plan indica el punto de control desde el que se reanuda
+    (`prefijo`), la primera fase copiada al final (`sufijo`) y las `muestras`
+    reutilizadas.
+    """
+    _validar_parametros(masa_total, potencia, presion_kpa)
+    fases = calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades)
+    dt = paso_muestreo(float(fases['limites_energia'][-1]) / potencia, dt, max_muestras)
+    return _mejor_plan(anteriores, fases, potencia, dt, dtype)
+
+
+def _mejor_plan(anteriores, fases, potencia, dt, dtype):
+    tiempo_total = float(fases['limites_energia'][-1]) / potencia
+    n = int(np.ceil(tiempo_total / dt)) + 1
+    cortes = _cortes_rejilla(fases['limites_energia'], potencia, dt, n, tiempo_total, dtype)
+    planes = [plan for plan in (_planificar(anterior, fases, potencia, dt, dtype, cortes)
+                                for anterior in anteriores) if plan is not None]
+    mejor = max(planes, key=lambda plan: plan['muestras'], default=None)
+    if mejor is not None:
+        mejor['cortes'] = cortes
+    return mejor
+
+
+def reanudar_calentamiento(anteriores, temp_inicial, masa_total, potencia, presion_kpa, dt=1.0,
+                           dtype=np.float64, propiedades=None, al_perfilar=None, max_muestras=None):
+    """Igual que `simular_calentamiento`, pero sin recalcular las fases que no cambian.
+
+    `anteriores` son resultados previos con `puntos_control`. Se reanuda desde
+    el último punto de control válido del que más muestras permita reutilizar:
+    las fases anteriores a ese punto se copian (p. ej. el hielo y la fusión al
+    cambiar solo la presión). Las fases finales también se copian si solo se
+    desplazan un número entero de muestras (p. ej. al cambiar la temperatura
+    inicial del hielo con una potencia que lo permita). Solo se evalúan y se
+    comprueban en el balance de energía las muestras restantes. El resultado
+    incluye `reanudacion` con el punto de control y las muestras reutilizadas.
+
+    Las fases del prefijo coinciden bit a bit con `simular_calentamiento`. Las
+    del sufijo coinciden salvo redondeo: cada columna difiere como mucho
+    TOLERANCIA_SUFIJO veces su valor máximo.
+    """
+    _validar_parametros(masa_total, potencia, presion_kpa)
+
+    fases = calcular_fases(temp_inicial, masa_total, presion_kpa, propiedades)
+    dt = paso_muestreo(float(fases['limites_energia'][-1]) / potencia, dt, max_muestras)
+    plan = _mejor_plan(anteriores, fases, potencia, dt, dtype)
+    if plan is None:
+        resultados = simular_calentamiento(temp_inicial, masa_total, potencia, presion_kpa, dt=dt,
+                                           dtype=dtype, propiedades=propiedades, al_perfilar=al_perfilar)
+        resultados['reanudacion'] = {'punto_control': 0, 'fases': [], 'muestras': 0}
+        return resultados
+
+    resumen = resumen_fases(fases, potencia)
+    cortes = plan['cortes']
+    n = cortes[-1]
+    trayectoria, series = crear_trayectoria(n, dtype)
+    np.multiply(np.arange(n - 1), dt, out=series['tiempo'][:-1], casting='unsafe')
+    series['tiempo'][-1] = resumen['tiempo_total']
+
+    previa = plan['anterior']['trayectoria']
+    fases_previas = plan['anterior']['diagnostico']['fases']
+    desplazamiento = plan['desplazamiento']
+
+    metricas, evaluar, residuos_previos, reutilizadas = [], [], [], []
+    for k, nombre in enumerate(NOMBRES_FASES):
+        inicio = time.perf_counter()
+        a, b = cortes[k], cortes[k + 1]
+        if k < plan['prefijo']:
+            copia, origen = (a, b), a
+        elif k >= plan['sufijo']:
+            desde = min(max(plan['inicio_sufijo'], a), b)
+            copia, origen = (desde, max(min(plan['fin_sufijo'], b), desde)), desde - desplazamiento
+        else:
+            copia, origen = (a, a), a
+
+        if copia[1] > copia[0]:
+            trayectoria[1:, copia[0]:copia[1]] = previa[1:, origen:origen + copia[1] - copia[0]]
+            reutilizadas.append(nombre)
+        pendientes = [rango for rango in (slice(a, copia[0]), slice(copia[1], b)) if rango.stop > rango.start]
+        for rango in pendientes:
+            estado = estado_por_energia(fases, potencia * series['tiempo'][rango].astype(float))
+            for clave, valores in zip(COLUMNAS[1:], estado):
+                series[clave][rango] = valores
+        segundos = time.perf_counter() - inicio
+
+        metricas.append((b - a, segundos))
+        evaluar.append(pendientes)
+        residuos_previos.append(fases_previas[k]['residuo'] if copia[1] > copia[0] else 0.0)
+        if al_perfilar is not None:
+            al_perfilar(nombre, b - a, segundos)
+
+    diagnostico = _diagnostico(fases, series, potencia, metricas, propiedades, evaluar, residuos_previos)
+    return {**series, 'trayectoria': trayectoria, **resumen, 'diagnostico': diagnostico,
+            'puntos_control': puntos_control(fases, potencia, dt),
+            'reanudacion': {'punto_control': plan['prefijo'], 'fases': reutilizadas,
+                            'muestras': plan['muestras']}}
+
+
+def calcular_fases_lote(temp_inicial, masa_total, presion_kpa, propiedades=None):
+    """Versión vectorizada de `calcular_fases` para arreglos de escenarios.
+
+    Devuelve la energía de cada fase con forma (escenarios, 4) y los datos por
+    escenario necesarios para reconstruir el estado. Las propiedades se
+    evalúan sobre sus tablas interpoladas.
+    """
+    propiedades = propiedades or PROPIEDADES_ESTANDAR
+    temp_inicial, masa_total, presion_kpa = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float).ravel() for x in (temp_inicial, masa_total, presion_kpa)))
+
+    temp_saturacion = propiedades.temperatura_saturacion(presion_kpa)
+    solido = temp_inicial < 0
+
+    temp_liquido = np.where(solido, 0.0, temp_inicial)
+    temp_ebullicion = np.maximum(temp_liquido, temp_saturacion)
+    lv = propiedades.entalpia_vaporizacion(temp_ebullicion)
+
+    energias = np.empty((temp_inicial.size, 4))
+    energias[:, 0] = np.where(solido, masa_total * (propiedades.hielo.entalpia(0.0)
+                                                    - propiedades.hielo.entalpia(temp_inicial)), 0.0)
+    energias[:, 1] = np.where(solido, masa_total * propiedades.lf, 0.0)
+    energias[:, 2] = masa_total * (propiedades.liquido.entalpia(temp_ebullicion)
+                                   - propiedades.liquido.entalpia(temp_liquido))
+    energias[:, 3] = masa_total * np.maximum(lv, 0.0)
+
+    return {
+        'temp_inicial': temp_inicial,
+        'masa_total': masa_total,
+        'temp_saturacion': temp_saturacion,
+        'temp_liquido': temp_liquido,
+        'temp_ebullicion': temp_ebullicion,
+        'solido': solido,
+        'energias': energias,
+    }
+
+
+def simular_lote(temp_inicial, masa_total, potencia, presion_kpa, tiempos=None, propiedades=None):
+    """Simula muchos escenarios a la vez con lógica de fases vectorizada.
+
+    Los cuatro parámetros se combinan con las reglas de broadcasting de NumPy.
+    Siempre se devuelven resúmenes por escenario (con la forma combinada de los
+    parámetros); si se pasan `tiempos`, también las trayectorias con forma
+    (escenarios..., len(tiempos)).
+    """
+    forma = np.broadcast_shapes(*(np.shape(x) for x in (temp_inicial, masa_total, potencia, presion_kpa)))
+    potencia = np.broadcast_to(np.asarray(potencia, dtype=float), forma).ravel()
+    fases = calcular_fases_lote(np.broadcast_to(temp_inicial, forma),
+                                np.broadcast_to(masa_total, forma),
+                                np.broadcast_to(presion_kpa, forma), propiedades)
+    masa_total = fases['masa_total']
+
+    if np.any(masa_total <= 0) or np.any(potencia <= 0) or np.any(np.asarray(presion_kpa) <= 0):
+        raise ValueError("Los valores de masa, potencia y presión deben ser positivos.")
+
+    limites = np.cumsum(fases['energias'], axis=1) / potencia[:, None]
+
+    resultados = {
+        'temp_saturacion': fases['temp_saturacion'].reshape(forma),
+        'tiempo_fusion': limites[:, 1].reshape(forma),
+        'tiempo_ebullicion': limites[:, 2].reshape(forma),
+        'tiempo_total': limites[:, 3].reshape(forma),
+        'energia_total': (limites[:, 3] * potencia).reshape(forma),
+    }
+
+    if tiempos is None:
+        return resultados
+
+    tiempos = np.asarray(tiempos, dtype=float)
+    energia = potencia[:, None] * tiempos[None, :]
+    inicios = np.concatenate((np.zeros((masa_total.size, 1)),
+                              np.cumsum(fases['energias'], axis=1)[:, :3]), axis=1)
+
+    # Fracción completada de cada fase; las fases de energía nula cuentan como completas
+    fracciones = []
+    for k in range(4):
+        e_fase = fases['energias'][:, k:k + 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            f = np.clip((energia - inicios[:, k:k + 1]) / e_fase, 0.0, 1.0)
+        fracciones.append(np.where(e_fase > 0, f, (energia >= inicios[:, k:k + 1]).astype(float)))
+
+    m = masa_total[:, None]
+    solido = fases['solido'][:, None]
+    t0 = fases['temp_inicial'][:, None]
+    t_liq = fases['temp_liquido'][:, None]
+    t_eb = fases['temp_ebullicion'][:, None]
+
+    propiedades = propiedades or PROPIEDADES_ESTANDAR
+    if propiedades.cp_constante:
+        temperatura = t0 + fracciones[0] * (t_liq - t0) + fracciones[2] * (t_eb - t_liq)
+    else:
+        # La energía es lineal en la entalpía sensible; la temperatura sale de la tabla inversa
+        h_inicial = propiedades.hielo.entalpia(t0)
+        temperatura = np.where(solido, propiedades.hielo.temperatura(
+            h_inicial + fracciones[0] * (propiedades.hielo.entalpia(0.0) - h_inicial)), t0)
+        h_liquido = propiedades.liquido.entalpia(t_liq)
+        temperatura = np.where(fracciones[2] > 0, propiedades.liquido.temperatura(
+            h_liquido + fracciones[2] * (propiedades.liquido.entalpia(t_eb) - h_liquido)), temperatura)
+    masa_solida = np.where(solido, m * (1 - fracciones[1]), 0.0)
+    masa_vapor = m * fracciones[3]
+    masa_liquida = np.maximum(m - masa_solida - masa_vapor, 0.0)
+
+    forma_trayectoria = forma + tiempos.shape
+    resultados.update({
+        'tiempo': tiempos,
+        'temperatura': temperatura.reshape(forma_trayectoria),
+        'masa_solida': masa_solida.reshape(forma_trayectoria),
+        'masa_liquida': masa_liquida.reshape(forma_trayectoria),
+        'masa_vapor': masa_vapor.reshape(forma_trayectoria),
+    })
+    return resultados
+
+
+def indices_muestreo(tiempos, detalle=60, intervalo=30):
+    """Índices de las muestras a tabular: todas hasta `detalle` s, luego cada `intervalo` s y siempre la última."""
+    tiempos = np.asarray(tiempos)
+    mascara = tiempos <= detalle
+    if intervalo > 0:
+        mascara |= (tiempos % intervalo == 0)
+    mascara[-1:] = True
+    return np.flatnonzero(mascara)
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+import conduccion
+import simulador
+
+
+def sistema_dominante(n, semilla):
+    generador = np.random.default_rng(semilla)
+    inferior = generador.uniform(-1.0, 1.0, n)
+    superior = generador.uniform(-1.0, 1.0, n)
+    diagonal = np.abs(inferior) + np.abs(superior) + generador.uniform(0.5, 2.0, n)
+    derecha = generador.uniform(-10.0, 10.0, n)
+    return inferior, diagonal, superior, derecha
+
+
+def matriz_densa(inferior, diagonal, superior):
+    return np.diag(diagonal) + np.diag(inferior[1:], -1) + np.diag(superior[:-1], 1)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 37, 64, 1000])
+def test_tridiagonal_igual_a_la_solucion_densa(n):
+    inferior, diagonal, superior, derecha = sistema_dominante(n, n)
+    x = conduccion.resolver_tridiagonal(inferior, diagonal, superior, derecha)
+    matriz = matriz_densa(inferior, diagonal, superior)
+    esperado = np.linalg.solve(matriz, derecha)
+    escala = np.max(np.abs(esperado))
+    assert np.max(np.abs(x - esperado)) <= 1e-14 * n * escala
+    assert np.max(np.abs(matriz @ x - derecha)) <= 1e-14 * n * np.max(np.abs(derecha))
+
+
+def test_tridiagonal_ignora_los_extremos_y_no_modifica_las_entradas():
+    inferior, diagonal, superior, derecha = sistema_dominante(10, 0)
+    inferior[0], superior[-1] = 1e6, -1e6
+    copias = [v.copy() for v in (inferior, diagonal, superior, derecha)]
+    x = conduccion.resolver_tridiagonal(inferior, diagonal, superior, derecha)
+    np.testing.assert_allclose(x, np.linalg.solve(matriz_densa(inferior, diagonal, superior), derecha),
+                               rtol=0, atol=1e-13)
+    for original, copia in zip((inferior, diagonal, superior, derecha), copias):
+        np.testing.assert_array_equal(original, copia)
+
+
+@pytest.mark.parametrize("temp_inicial, masa_total, potencia, presion_kpa", [
+    (-10, 1.0, 2000, 101.325),
+    (20, 0.5, 1500, 70.0),
+])
+def test_conduccion_igual_en_total_al_calentamiento(temp_inicial, masa_total, potencia, presion_kpa):
+    referencia = simulador.simular_calentamiento(temp_inicial, masa_total, potencia, presion_kpa)
+    resultados = conduccion.simular_conduccion(temp_inicial, masa_total, potencia, presion_kpa, n_celdas=20)
+
+    assert resultados['energia_total'] == pytest.approx(referencia['energia_total'], rel=1e-12)
+    assert resultados['tiempo_total'] == pytest.approx(referencia['tiempo_total'], rel=1e-12)
+    assert resultados['temp_saturacion'] == pytest.approx(referencia['temp_saturacion'])
+    assert resultados['tiempo'][-1] == pytest.approx(referencia['tiempo_total'], rel=1e-12)
+    assert resultados['masa_vapor'][-1] == pytest.approx(masa_total, rel=1e-9)
+    # La evaporización completa llega a la vez; los cambios de fase intermedios, después
+    assert resultados['tiempos_fase'][-1] == pytest.approx(referencia['tiempos_fase'][-1], rel=1e-9)
+    assert np.all(resultados['tiempos_fase'] >= referencia['tiempos_fase'] * (1 - 1e-9))
+    assert resultados['diagnostico']['residuo_relativo'] < 1e-9
+    assert resultados['campo_temperatura'].shape == (resultados['tiempo'].size, 20)
+
+
+def test_conduccion_valida_los_parametros():
+    with pytest.raises(ValueError):
+        conduccion.simular_conduccion(20, 1.0, 0, 101.325)
+    with pytest.raises(ValueError):
+        conduccion.simular_conduccion(20, 1.0, 1000, 101.325, n_celdas=0)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import diseno
+import simulador
+
+AGUA_TEMPLADA = {'temp_inicial': 20.0, 'masa_total': 1.0, 'presion_kpa': 101.325}
+
+
+def tiempo(objetivo, parametros):
+    resultados = simulador.simular_calentamiento(*(parametros[nombre] for nombre in diseno.PARAMETROS),
+                                                 tiempos=[0.0])
+    indice = diseno.OBJETIVOS[objetivo]
+    return float(resultados['tiempos_fase'][indice - 1])
+
+
+def test_potencia_analitica():
+    solucion = diseno.disenar('potencia', 600.0, **AGUA_TEMPLADA)
+    assert solucion['metodo'] == 'analitico'
+    assert tiempo('tiempo_total', solucion['parametros']) == pytest.approx(600.0, rel=1e-12)
+
+
+def test_masa_analitica():
+    solucion = diseno.disenar('masa_total', 300.0, objetivo='tiempo_ebullicion', temp_inicial=-10.0,
+                              potencia=2000.0, presion_kpa=70.0)
+    assert solucion['metodo'] == 'analitico'
+    assert tiempo('tiempo_ebullicion', solucion['parametros']) == pytest.approx(300.0, rel=1e-12)
+
+
+def test_presion_por_multiseccion():
+    solucion = diseno.disenar('presion_kpa', 650.0, potencia=3000.0, masa_total=1.0, temp_inicial=20.0)
+    assert solucion['metodo'] == 'multiseccion'
+    assert 0.1 < solucion['valor'] < 101.325
+    assert tiempo('tiempo_total', solucion['parametros']) == pytest.approx(650.0, rel=1e-6)
+
+
+def test_temperatura_por_multiseccion():
+    solucion = diseno.disenar('temp_inicial', 120.0, objetivo='tiempo_ebullicion', potencia=3000.0,
+                              masa_total=1.0, presion_kpa=101.325)
+    assert 0.0 < solucion['valor'] < 20.0
+    assert tiempo('tiempo_ebullicion', solucion['parametros']) == pytest.approx(120.0, rel=1e-6)
+
+
+def test_objetivo_inalcanzable():
+    with pytest.raises(ValueError, match="no se alcanza"):
+        diseno.disenar('temp_inicial', 900.0, potencia=3000.0, masa_total=1.0, presion_kpa=101.325)
+
+
+def test_salto_en_cero_grados():
+    # De -0 °C a 0 °C el tiempo total cae de ~793 s a ~682 s: 740 s no lo da ninguna temperatura
+    with pytest.raises(ValueError, match="exactamente"):
+        diseno.disenar('temp_inicial', 740.0, potencia=3000.0, masa_total=1.0, presion_kpa=101.325)
+
+
+@pytest.mark.parametrize('intervalo', [(0.0, 100.0), (-5.0, 100.0), (100.0, 1.0), (1.0, np.inf), (np.nan, 10.0)])
+def test_intervalo_invalido(intervalo):
+    with pytest.raises(ValueError, match="intervalo"):
+        diseno.disenar('presion_kpa', 650.0, potencia=3000.0, masa_total=1.0, temp_inicial=20.0,
+                       intervalo=intervalo)
+
+
+def test_multiseccion_con_evaluacion_no_finita():
+    with pytest.raises(ValueError, match="finito"):
+        diseno._multiseccion(lambda x: np.full_like(x, np.nan), 0.0, 1.0, 0.5)
+
+
+def test_multiseccion_acota_las_rondas():
+    with pytest.raises(ValueError, match="no converge"):
+        diseno._multiseccion(lambda x: x, 0.0, 1.0, 0.123456789, tolerancia=0.0, max_rondas=3)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import simulador
+from propiedades import PropiedadesAgua
+
+TEMPERATURAS = np.array([-30.0, -5.0, 0.0, 20.0, 95.0])
+MASAS = np.array([0.2, 1.0, 50.0])
+POTENCIAS = np.array([500.0, 2090.0, 5000.0])
+PRESIONES = np.array([30.0, 70.0, 101.325, 250.0])
+# simular_lote interpola las propiedades en tablas; el escalar usa las correlaciones exactas
+TOLERANCIA = 1e-6
+# cp que varían con la temperatura: la temperatura sale de la tabla inversa de entalpía
+CP_VARIABLE = PropiedadesAgua(cp_agua=lambda t: 4180.0 + 0.2 * t, cp_hielo=lambda t: 2100.0 + 7.0 * t)
+
+
+def escenarios():
+    rejilla = np.meshgrid(TEMPERATURAS, MASAS, POTENCIAS, PRESIONES, indexing='ij')
+    return [x.ravel() for x in rejilla]
+
+
+def test_resumen_igual_al_escalar():
+    temp_inicial, masa_total, potencia, presion_kpa = escenarios()
+    lote = simulador.simular_lote(temp_inicial, masa_total, potencia, presion_kpa)
+
+    for i in range(temp_inicial.size):
+        escalar = simulador.simular_calentamiento(temp_inicial[i], masa_total[i], potencia[i], presion_kpa[i],
+                                                  tiempos=[0.0])
+        np.testing.assert_allclose(lote['temp_saturacion'][i], escalar['temp_saturacion'], rtol=TOLERANCIA)
+        np.testing.assert_allclose(lote['tiempo_total'][i], escalar['tiempo_total'], rtol=TOLERANCIA)
+        np.testing.assert_allclose(lote['energia_total'][i], escalar['energia_total'], rtol=TOLERANCIA)
+        np.testing.assert_allclose([lote['tiempo_fusion'][i], lote['tiempo_ebullicion'][i]],
+                                   escalar['tiempos_fase'][1:3], rtol=0,
+                                   atol=TOLERANCIA * escalar['tiempo_total'])
+
+
+@pytest.mark.parametrize('propiedades', [None, CP_VARIABLE], ids=['cp_constante', 'cp_variable'])
+def test_trayectorias_iguales_al_escalar(propiedades):
+    temp_inicial, masa_total, potencia, presion_kpa = (x[::7] for x in escenarios())
+    tiempos = np.linspace(0.0, 40000.0, 401)
+    lote = simulador.simular_lote(temp_inicial, masa_total, potencia, presion_kpa, tiempos=tiempos,
+                                  propiedades=propiedades)
+
+    for i in range(temp_inicial.size):
+        escalar = simulador.simular_calentamiento(temp_inicial[i], masa_total[i], potencia[i], presion_kpa[i],
+                                                  tiempos=tiempos, propiedades=propiedades)
+        for clave in simulador.COLUMNAS[1:]:
+            escala = max(np.abs(escalar[clave]).max(), 1.0)
+            np.testing.assert_allclose(lote[clave][i], escalar[clave], rtol=0, atol=TOLERANCIA * escala)
+
+
+def test_broadcasting_de_parametros():
+    lote = simulador.simular_lote(TEMPERATURAS[:, None], 1.0, POTENCIAS[None, :], 101.325, tiempos=[0.0, 60.0])
+    assert lote['tiempo_total'].shape == (TEMPERATURAS.size, POTENCIAS.size)
+    assert lote['temperatura'].shape == (TEMPERATURAS.size, POTENCIAS.size, 2)
+    escalar = simulador.simular_calentamiento(TEMPERATURAS[1], 1.0, POTENCIAS[2], 101.325)
+    assert lote['tiempo_total'][1, 2] == pytest.approx(escalar['tiempo_total'], rel=TOLERANCIA)
+
+
+def test_parametros_no_positivos():
+    with pytest.raises(ValueError):
+        simulador.simular_lote([20.0, 20.0], [1.0, -1.0], 2000, 101.325)
@@ -0,0 +1,45 @@
+import io
+import json
+
+import pytest
+
+import lotes
+
+ESCENARIO = {'temp_inicial': 20, 'masa_total': 1.0, 'potencia': 2000, 'presion_kpa': 101.325}
+
+
+def test_lee_csv_y_json():
+    csv = "nombre,temp_inicial,masa_total,potencia,presion_kpa\nolla,20,1,2000,101.325\n"
+    assert lotes.leer_escenarios(csv) == lotes.leer_escenarios(json.dumps({**ESCENARIO, 'nombre': 'olla'}))
+    lineas = "\n".join(json.dumps(ESCENARIO) for _ in range(3))
+    assert [e['nombre'] for e in lotes.leer_escenarios(lineas)] == ['escenario_1', 'escenario_2', 'escenario_3']
+
+
+@pytest.mark.parametrize('texto, mensaje', [
+    ('[1, 2]', "Escenario 1: se esperaba un objeto"),
+    ('[{"temp_inicial": 20}]', "Escenario 1: faltan"),
+    (json.dumps([{**ESCENARIO, 'nombre': 'a'}, {**ESCENARIO, 'nombre': 'a'}]), "Escenario 2: .* repetido"),
+    (json.dumps({**ESCENARIO, 'nombre': '../../tmp/zz'}), "no es un nombre de archivo"),
+    (json.dumps({**ESCENARIO, 'nombre': '..'}), "no es un nombre de archivo"),
+    (json.dumps({**ESCENARIO, 'masa_total': 0}), "positivos"),
+    (json.dumps({**ESCENARIO, 'temp_inicial': -300}), "cero absoluto"),
+    ('{"temp_inicial": NaN, "masa_total": 1, "potencia": 2000, "presion_kpa": 101.325}', "finitos"),
+])
+def test_rechaza_escenarios_invalidos(texto, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        lotes.leer_escenarios(texto)
+
+
+def test_trayectorias_con_un_archivo_por_escenario(tmp_path):
+    escenarios = lotes.leer_escenarios(json.dumps([{**ESCENARIO, 'nombre': 'a'}, {**ESCENARIO, 'nombre': 'b'}]))
+    resumenes = lotes.ejecutar(escenarios, trayectorias=tmp_path, formato='csv')
+    assert sorted(ruta.name for ruta in tmp_path.iterdir()) == ['a.csv', 'b.csv']
+    assert [r['nombre'] for r in resumenes] == ['a', 'b']
+
+
+def test_main_informa_de_errores_de_entrada(monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO('[1, 2]'))
+    with pytest.raises(SystemExit) as salida:
+        lotes.main(['-'])
+    assert salida.value.code == 2
+    assert "se esperaba un objeto" in capsys.readouterr().err
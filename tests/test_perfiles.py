@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+import perfiles
+import simulador
+
+
+@pytest.mark.parametrize("temp_inicial, masa_total, potencia, presion_kpa", [
+    (-10, 1.0, 2000, 101.325),
+    (20, 0.5, 1500, 70.0),
+    (-20, 2.0, 3000, 50.0),
+])
+def test_potencia_constante_igual_a_la_solucion_cerrada(temp_inicial, masa_total, potencia, presion_kpa):
+    referencia = simulador.simular_calentamiento(temp_inicial, masa_total, potencia, presion_kpa)
+    resultados = perfiles.simular_con_perfil(temp_inicial, masa_total, perfiles.PotenciaConstante(potencia),
+                                             presion_kpa)
+
+    np.testing.assert_allclose(resultados['tiempos_fase'], referencia['tiempos_fase'], rtol=1e-6)
+    assert resultados['tiempo_total'] == pytest.approx(referencia['tiempo_total'], rel=1e-6)
+    assert resultados['energia_total'] == pytest.approx(referencia['energia_total'], rel=1e-12)
+    assert resultados['masa_vapor'][-1] == pytest.approx(masa_total, rel=1e-9)
+
+
+def test_potencia_escalonada_termina_en_cada_discontinuidad():
+    perfil = perfiles.PotenciaEscalonada([0, 100, 250], [1000, 3000, 2000])
+    resultados = perfiles.simular_con_perfil(20, 1.0, perfil, 101.325)
+    assert {100.0, 250.0} <= set(resultados['tiempo'].tolist())
+    # Energía aportada hasta el final: tramos completos más el último
+    energia = 1000 * 100 + 3000 * 150 + 2000 * (resultados['tiempo_total'] - 250)
+    assert energia == pytest.approx(resultados['energia_total'], rel=1e-6)
+
+
+def test_potencia_escalonada_valida_los_tramos():
+    with pytest.raises(ValueError):
+        perfiles.PotenciaEscalonada([0, 100], [1000])
+    with pytest.raises(ValueError):
+        perfiles.PotenciaEscalonada([], [])
+
+
+@pytest.mark.parametrize("perfil", [
+    perfiles.Termostato(consigna=60.0, potencia_max=2000.0),
+    perfiles.ControladorPI(consigna=60.0, kp=200.0, ki=1.0, potencia_max=2000.0),
+], ids=['termostato', 'pi'])
+def test_controladores_se_detienen_en_tiempo_max(perfil):
+    resultados = perfiles.simular_con_perfil(20, 1.0, perfil, 101.325, tiempo_max=3600.0)
+
+    assert resultados['tiempo_total'] == pytest.approx(3600.0)
+    assert resultados['tiempo'][-1] == pytest.approx(3600.0)
+    # Sin llegar a hervir: la temperatura se queda junto a la consigna y no hay vapor
+    assert np.all(np.isnan(resultados['tiempos_fase'][2:]))
+    assert resultados['masa_vapor'][-1] == 0.0
+    # Sin pérdidas no se enfría: el PI se pasa de la consigna lo que arrastra su integral
+    assert resultados['temperatura'][-1] == pytest.approx(60.0, abs=1.0)
+    assert resultados['temperatura'].max() <= 61.0
+
+
+def test_remuestreo_en_tiempos_dados():
+    tiempos = np.linspace(0.0, 100.0, 11)
+    resultados = perfiles.simular_con_perfil(20, 1.0, perfiles.PotenciaConstante(1000), 101.325,
+                                             tiempos=tiempos)
+    np.testing.assert_array_equal(resultados['tiempo'], tiempos)
+    np.testing.assert_allclose(resultados['potencia'], 1000.0)
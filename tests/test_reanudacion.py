@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import simulador
+
+# (escenario previo, escenario nuevo, fases que deben copiarse)
+CASOS = [
+    # Solo cambia la presión: se copian el hielo y la fusión
+    ((-20, 5.0, 2090, 101.325), (-20, 5.0, 2090, 70.0), ['Calentamiento del hielo', 'Fusión']),
+    # Solo cambia la temperatura del hielo; a 2090 W el resto se desplaza un número entero de muestras
+    ((-30, 2.0, 2090, 70.0), (-10, 2.0, 2090, 70.0), ['Fusión', 'Calentamiento del líquido', 'Ebullición']),
+    # Del líquido al hielo: la ebullición se copia desplazada y no coincide bit a bit
+    ((50, 2.0, 1000, 70.0), (-30, 2.0, 1000, 70.0), ['Ebullición']),
+]
+
+
+@pytest.mark.parametrize('previo, nuevo, copiadas', CASOS)
+def test_reanudar_coincide_con_simulacion_nueva(previo, nuevo, copiadas):
+    anterior = simulador.simular_calentamiento(*previo)
+    reanudado = simulador.reanudar_calentamiento([anterior], *nuevo)
+    nuevo = simulador.simular_calentamiento(*nuevo)
+
+    assert reanudado['reanudacion']['fases'] == copiadas
+    assert reanudado['reanudacion']['muestras'] > 0
+    assert reanudado['trayectoria'].shape == nuevo['trayectoria'].shape
+    assert reanudado['tiempo_total'] == nuevo['tiempo_total']
+    assert np.array_equal(reanudado['tiempos_fase'], nuevo['tiempos_fase'])
+
+    escala = np.abs(nuevo['trayectoria']).max(axis=1, keepdims=True)
+    diferencia = np.abs(reanudado['trayectoria'] - nuevo['trayectoria'])
+    assert np.all(diferencia <= simulador.TOLERANCIA_SUFIJO * escala)
+
+
+def test_prefijo_copiado_es_exacto():
+    anterior = simulador.simular_calentamiento(-20, 5.0, 2090, 101.325)
+    reanudado = simulador.reanudar_calentamiento([anterior], -20, 5.0, 2090, 70.0)
+    nuevo = simulador.simular_calentamiento(-20, 5.0, 2090, 70.0)
+
+    assert reanudado['reanudacion']['punto_control'] == 2
+    fin_prefijo = sum(fase['muestras'] for fase in nuevo['diagnostico']['fases'][:2])
+    assert np.array_equal(reanudado['trayectoria'][:, :fin_prefijo], nuevo['trayectoria'][:, :fin_prefijo])
+
+
+def test_sin_punto_de_control_valido_simula_entero():
+    anterior = simulador.simular_calentamiento(20, 1.0, 2000, 101.325)
+    reanudado = simulador.reanudar_calentamiento([anterior], 20, 1.0, 1500, 101.325)
+    assert reanudado['reanudacion']['muestras'] == 0
+    assert np.array_equal(reanudado['trayectoria'],
+                          simulador.simular_calentamiento(20, 1.0, 1500, 101.325)['trayectoria'])
@@ -0,0 +1,44 @@
+import pytest
+
+import servicio
+
+ESCENARIO = {'temp_inicial': 20, 'masa_total': 1.0, 'potencia': 2000, 'presion_kpa': 101.325}
+
+
+def test_lee_parametros():
+    assert servicio._leer_parametros(ESCENARIO) == (20.0, 1.0, 2000.0, 101.325)
+
+
+@pytest.mark.parametrize('cambios, mensaje', [
+    ({'potencia': None}, "Faltan"),
+    ({'masa_total': 'x'}, "numéricos"),
+    ({'temp_inicial': float('nan')}, "finitos"),
+    ({'presion_kpa': 0}, "positivos"),
+    ({'temp_inicial': -300}, "cero absoluto"),
+])
+def test_rechaza_parametros_invalidos(cambios, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        servicio._leer_parametros({**ESCENARIO, **cambios})
+
+
+@pytest.mark.parametrize('datos, mensaje', [
+    ([ESCENARIO, {**ESCENARIO, 'temp_inicial': float('nan')}], "finitos"),
+    ({**{nombre: [valor] for nombre, valor in ESCENARIO.items()}, 'temp_inicial': [float('nan')]}, "finitos"),
+    ({**{nombre: [valor] for nombre, valor in ESCENARIO.items()}, 'temp_inicial': [1, 2]}, "longitud"),
+    ({**{nombre: [valor] for nombre, valor in ESCENARIO.items()}, 'temp_inicial': [-300]}, "cero absoluto"),
+    ({**{nombre: [valor] for nombre, valor in ESCENARIO.items()}, 'masa_total': [-1]}, "positivos"),
+])
+def test_lote_valida_las_dos_formas(datos, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        servicio._leer_columnas(datos)
+
+
+@pytest.mark.parametrize('valor', ['x', 2.5, 0, -3, True, float('inf'), float('nan')])
+def test_entero_positivo_rechaza(valor):
+    with pytest.raises(ValueError, match="entero positivo"):
+        servicio._entero_positivo({'paso': valor}, 'paso', 1)
+
+
+def test_entero_positivo_acepta():
+    assert servicio._entero_positivo({'paso': 10.0}, 'paso', 1) == 10
+    assert servicio._entero_positivo({}, 'paso', 7) == 7
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+import simulador
+from propiedades import (CP_AGUA, CP_HIELO, LF, calcular_entalpia_vaporizacion,
+                         calcular_temperatura_saturacion)
+
+ESCENARIOS = [
+    (-10, 1.0, 2000, 101.325),
+    (20, 0.5, 1500, 70.0),
+    (-20, 2.0, 3000, 50.0),
+]
+
+
+def bucle_por_segundo(temp_inicial, masa_total, potencia, presion_kpa):
+    """El integrador original de la interfaz Tk: un paso de 1 s, una fase por paso.
+
+    La energía sobrante de un paso que completa una fase se pierde, así que va
+    como mucho un paso por cada cambio de fase por detrás de la solución exacta.
+    """
+    temp_saturacion = calcular_temperatura_saturacion(presion_kpa)
+    temperatura = temp_inicial
+    masa_solida, masa_liquida, masa_vapor = (masa_total, 0.0, 0.0) if temp_inicial < 0 else (0.0, masa_total, 0.0)
+    filas = []
+    while masa_vapor < masa_total - 1e-6:
+        energia = potencia
+        if masa_solida > 1e-6 and temperatura < 0:
+            necesaria = masa_solida * CP_HIELO * -temperatura
+            temperatura = 0.0 if energia >= necesaria else temperatura + energia / (masa_solida * CP_HIELO)
+        elif masa_solida > 1e-6 and temperatura == 0:
+            fundida = min(energia / LF, masa_solida)
+            masa_solida -= fundida
+            masa_liquida += fundida
+        elif masa_liquida > 1e-6 and temperatura < temp_saturacion:
+            necesaria = masa_liquida * CP_AGUA * (temp_saturacion - temperatura)
+            temperatura = (temp_saturacion if energia >= necesaria
+                           else temperatura + energia / (masa_liquida * CP_AGUA))
+        else:
+            vaporizada = min(energia / calcular_entalpia_vaporizacion(temperatura), masa_liquida)
+            masa_liquida -= vaporizada
+            masa_vapor += vaporizada
+        filas.append((temperatura, masa_solida, masa_liquida, masa_vapor))
+    return np.array(filas).T
+
+
+@pytest.mark.parametrize('escenario', ESCENARIOS)
+def test_coincide_con_el_bucle_por_segundo(escenario):
+    temperatura, masa_solida, _, masa_vapor = bucle_por_segundo(*escenario)
+    resultados = simulador.simular_calentamiento(*escenario)
+    retraso = 3  # un paso perdido como mucho en cada uno de los tres cambios de fase
+
+    # La fila i del bucle es el estado tras i + 1 pasos de 1 s
+    pasos = np.arange(1, temperatura.size + 1, dtype=float)
+    assert resultados['tiempo_total'] <= pasos[-1] <= resultados['tiempo_total'] + retraso + 1
+    t_fusion, t_liquido = resultados['tiempos_fase'][1:3]
+    if escenario[0] < 0:
+        assert t_fusion <= pasos[np.argmax(masa_solida <= 1e-6)] <= t_fusion + retraso
+    assert t_liquido <= pasos[np.argmax(masa_vapor > 0)] <= t_liquido + retraso + 1
+
+    # Cada estado del bucle queda entre la solución exacta `retraso` segundos antes y en su instante
+    despues = simulador.simular_calentamiento(*escenario, tiempos=np.minimum(pasos, resultados['tiempo_total']))
+    antes = simulador.simular_calentamiento(*escenario, tiempos=np.maximum(pasos - retraso, 0))
+    tolerancia = 1e-6
+    assert np.all(antes['temperatura'] - tolerancia <= temperatura)
+    assert np.all(temperatura <= despues['temperatura'] + tolerancia)
+    assert np.all(antes['masa_vapor'] - tolerancia <= masa_vapor)
+    assert np.all(masa_vapor <= despues['masa_vapor'] + tolerancia)
+    assert np.all(despues['masa_solida'] - tolerancia <= masa_solida)
+    assert np.all(masa_solida <= antes['masa_solida'] + tolerancia)
+
+
+@pytest.mark.parametrize('escenario', [(-20, 500.0, 2000, 50.0), (-20, 5000.0, 500, 101.325)])
+def test_max_muestras_acota_la_trayectoria(escenario):
+    completo = simulador.simular_calentamiento(*escenario)
+    acotado = simulador.simular_calentamiento(*escenario, max_muestras=simulador.MAX_MUESTRAS)
+
+    assert acotado['trayectoria'].shape[1] <= simulador.MAX_MUESTRAS
+    assert acotado['tiempo'][-1] == completo['tiempo_total']
+    assert np.array_equal(acotado['tiempos_fase'], completo['tiempos_fase'])
+    # El paso es un múltiplo de 1 s: las muestras acotadas son muestras de la rejilla completa
+    factor = int(acotado['tiempo'][1])
+    assert np.array_equal(acotado['trayectoria'][:, :-1], completo['trayectoria'][:, :-1][:, ::factor])
+
+
+def test_paso_muestreo():
+    assert simulador.paso_muestreo(1000.0) == 1.0
+    assert simulador.paso_muestreo(1000.0, max_muestras=1001) == 1.0
+    assert simulador.paso_muestreo(1000.0, max_muestras=1000) == 2.0
+    assert simulador.paso_muestreo(1000.0, max_muestras=300) == 5.0
+    assert simulador.paso_muestreo(1000.0, dt=0.5, max_muestras=101) == 10.0
+    with pytest.raises(ValueError):
+        simulador.paso_muestreo(1000.0, max_muestras=1)
+
+
+def test_bloques_de_bufer_unico_se_unen_sin_copia():
+    escenario = (-20, 50.0, 2000, 101.325)
+    bloques = list(simulador.simular_por_bloques(*escenario, bufer_unico=True))
+    separados = list(simulador.simular_por_bloques(*escenario))
+    unido = simulador.unir_bloques(bloques)
+
+    assert len(bloques) > 1
+    assert np.shares_memory(unido['trayectoria'], bloques[0]['trayectoria'])
+    assert np.shares_memory(unido['tiempo'], unido['trayectoria'])
+    assert np.array_equal(unido['trayectoria'], simulador.unir_bloques(separados)['trayectoria'])
+    assert np.array_equal(unido['trayectoria'], simulador.simular_calentamiento(*escenario)['trayectoria'])
+    # Un resultado parcial ya unido se puede seguir extendiendo sin copia
+    parcial = simulador.unir_bloques(bloques[:2])
+    assert np.shares_memory(simulador.unir_bloques([parcial, *bloques[2:]])['trayectoria'], unido['trayectoria'])